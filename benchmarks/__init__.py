@@ -0,0 +1,7 @@
+"""
+Benchmarks for the MiniLang compiler.
+
+Each module is runnable with ``python -m benchmarks.<name>`` from the
+repository root and prints its measurements; none of them are part of the
+compiler itself.
+"""
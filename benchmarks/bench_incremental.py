@@ -0,0 +1,57 @@
+"""Incremental reparse cost versus a full parse after a one-statement edit.
+
+Builds programs of growing size (top-level statements plus one large ``while``
+block), edits one statement at top level and one inside the block, and
+compares ``IncrementalParser.edit`` with a full lex+parse. Flat ``edit ms``
+columns mean the reparse cost tracks the edit size, not the file size::
+
+    python -m benchmarks.bench_incremental --statements 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+from benchmarks.synth import make_block_program
+from src.incremental import IncrementalParser
+from src.lexer import tokenize_text
+from src.parser import parse_tokens
+
+
+def _time_edit(parser: IncrementalParser, needle: str, replacement: str) -> float:
+    start = parser.text.index(needle)
+    began = time.perf_counter()
+    parser.edit(start, start + len(needle), replacement)
+    return time.perf_counter() - began
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    sizes = sorted({max(4, args.statements // 100), max(4, args.statements // 10), args.statements})
+    print(f"{'stmts':>9} {'full s':>8} {'top edit ms':>12} {'block edit ms':>14} {'chars':>6}")
+    for n in sizes:
+        text = make_block_program(n)
+        began = time.perf_counter()
+        parse_tokens(tokenize_text(text))
+        full_s = time.perf_counter() - began
+
+        inc = IncrementalParser(text)
+        mid = n // 4
+        top_s = _time_edit(inc, f"x{mid} = {mid} + y;", f"x{mid} = ({mid} - y) * 3;")
+        block = (n - n // 2) // 2
+        block_s = _time_edit(inc, f"z{block} = z{block} * 2;", f"z{block} = z{block} / 4 + q;")
+        assert not inc.last_reparse.full
+        print(
+            f"{n:>9} {full_s:>8.2f} {top_s * 1e3:>12.2f} {block_s * 1e3:>14.2f} "
+            f"{inc.last_reparse.chars:>6}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Lexer throughput in MB/s: regex engine versus the character scanner.
+
+Tokenizes a multi-megabyte generated program with ``tokenize_text`` (one regex
+``findall`` per line, scanner fallback) and with the character scanner alone,
+checks that both produce the same tokens, and prints MB/s of UTF-8 source.
+A second program with non-ASCII identifiers on every tenth line shows the
+cost of the per-line fallback::
+
+    python -m benchmarks.bench_lexer --statements 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from benchmarks.synth import make_program
+from src.lexer import Token, _scan, tokenize_text
+
+
+def _scanner_only(text: str) -> List[Token]:
+    tokens: List[Token] = []
+    _scan(text, 0, len(text), 1, 1, None, tokens)
+    return tokens
+
+
+def _mb_per_s(fn: Callable[[str], List[Token]], text: str, repeat: int) -> tuple[float, List[Token]]:
+    size = len(text.encode("utf-8")) / 1e6
+    best, tokens = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return size / best, tokens
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cell (best is kept)")
+    args = parser.parse_args(argv)
+
+    ascii_src = make_program(args.statements)
+    lines = ascii_src.splitlines(keepends=True)
+    mixed_src = "".join(
+        ln.replace("x", "größe_", 1) if i % 10 == 0 else ln for i, ln in enumerate(lines)
+    )
+    print(f"{'source':<8} {'MB':>6} {'tokens':>9} {'scanner MB/s':>13} {'regex MB/s':>11}")
+    for label, text in (("ascii", ascii_src), ("unicode", mixed_src)):
+        slow, expected = _mb_per_s(_scanner_only, text, args.repeat)
+        fast, tokens = _mb_per_s(tokenize_text, text, args.repeat)
+        assert tokens == expected, "regex lexer differs from the scanner"
+        size = len(text.encode("utf-8")) / 1e6
+        print(f"{label:<8} {size:>6.1f} {len(tokens):>9} {slow:>13.2f} {fast:>11.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
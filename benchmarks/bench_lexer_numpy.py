@@ -0,0 +1,49 @@
+"""Lexer time: ``TokenBuffer.from_text`` versus the NumPy fast path.
+
+Lexes generated programs of growing size with both and checks that the
+buffers match. Needs NumPy::
+
+    python -m benchmarks.bench_lexer_numpy --statements 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from benchmarks.synth import make_program
+from src.lexer import TokenBuffer
+from src.lexer_numpy import tokenize_numpy
+
+
+def _best(fn: Callable[[str], TokenBuffer], text: str, repeat: int) -> tuple[float, TokenBuffer]:
+    best, buf = float("inf"), TokenBuffer(text)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        buf = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, buf
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cell (best is kept)")
+    args = parser.parse_args(argv)
+
+    print(f"{'MB':>6} {'tokens':>9} {'from_text s':>12} {'numpy s':>8} {'speedup':>8}")
+    for statements in args.statements:
+        text = make_program(statements)
+        slow, expected = _best(TokenBuffer.from_text, text, args.repeat)
+        fast, buf = _best(tokenize_numpy, text, args.repeat)
+        columns = ("types", "offsets", "lengths", "lines", "cols")
+        assert all(getattr(buf, c) == getattr(expected, c) for c in columns), "buffers differ"
+        print(
+            f"{len(text) / 1e6:>6.1f} {len(buf):>9} {slow:>12.3f} {fast:>8.3f} {slow / fast:>7.1f}x",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
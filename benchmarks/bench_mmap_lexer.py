@@ -0,0 +1,65 @@
+"""Peak memory of ``tokenize`` versus streaming from ``MappedSource``.
+
+Writes generated programs of growing size to a temporary file and lexes each
+one twice: ``tokenize`` (the whole text as a ``str`` plus a ``Token`` list) and
+``MappedSource.iter_tokens`` consumed one token at a time. Peak Python
+allocations come from ``tracemalloc``; the mapped file itself is page cache
+and not counted. A flat ``mmap MB`` column is the point::
+
+    python -m benchmarks.bench_mmap_lexer --statements 50000 200000 800000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+from benchmarks.synth import make_program
+from src.lexer import MappedSource, tokenize
+
+
+def _stream(path: Path) -> int:
+    count = 0
+    with MappedSource(path) as source:
+        for _ in source.iter_tokens():
+            count += 1
+    return count
+
+
+def _measure(fn: Callable[[Path], object], path: Path) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, elapsed
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, nargs="+", default=[50_000, 200_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'file MB':>8} {'tokens':>9} {'tokenize MB':>12} {'s':>6} {'mmap MB':>8} {'s':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big.min"
+        for statements in args.statements:
+            path.write_text(make_program(statements), encoding="utf-8")
+            size = path.stat().st_size / 1e6
+            count = _stream(path)
+            full_mb, full_s = _measure(tokenize, path)
+            mmap_mb, mmap_s = _measure(_stream, path)
+            print(
+                f"{size:>8.1f} {count:>9} {full_mb:>12.1f} {full_s:>6.2f} "
+                f"{mmap_mb:>8.2f} {mmap_s:>6.2f}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
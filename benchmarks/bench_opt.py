@@ -0,0 +1,89 @@
+"""Optimizer timing on a generated program full of constants and copies.
+
+Runs ``opt.optimize_ir`` (IR generation, then the block-local folding,
+constant/copy propagation and DCE rounds) in a fresh interpreter per sample.
+``--ref REV`` also measures the ``src/`` tree of a git revision::
+
+    python -m benchmarks.bench_opt --statements 20000 --ref HEAD~1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+from benchmarks.bench_tables import REPO_ROOT, _export_revision
+
+# Twenty-one statements per block: constants to fold and propagate, copy chains,
+# and temporaries that die.
+_BLOCK = (
+    "if (k{i} < 1) {{\n"
+    + "".join(
+        f"  a{{i}}_{j} = {j} + 2 * 3; b{{i}}_{j} = a{{i}}_{j}; c{{i}}_{j} = b{{i}}_{j} * x - y;\n"
+        for j in range(7)
+    )
+    + "}}\n"
+)
+
+_RUNNER = r"""
+import json, sys, tempfile, time
+from pathlib import Path
+from src.opt import optimize_ir
+src_path = Path(sys.argv[1])
+with tempfile.TemporaryDirectory() as out:
+    start = time.perf_counter()
+    try:
+        from src.session import CompilationSession
+    except ImportError:  # revisions before sessions take the path
+        optimize_ir(src_path, Path(out))
+    else:
+        optimize_ir(CompilationSession(src_path), Path(out))
+    print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def make_program(statements: int) -> str:
+    return "".join(_BLOCK.format(i=i) for i in range(max(1, statements // 21)))
+
+
+def _measure(src_root: Path, program: Path, repeat: int) -> float:
+    env_path = f"{src_root}{':' + str(REPO_ROOT) if src_root != REPO_ROOT else ''}"
+    best = float("inf")
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _RUNNER, str(program)],
+            capture_output=True,
+            text=True,
+            cwd=src_root,
+            env={"PYTHONPATH": env_path, "PATH": ""},
+            check=True,
+        )
+        best = min(best, json.loads(proc.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cell (best is kept)")
+    parser.add_argument("--ref", help="also measure src/ at this git revision")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        program = Path(tmp) / "opt.min"
+        program.write_text(make_program(args.statements), encoding="utf-8")
+        trees = [("working tree", REPO_ROOT)]
+        if args.ref:
+            trees.insert(0, (args.ref, _export_revision(args.ref, Path(tmp))))
+        print(f"{'tree':<14} {'optimize_ir s':>14}")
+        for label, root in trees:
+            print(f"{label:<14} {_measure(root, program, args.repeat):>14.3f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Parse-time scaling on long straight-line programs (trace off).
+
+Generates programs of ``--statements`` assignments (and two smaller sizes),
+lexes and parses each, and prints per-statement cost; a flat ``us/stmt``
+column means parsing is linear in program length::
+
+    python -m benchmarks.bench_parse --statements 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from src.lexer import tokenize
+from src.parser import parse_tokens
+
+_STATEMENTS = (
+    "x{i} = {i};\n",
+    "y = x{i} + 1;\n",
+    "z = (y - {i}) * 2;\n",
+)
+
+
+def write_program(path: Path, statements: int) -> None:
+    with path.open("w", encoding="utf-8") as fp:
+        for i in range(statements):
+            fp.write(_STATEMENTS[i % len(_STATEMENTS)].format(i=i))
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    sizes = sorted({max(1, args.statements // 100), max(1, args.statements // 10), args.statements})
+    print(f"{'stmts':>9} {'tokens':>10} {'lex s':>8} {'parse s':>8} {'us/stmt':>8}")
+    for n in sizes:
+        fd, name = tempfile.mkstemp(suffix=".min")
+        os.close(fd)
+        path = Path(name)
+        try:
+            write_program(path, n)
+            start = time.perf_counter()
+            tokens = tokenize(path)
+            lexed = time.perf_counter()
+            result = parse_tokens(tokens)
+            parsed = time.perf_counter()
+        finally:
+            path.unlink()
+        assert result.program is not None and len(result.program.stmts) == n
+        parse_s = parsed - lexed
+        print(
+            f"{n:>9} {len(tokens):>10} {lexed - start:>8.2f} {parse_s:>8.2f} "
+            f"{parse_s / n * 1e6:>8.2f}",
+            flush=True,
+        )
+        del tokens, result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Per-stage scaling curves on synthetic programs, with a stored-baseline check.
+
+For every shape of ``benchmarks.synth`` and a doubling series of sizes, times
+each pipeline stage (lexer, parse, ir, cfg, opt, codegen) on a fresh
+``CompilationSession`` and keeps the best of ``--repeat`` runs. A power law
+``t = a * n^k`` is fitted per stage over the sizes. ``k`` near 1 is linear,
+and a stage whose ``k`` exceeds ``--max-exponent`` is flagged as superlinear.
+A size that fails (e.g. ``RecursionError`` on deep nesting) is recorded, not
+fatal.
+
+Results are written as JSON. ``--baseline`` compares the new run with a stored
+one, and ``--compare OLD NEW`` compares two stored runs without measuring. Both
+exit with status 1 on a slowdown beyond ``--tolerance`` at the largest common
+size, or on an exponent that grew by more than 0.2::
+
+    python -m benchmarks.bench_scaling --out base.json
+    python -m benchmarks.bench_scaling --out new.json --baseline base.json
+    python -m benchmarks.bench_scaling --compare base.json new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.synth import SHAPES, generate
+from src.lexer import NUMPY_MIN_CHARS
+from src.session import CompilationSession
+
+# Pipeline stage -> the session artifact it computes.
+STAGES = {
+    "lexer": "tokens",
+    "parse": "parsed",
+    "ir": "ir",
+    "cfg": "cfg",
+    "opt": "optimized",
+    "codegen": "target",
+}
+
+DEFAULT_SIZES = {
+    "assign": [1000, 2000, 4000, 8000, 16000],
+    "expr": [50, 100, 200, 400],
+    "nested": [25, 50, 100, 200, 400],
+    "boolean": [100, 200, 400, 800, 1600],
+}
+
+# Times below these are too noisy to fit, or to compare between runs.
+_MIN_FIT_SECONDS = 0.001
+_MIN_COMPARE_SECONDS = 0.005
+
+
+def _time_stages(path: Path, repeat: int) -> Dict[str, float]:
+    best = {stage: float("inf") for stage in STAGES}
+    for _ in range(repeat):
+        session = CompilationSession(path)
+        for stage, artifact in STAGES.items():
+            start = time.perf_counter()
+            getattr(session, artifact)
+            best[stage] = min(best[stage], time.perf_counter() - start)
+    return best
+
+
+def fit_exponent(sizes: List[int], times: List[float | None]) -> float | None:
+    """Least-squares slope of log(time) against log(size), or None with < 3 points."""
+    points = [
+        (math.log(n), math.log(t))
+        for n, t in zip(sizes, times)
+        if t is not None and t >= _MIN_FIT_SECONDS
+    ]
+    if len(points) < 3:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def run(shapes: List[str], sizes: Dict[str, List[int]], repeat: int) -> dict:
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synth.min"
+        # Warm up imports and parse tables, and lex a source past
+        # NUMPY_MIN_CHARS so an optional NumPy import is not timed either.
+        path.write_text(generate("assign", 10), encoding="utf-8")
+        _time_stages(path, 1)
+        path.write_text("x = 1;\n" * (NUMPY_MIN_CHARS // 6), encoding="utf-8")
+        CompilationSession(path).tokens
+        for shape in shapes:
+            times: Dict[str, List[float | None]] = {stage: [] for stage in STAGES}
+            errors: Dict[str, str] = {}
+            for size in sizes[shape]:
+                path.write_text(generate(shape, size), encoding="utf-8")
+                try:
+                    measured = _time_stages(path, repeat)
+                except (RecursionError, MemoryError) as exc:
+                    errors[str(size)] = type(exc).__name__
+                    measured = {}
+                for stage in STAGES:
+                    times[stage].append(measured.get(stage))
+            results[shape] = {
+                "sizes": sizes[shape],
+                "errors": errors,
+                "stages": {
+                    stage: {
+                        "times": times[stage],
+                        "exponent": fit_exponent(sizes[shape], times[stage]),
+                    }
+                    for stage in STAGES
+                },
+            }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def report(data: dict, max_exponent: float) -> List[str]:
+    """Print the run as a table; return the stages flagged as superlinear."""
+    flagged = []
+    for shape, result in data["results"].items():
+        sizes = result["sizes"]
+        print(f"\n{shape}: sizes {', '.join(map(str, sizes))}")
+        for size, error in result["errors"].items():
+            print(f"  size {size}: {error}")
+        print(f"  {'stage':<8} {'largest s':>10} {'exponent':>9}")
+        for stage, entry in result["stages"].items():
+            last = next((t for t in reversed(entry["times"]) if t is not None), None)
+            k = entry["exponent"]
+            mark = ""
+            if k is not None and k > max_exponent:
+                mark = "  superlinear"
+                flagged.append(f"{shape}/{stage}")
+            print(
+                f"  {stage:<8} {'-' if last is None else f'{last:.4f}':>10} "
+                f"{'-' if k is None else f'{k:.2f}':>9}{mark}"
+            )
+    return flagged
+
+
+def _largest_common(
+    old_sizes: List[int],
+    old_times: List[float | None],
+    new_sizes: List[int],
+    new_times: List[float | None],
+) -> Tuple[int, float, float] | None:
+    """The largest size timed in both runs, with its old and new times."""
+    old_by_size = dict(zip(old_sizes, old_times))
+    for size, t_new in reversed(list(zip(new_sizes, new_times))):
+        t_old = old_by_size.get(size)
+        if t_old is not None and t_new is not None:
+            return size, t_old, t_new
+    return None
+
+
+def compare(old: dict, new: dict, tolerance: float) -> List[str]:
+    """Print per-stage ratios of ``new`` to ``old``; return the regressions."""
+    regressions = []
+    print(
+        f"\n{'shape/stage':<16} {'size':>6} {'old s':>9} {'new s':>9} {'ratio':>6} "
+        f"{'k old':>6} {'k new':>6}"
+    )
+    for shape, new_result in new["results"].items():
+        old_result = old["results"].get(shape)
+        if old_result is None:
+            continue
+        for stage, new_entry in new_result["stages"].items():
+            old_entry = old_result["stages"].get(stage)
+            if old_entry is None:
+                continue
+            common = _largest_common(
+                old_result["sizes"], old_entry["times"], new_result["sizes"], new_entry["times"]
+            )
+            if common is None:
+                continue
+            size, t_old, t_new = common
+            ratio = t_new / t_old if t_old > 0 else float("inf")
+            k_old, k_new = old_entry["exponent"], new_entry["exponent"]
+            label = f"{shape}/{stage}"
+            mark = ""
+            comparable = min(t_old, t_new) >= _MIN_COMPARE_SECONDS
+            if comparable and ratio > tolerance:
+                mark = "  slower"
+                regressions.append(f"{label} {ratio:.2f}x slower at size {size}")
+            if (
+                k_old is not None
+                and k_new is not None
+                and k_new - k_old > 0.2
+                and comparable
+            ):
+                mark += "  steeper"
+                regressions.append(f"{label} exponent {k_old:.2f} -> {k_new:.2f}")
+            print(
+                f"{label:<16} {size:>6} {t_old:>9.4f} {t_new:>9.4f} {ratio:>6.2f} "
+                f"{'-' if k_old is None else f'{k_old:.2f}':>6} "
+                f"{'-' if k_new is None else f'{k_new:.2f}':>6}{mark}"
+            )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=list(SHAPES))
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply every default size by this"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size (best is kept)")
+    parser.add_argument("--out", type=Path, default=Path("scaling.json"), help="results file")
+    parser.add_argument("--baseline", type=Path, help="stored results to compare this run with")
+    parser.add_argument(
+        "--compare", nargs=2, type=Path, metavar=("OLD", "NEW"), help="compare two stored runs"
+    )
+    parser.add_argument("--max-exponent", type=float, default=1.3)
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.loads(p.read_text(encoding="utf-8")) for p in args.compare)
+        regressions = compare(old, new, args.tolerance)
+    else:
+        sizes = {
+            shape: [max(1, int(n * args.scale)) for n in DEFAULT_SIZES[shape]] for shape in SHAPES
+        }
+        data = run(args.shapes, sizes, args.repeat)
+        args.out.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        flagged = report(data, args.max_exponent)
+        print(f"\nresults written to {args.out}")
+        if flagged:
+            print(f"superlinear (k > {args.max_exponent}): {', '.join(flagged)}")
+        regressions = []
+        if args.baseline:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+            regressions = compare(baseline, data, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
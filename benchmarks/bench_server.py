@@ -0,0 +1,87 @@
+"""Concurrent same-input requests to the compile server: race stress test.
+
+Starts ``python -m src.main --mode server -j N`` on a temporary directory and
+sends ``--requests`` compile requests for one source at once, every third with
+``"rebuild": true``. They all write ``out/<name>/`` and its build manifest, so
+the server has to run them one after another. Exits with status 1 if any
+response is an error or returns files that differ from a serial compile::
+
+    python -m benchmarks.bench_server --requests 200 --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.bench_tables import REPO_ROOT
+from benchmarks.synth import generate
+from src.api import compile_source
+from src.utils import TraceOptions
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--size", type=int, default=50, help="statements in the program")
+    args = parser.parse_args(argv)
+
+    text = generate("assign", args.size, 0)
+    expected = compile_source(text, trace=TraceOptions(mode="truncated")).artifacts()
+    with tempfile.TemporaryDirectory() as work:
+        Path(work, "shared.min").write_text(text, encoding="utf-8")
+        lines = "".join(
+            json.dumps(
+                {
+                    "id": i,
+                    "stage": "all",
+                    "input": "shared.min",
+                    "trace": "truncated",
+                    "rebuild": i % 3 == 0,
+                    "contents": True,
+                }
+            )
+            + "\n"
+            for i in range(args.requests)
+        )
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", "src.main", "--mode", "server", "-j", str(args.jobs)],
+            input=lines,
+            capture_output=True,
+            text=True,
+            cwd=work,
+            env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+            check=True,
+        )
+        elapsed = time.perf_counter() - start
+
+    failures: Dict[int, str] = {}
+    responses = [json.loads(line) for line in proc.stdout.splitlines()]
+    for response in responses:
+        if not response.get("ok"):
+            failures[response["id"]] = response.get("error", "?")
+            continue
+        for name, content in response["artifacts"].items():
+            if name in expected and content != expected[name]:
+                failures[response["id"]] = f"{name} differs from the serial compile"
+    if len(responses) != args.requests:
+        failures[-1] = f"{len(responses)} responses to {args.requests} requests"
+    print(f"{args.requests} requests, {args.jobs} workers: {elapsed:.2f} s")
+    for rid, error in sorted(failures.items()):
+        print(f"FAIL: request {rid}: {error}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("every response succeeded and matched the serial compile")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""CLI startup time and import-time budget for small inputs.
+
+Runs ``python -X importtime -m src.main --mode cli --stage S`` on a
+two-line program in a fresh interpreter per sample. Reports the best wall time, the
+total import time (sum of the ``self`` column) and the share of ``src.*``
+modules. ``--budget-ms`` fails the run (exit status 1) when the ``lexer``
+stage's import time exceeds it, or when that stage imports a module it must
+not need (tkinter, the grammar, the parser, the LALR(1) builder, the IR passes)::
+
+    python -m benchmarks.bench_startup --ref HEAD~1 --budget-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_tables import REPO_ROOT, _export_revision
+
+# Modules the lexer stage has no use for.
+LEXER_FORBIDDEN = (
+    "tkinter", "src.gui", "src.grammar", "src.parser", "src.lalr", "src.ast", "src.ir", "src.opt"
+)
+
+_PROGRAM = "x = 1 + 2;\ny = x * 3;\n"
+
+
+def _imports(stderr: str) -> Dict[str, int]:
+    """Self import time in microseconds per module, from ``-X importtime`` output."""
+    times: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def _measure(src_root: Path, stage: str, source: Path, repeat: int) -> Tuple[float, Dict[str, int]]:
+    cmd = [sys.executable, "-X", "importtime", "-m", "src.main", "--mode", "cli"]
+    cmd += ["--stage", stage, "--input", str(source)]
+    best_wall, best_imports = float("inf"), {}
+    for _ in range(repeat):
+        # A fresh out/ per run, so no stage is reused from a build manifest.
+        with tempfile.TemporaryDirectory() as work:
+            start = time.perf_counter()
+            proc = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                cwd=work,
+                env={"PYTHONPATH": str(src_root), "PATH": ""},
+                check=True,
+            )
+            wall = time.perf_counter() - start
+        if wall < best_wall:
+            best_wall, best_imports = wall, _imports(proc.stderr)
+    return best_wall, best_imports
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", nargs="+", default=["lexer", "codegen", "all"])
+    parser.add_argument("--repeat", type=int, default=10, help="runs per cell (best is kept)")
+    parser.add_argument("--ref", help="also measure src/ at this git revision")
+    parser.add_argument(
+        "--budget-ms", type=float, help="fail if the lexer stage's import time exceeds this"
+    )
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "small.min"
+        source.write_text(_PROGRAM, encoding="utf-8")
+        trees = [("working tree", REPO_ROOT)]
+        if args.ref:
+            trees.insert(0, (args.ref, _export_revision(args.ref, Path(tmp))))
+        print(f"{'tree':<14} {'stage':<8} {'wall ms':>8} {'import ms':>10} {'src ms':>7} {'modules':>8}")
+        for label, root in trees:
+            for stage in args.stages:
+                wall, imports = _measure(root, stage, source, args.repeat)
+                total = sum(imports.values()) / 1000
+                own = sum(us for name, us in imports.items() if name.startswith("src")) / 1000
+                print(
+                    f"{label:<14} {stage:<8} {wall * 1000:>8.1f} {total:>10.1f} {own:>7.1f} "
+                    f"{len(imports):>8}",
+                    flush=True,
+                )
+                if root != REPO_ROOT or stage != "lexer":
+                    continue
+                extra = sorted(set(LEXER_FORBIDDEN) & set(imports))
+                if extra:
+                    failures.append(f"lexer stage imports {', '.join(extra)}")
+                if args.budget_ms is not None and total > args.budget_ms:
+                    failures.append(
+                        f"lexer stage import time {total:.1f} ms exceeds {args.budget_ms:.1f} ms"
+                    )
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Incremental LALR(1) table rebuild versus a full build after a grammar edit.
+
+Builds tables for the synthetic grammar (see bench_tables), applies a small
+edit (adding ``Factor -> MINUS Factor`` to one copy, or dropping that copy's
+``Factor -> LPAREN Expr RPAREN``) and times rebuild_parse_tables seeded with
+the previous tables against build_parse_tables. Grammar analyses are dropped
+before every run so both sides pay for FIRST sets and item numbering::
+
+    python -m benchmarks.bench_table_rebuild --copies 1 10 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+from benchmarks.bench_tables import synthetic_grammar
+from src import lalr
+from src.grammar import Grammar, Production
+from src.tables import ParseTables
+
+
+def _edited(g: Grammar, kind: str) -> Grammar:
+    factor = "Factor"
+    prods = list(g.productions)
+    if kind == "add":
+        prods.append(Production(len(prods) + 1, factor, ("MINUS", factor)))
+    else:
+        prods = [p for p in prods if not (p.lhs == factor and p.rhs[0] == "LPAREN")]
+        prods = [Production(i + 1, p.lhs, p.rhs) for i, p in enumerate(prods)]
+    return Grammar(g.terminals, g.nonterminals, prods, g.start_symbol, g.augmented_start)
+
+
+def _best(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        lalr._ANALYSES.clear()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 30])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cell (best is kept)")
+    args = parser.parse_args(argv)
+
+    print(f"{'copies':>6} {'edit':<5} {'states':>7} {'reused':>7} {'full s':>8} {'rebuild s':>10}")
+    for copies in args.copies:
+        g = synthetic_grammar(copies)
+        # round-trip through JSON like a cached previous build
+        previous = ParseTables.from_json(lalr.build_parse_tables(grammar=g).to_json())
+        for kind in ("add", "drop"):
+            edited = _edited(g, kind)
+            full_s, full = _best(lambda: lalr.build_parse_tables(grammar=edited), args.repeat)
+            inc_s, (tables, stats) = _best(  # type: ignore[misc]
+                lambda: lalr.rebuild_parse_tables(previous, grammar=edited), args.repeat
+            )
+            assert tables == full, "incremental rebuild differs from a full build"
+            print(
+                f"{copies:>6} {kind:<5} {stats.states:>7} {stats.reused_rows:>7} "
+                f"{full_s:>8.3f} {inc_s:>10.3f}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
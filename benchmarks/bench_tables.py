@@ -0,0 +1,148 @@
+"""LALR(1) table-build timing on the MiniLang grammar and a synthetic 10x grammar.
+
+Every measurement runs in a fresh interpreter so memoized closures and the
+on-disk table cache never leak between runs; the timing covers importing
+``src.lalr`` plus one ``generate_tables`` call (which analyzes the grammar).
+
+``--ref REV`` additionally measures the ``src/`` tree of a git revision, so a
+before/after comparison is a single command::
+
+    python -m benchmarks.bench_tables --ref HEAD~1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Symbols shared by every copy in the synthetic grammar; everything else is
+# renamed per copy so the copies are disjoint sub-languages hanging off Stmt.
+_SHARED_SYMBOLS = {"S'", "Program", "StmtList", "Stmt", "EOF"}
+
+
+def synthetic_grammar(copies: int = 10):
+    """Return a conflict-free grammar roughly ``copies`` times the size of GRAMMAR.
+
+    Copy ``k`` renames every terminal and nonterminal except the shared
+    program skeleton (``S'``, ``Program``, ``StmtList``, ``Stmt``, ``EOF``)
+    with a ``_k`` suffix; copy 0 keeps the original names.
+    """
+    from src.grammar import GRAMMAR, Grammar, Production
+
+    def rename(sym: str, k: int) -> str:
+        return sym if k == 0 or sym in _SHARED_SYMBOLS else f"{sym}_{k}"
+
+    productions: List[Production] = []
+    terminals = set()
+    nonterminals = set()
+    seen_shared = set()
+    for k in range(copies):
+        for p in GRAMMAR.productions:
+            lhs = rename(p.lhs, k)
+            rhs = tuple(rename(sym, k) for sym in p.rhs)
+            if p.lhs in _SHARED_SYMBOLS and p.lhs != "Stmt":
+                # S' / Program / StmtList productions exist once.
+                if (lhs, rhs) in seen_shared:
+                    continue
+                seen_shared.add((lhs, rhs))
+            productions.append(Production(len(productions) + 1, lhs, rhs))
+        terminals |= {rename(t, k) for t in GRAMMAR.terminals}
+        nonterminals |= {rename(nt, k) for nt in GRAMMAR.nonterminals}
+    return Grammar(
+        terminals=terminals,
+        nonterminals=nonterminals,
+        productions=productions,
+        start_symbol=GRAMMAR.start_symbol,
+        augmented_start=GRAMMAR.augmented_start,
+    )
+
+
+_RUNNER = r"""
+import json, sys, time
+copies, method = int(sys.argv[1]), sys.argv[2]
+import src.grammar
+if copies > 1:
+    from benchmarks.bench_tables import synthetic_grammar
+    src.grammar.GRAMMAR = synthetic_grammar(copies)
+start = time.perf_counter()
+import src.lalr as lalr
+try:
+    result = lalr.generate_tables(verbose=False, method=method)
+except TypeError:  # revisions before selectable table methods
+    if method != "canonical":
+        print(json.dumps(None)); sys.exit(0)
+    result = lalr.generate_tables(verbose=False)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "states": len(result[0])}))
+"""
+
+
+def _measure(src_root: Path, copies: int, method: str, repeat: int) -> Dict[str, float] | None:
+    best: Dict[str, float] | None = None
+    env_path = f"{src_root}{':' + str(REPO_ROOT) if src_root != REPO_ROOT else ''}"
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _RUNNER, str(copies), method],
+            capture_output=True,
+            text=True,
+            cwd=src_root,  # "-c" puts the cwd first on sys.path
+            env={"PYTHONPATH": env_path, "PATH": ""},
+            check=True,
+        )
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        if sample is None:
+            return None
+        if best is None or sample["seconds"] < best["seconds"]:
+            best = sample
+    return best
+
+
+def _export_revision(ref: str, dest: Path) -> Path:
+    archive = subprocess.run(
+        ["git", "-C", str(REPO_ROOT), "archive", ref, "src"], capture_output=True, check=True
+    )
+    subprocess.run(["tar", "-x", "-C", str(dest)], input=archive.stdout, check=True)
+    return dest
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=10, help="synthetic grammar scale")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cell (best is kept)")
+    parser.add_argument("--ref", help="also measure src/ at this git revision")
+    args = parser.parse_args(argv)
+
+    trees = [("working tree", REPO_ROOT)]
+    tmp = None
+    if args.ref:
+        tmp = tempfile.TemporaryDirectory()
+        trees.insert(0, (args.ref, _export_revision(args.ref, Path(tmp.name))))
+
+    print(f"{'tree':<14} {'grammar':<12} {'method':<10} {'states':>7} {'seconds':>9}")
+    try:
+        for label, root in trees:
+            for copies, gname in ((1, "minilang"), (args.copies, f"synthetic{args.copies}x")):
+                for method in ("canonical", "deremer"):
+                    res = _measure(root, copies, method, args.repeat)
+                    if res is None:
+                        print(f"{label:<14} {gname:<12} {method:<10} {'-':>7} {'n/a':>9}", flush=True)
+                        continue
+                    print(
+                        f"{label:<14} {gname:<12} {method:<10} "
+                        f"{res['states']:>7} {res['seconds']:>9.3f}",
+                        flush=True,
+                    )
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Concurrent in-memory compiles from one process: determinism stress test.
+
+Compiles a mix of ``benchmarks.synth`` programs (plus one with a syntax error)
+with ``src.api.compile_source`` on ``--threads`` threads for ``--rounds``
+rounds, and checks every result against a serial compile of the same input.
+The first round starts all threads together on a cold process, so they race
+to load the shared parse tables. Exits with status 1 if any artifact or error
+message differs, or a compile raises anything but ``UserError``. The timings
+show the speed-up threads give on this interpreter (none while the GIL is on)::
+
+    python -m benchmarks.bench_threads --threads 8 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from benchmarks.synth import SHAPES, generate
+from src.api import compile_source
+from src.utils import TraceOptions, UserError
+
+_SIZES = {"assign": 400, "expr": 60, "nested": 30, "boolean": 200}
+_TRACE = TraceOptions(mode="sampled", every=25)
+
+
+def _inputs(count: int) -> List[Tuple[str, str]]:
+    inputs = [("syntax-error", "x = 1;\ny = (x + ;\n")]
+    shapes = sorted(SHAPES)
+    for i in range(count - 1):
+        shape = shapes[i % len(shapes)]
+        seed = i // len(shapes)
+        size = _SIZES[shape] + 7 * seed
+        inputs.append((f"{shape}-{size}-s{seed}", generate(shape, size, seed)))
+    return inputs
+
+
+def _digest(text: str) -> str:
+    """Hash of every artifact, or of the error message."""
+    try:
+        artifacts = compile_source(text, trace=_TRACE).artifacts()
+    except UserError as exc:
+        return f"error: {exc}"
+    h = hashlib.sha256()
+    for name, content in artifacts.items():
+        h.update(f"{name}\0{content}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _threaded(
+    inputs: List[Tuple[str, str]], threads: int, barrier: threading.Barrier | None
+) -> Tuple[float, List[str]]:
+    def task(text: str) -> str:
+        if barrier is not None and not barrier.broken:
+            try:
+                barrier.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                pass  # fewer workers got a first task than expected
+        return _digest(text)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        digests = list(pool.map(task, (text for _, text in inputs)))
+    return time.perf_counter() - start, digests
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--inputs", type=int, default=32, help="programs compiled per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    inputs = _inputs(max(args.inputs, args.threads))
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{len(inputs)} inputs, {args.threads} threads, GIL {'on' if gil else 'off'}")
+
+    # Round 0 runs before anything has loaded the tables; the barrier releases
+    # the first wave of threads together.
+    barrier = threading.Barrier(args.threads)
+    rounds = [_threaded(inputs, args.threads, barrier)]
+    start = time.perf_counter()
+    expected = [_digest(text) for _, text in inputs]
+    serial = time.perf_counter() - start
+    rounds += [_threaded(inputs, args.threads, None) for _ in range(args.rounds - 1)]
+
+    mismatches: Dict[str, int] = {}
+    for _, digests in rounds:
+        for (name, _), got, want in zip(inputs, digests, expected):
+            if got != want:
+                mismatches[name] = mismatches.get(name, 0) + 1
+    best = min(elapsed for elapsed, _ in rounds[1:]) if len(rounds) > 1 else rounds[0][0]
+    print(f"serial          {serial:8.3f} s")
+    print(f"threaded (cold) {rounds[0][0]:8.3f} s")
+    print(f"threaded (best) {best:8.3f} s   speed-up {serial / best:.2f}x")
+    for name, count in sorted(mismatches.items()):
+        print(f"FAIL: {name} differed from the serial result in {count} round(s)", file=sys.stderr)
+    if mismatches:
+        sys.exit(1)
+    print(f"all {len(inputs) * len(rounds)} threaded compiles matched the serial results")
+
+
+if __name__ == "__main__":
+    main()
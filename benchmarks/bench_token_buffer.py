@@ -0,0 +1,51 @@
+"""Peak memory per 1M tokens: ``Token`` list versus ``TokenBuffer``.
+
+Lexes one generated program with ``tokenize_text`` and with
+``TokenBuffer.from_text`` and prints the peak Python allocation of each
+(``tracemalloc``, source text excluded) scaled to one million tokens, plus
+lex time without tracing::
+
+    python -m benchmarks.bench_token_buffer --statements 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List, Sized
+
+from benchmarks.synth import make_program
+from src.lexer import TokenBuffer, tokenize_text
+
+
+def _peak(fn: Callable[[str], Sized], text: str) -> tuple[float, int]:
+    tracemalloc.start()
+    tokens = fn(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, len(tokens)
+
+
+def _seconds(fn: Callable[[str], Sized], text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - start
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    text = make_program(args.statements)
+    print(f"{len(text) / 1e6:.1f} MB source")
+    print(f"{'tokens as':<12} {'tokens':>9} {'MB per 1M tokens':>17} {'lex s':>7}")
+    for label, fn in (("Token list", tokenize_text), ("TokenBuffer", TokenBuffer.from_text)):
+        peak, count = _peak(fn, text)
+        per_million = peak / count * 1e6 / 1e6
+        print(f"{label:<12} {count:>9} {per_million:>17.1f} {_seconds(fn, text):>7.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
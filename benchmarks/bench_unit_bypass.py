@@ -0,0 +1,45 @@
+"""Parser steps per token with and without unit-reduction bypass.
+
+Parses the same expression-heavy program with the full LALR(1) tables and with
+identity unit reductions (``Term -> Factor``, ``NotExpr -> RelExpr``, ...)
+folded into GOTO, checks that both produce the same AST, and prints shift/
+reduce steps per token and parse time::
+
+    python -m benchmarks.bench_unit_bypass --statements 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+from benchmarks.synth import make_program
+from src.lexer import tokenize_text
+from src.parser import load_parser_runtime, parse_tokens
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statements", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    tokens = tokenize_text(make_program(args.statements))
+    print(f"{len(tokens)} tokens")
+    print(f"{'tables':>8} {'steps':>10} {'steps/token':>12} {'parse s':>8}")
+    programs = []
+    for label, unit_bypass in (("full", False), ("bypass", True)):
+        load_parser_runtime(unit_bypass)  # table loading is not part of the timing
+        start = time.perf_counter()
+        result = parse_tokens(tokens, unit_bypass=unit_bypass)
+        elapsed = time.perf_counter() - start
+        programs.append(result.program)
+        print(
+            f"{label:>8} {result.steps:>10} {result.steps / len(tokens):>12.2f} {elapsed:>8.2f}",
+            flush=True,
+        )
+    assert programs[0] == programs[1], "unit bypass changed the AST"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Synthetic MiniLang programs of configurable size and shape.
+
+``generate(shape, size)`` returns source text; ``size`` is the number of
+statements for ``assign`` and the depth or width of the one construct the
+other shapes grow:
+
+- ``assign``: a run of assignments mixing constants, copies and arithmetic
+  (the optimizer's folding and propagation work);
+- ``expr``: one expression ``size`` parentheses deep;
+- ``nested``: ``size`` levels of alternating ``if``/``else`` and ``while``;
+- ``boolean``: an ``if`` whose condition is ``size`` comparisons joined by
+  alternating ``and``/``or``.
+
+``make_program(statements)`` is the fixed mix of assignments, ``if``/``else``
+and ``while`` the lexer and parser benchmarks measure throughput on, and
+``make_block_program(statements)`` puts half of its statements in one ``while``
+body, for edits inside and outside a block.
+
+Programs are deterministic for a given ``seed``, so timings are comparable
+across runs and revisions::
+
+    python -m benchmarks.synth nested 200 > /tmp/nested.min
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from typing import Callable, Dict, List
+
+_OPS = ("+", "-", "*")
+_RELOPS = ("<", ">", "<=", ">=", "==", "!=")
+
+
+def _assign(size: int, rng: random.Random) -> str:
+    lines = ["x = 1;", "y = 2;"]
+    for i in range(size):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"c{i} = {rng.randint(1, 9)} {rng.choice(_OPS)} {rng.randint(1, 9)};")
+        elif kind == 1:
+            lines.append(f"c{i} = c{i - 1};")
+        elif kind == 2:
+            lines.append(f"c{i} = c{i - 1} {rng.choice(_OPS)} x;")
+        else:
+            lines.append(f"x = c{i - 1} {rng.choice(_OPS)} y;")
+    return "\n".join(lines) + "\n"
+
+
+def _expr(size: int, rng: random.Random) -> str:
+    expr = "a"
+    for i in range(size):
+        operand = rng.choice(("a", "b", str(rng.randint(1, 9))))
+        op = rng.choice(_OPS)
+        expr = f"({expr} {op} {operand})" if i % 2 else f"({operand} {op} {expr})"
+    return f"a = 1;\nb = 2;\nx = {expr};\n"
+
+
+def _nested(size: int, rng: random.Random) -> str:
+    opened: List[str] = []
+    lines = ["x = 0;", "n = 10;"]
+    for i in range(size):
+        indent = "  " * i
+        if i % 2 == 0:
+            lines.append(f"{indent}if (x {rng.choice(_RELOPS)} {i}) {{")
+            opened.append("if")
+        else:
+            lines.append(f"{indent}while (n > {i}) {{")
+            opened.append("while")
+        lines.append(f"{indent}  x = x + {i % 7 + 1};")
+    for i in reversed(range(size)):
+        indent = "  " * i
+        if opened[i] == "if":
+            lines.append(f"{indent}}} else {{")
+            lines.append(f"{indent}  x = x - {i % 5 + 1};")
+        else:
+            lines.append(f"{indent}  n = n - 1;")
+        lines.append(f"{indent}}}")
+    return "\n".join(lines) + "\n"
+
+
+def _boolean(size: int, rng: random.Random) -> str:
+    terms = []
+    for i in range(max(1, size)):
+        term = f"v{i % 16} {rng.choice(_RELOPS)} {rng.randint(0, 9)}"
+        terms.append(f"not {term}" if i % 5 == 4 else term)
+    cond = terms[0]
+    for i, term in enumerate(terms[1:]):
+        cond += f" {'and' if i % 2 else 'or'} {term}"
+    init = "".join(f"v{i} = {i};\n" for i in range(16))
+    return f"{init}if ({cond}) {{\n  r = 1;\n}} else {{\n  r = 0;\n}}\n"
+
+
+SHAPES: Dict[str, Callable[[int, random.Random], str]] = {
+    "assign": _assign,
+    "expr": _expr,
+    "nested": _nested,
+    "boolean": _boolean,
+}
+
+
+def generate(shape: str, size: int, seed: int = 0) -> str:
+    """Return a MiniLang program of ``shape`` grown to ``size``."""
+    try:
+        build = SHAPES[shape]
+    except KeyError:
+        raise ValueError(f"unknown shape '{shape}' (expected one of {', '.join(SHAPES)})") from None
+    return build(size, random.Random(seed))
+
+
+_STATEMENTS = (
+    "x{i} = a + b * (c - {i}) / d;\n",
+    "if (x{i} < y and not z == {i} or w != 0) {{ y = y + 1; }} else y = 0;\n",
+    "while (n > {i}) n = n - 1;\n",
+)
+
+
+def make_program(statements: int) -> str:
+    return "".join(_STATEMENTS[i % len(_STATEMENTS)].format(i=i) for i in range(statements))
+
+
+def make_block_program(statements: int) -> str:
+    half = statements // 2
+    top = "".join(f"x{i} = {i} + y;\n" for i in range(half))
+    body = "".join(f"  z{i} = z{i} * 2;\n" for i in range(statements - half))
+    return top + "while (a < 10) {\n" + body + "}\n"
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("shape", choices=sorted(SHAPES))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(generate(args.shape, args.size, args.seed), end="")
+
+
+if __name__ == "__main__":
+    main()
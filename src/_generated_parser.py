@@ -0,0 +1,507 @@
+"""
+Generated by ``python -m src.parsergen``; do not edit by hand.
+
+LALR(1) tables and per-production reduce functions for the MiniLang grammar.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import List
+
+from . import ast as ast_nodes
+from .grammar import grammar_hash
+from .parser import reducers_hash
+from .tables import CompiledTables
+
+GRAMMAR_HASH = "37e7ad3affe6ec9cb9767231ed0c819eb4706c5c4c0bfe835dee72202f015240"
+REDUCERS_HASH = "462feaa91e314d2faae8a68fded0c2125e732ce3604e2a01805459bf5fb285a4"
+
+if grammar_hash() != GRAMMAR_HASH:
+    raise ImportError(
+        "src._generated_parser is stale: the grammar changed since it was generated "
+        "(regenerate with `python -m src.parsergen`)"
+    )
+if reducers_hash() != REDUCERS_HASH:
+    raise ImportError(
+        "src._generated_parser is stale: the semantic actions in src.parser or the generator "
+        "changed since it was generated (regenerate with `python -m src.parsergen`)"
+    )
+
+
+TERMINALS = ["AND", "ASSIGN", "DIV", "ELSE", "EQ", "GE", "GT", "ID", "IF", "LBRACE", "LE", "LPAREN", "LT", "MINUS", "MUL", "NE", "NOT", "NUM", "OR", "PLUS", "RBRACE", "RPAREN", "SEMI", "WHILE", "EOF"]
+NONTERMINALS = ["AndExpr", "AssignStmt", "Block", "Bool", "Expr", "Factor", "Matched", "NotExpr", "OrExpr", "Program", "RelExpr", "Stmt", "StmtList", "Term", "Unmatched"]
+N_STATES = 73
+
+# ACTION: per-state default reduction plus comb-packed explicit entries
+# (0 error, v > 0 shift to v - 1, -1 accept, v < -1 reduce by production -v).
+ACTION_DEFAULT = array("i", [
+    -4, 0, -2, 0, 0, 0, -4, 0, -7, -9, -5, -3, -6, 0, 0, 0,
+    0, -22, 0, -23, 0, -21, -18, 0, 0, -27, 0, 0, -29, -25, -32, -15,
+    0, 0, 0, 0, -14, 0, 0, 0, 0, -30, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, -24, -17, -16, -20, -19, -31, -28, -5, -11, -33, -38, -36,
+    -37, -35, -34, -26, -8, -13, 0, -10, -12,
+])
+
+ACTION_BASE = array("i", [
+    -1, 9, 21, 13, 0, 0, -1, 48, -1, -1, -1, -1, -1, 69, 25, 0,
+    32, -1, 80, -1, 32, -1, 0, 39, 46, 0, 40, 12, -1, 53, -1, -1,
+    69, 75, 88, 93, -1, 95, 96, 71, 0, -1, 53, 58, 104, 107, 109, 112,
+    120, 121, 61, 66, -1, 24, 33, -1, -1, -1, -1, 0, -1, 21, 39, 66,
+    117, 120, 121, 93, -1, -1, 75, -1, -1,
+])
+
+ACTION_TABLE = array("i", [
+    43, 14, 38, 71, 45, 46, 47, 5, 6, 7, 48, 15, 49, 35, 39, 50,
+    45, 46, 47, 36, 32, 53, 48, 8, 49, 35, 38, 50, 5, 6, 7, 36,
+    18, 4, 35, 38, 24, -1, 39, 18, 36, 25, 20, 24, 8, 35, 18, 39,
+    25, 20, 24, 36, 35, 18, 37, 25, 20, 24, 36, 17, 18, 44, 25, 20,
+    24, 5, 6, 7, 18, 25, 20, 51, 24, 5, 6, 7, 18, 25, 20, 35,
+    19, 8, 5, 6, 7, 36, 20, 18, 35, 8, 52, 19, 58, 43, 36, 18,
+    53, 20, 8, 19, 18, 0, 18, 18, 19, 20, 19, 19, 0, 0, 20, 18,
+    20, 20, 18, 19, 18, 0, 19, 18, 19, 20, 0, 19, 20, 0, 20, 18,
+    18, 20, 35, 19, 19, 35, 35, 0, 36, 20, 20, 36, 36, 0, 0, 0,
+    0, 0,
+])
+
+ACTION_CHECK = array("i", [
+    25, 4, 22, 59, 40, 40, 40, 15, 15, 15, 40, 5, 40, 40, 22, 40,
+    27, 27, 27, 40, 15, 40, 27, 15, 27, 27, 53, 27, 2, 2, 2, 27,
+    14, 1, 61, 54, 14, 3, 53, 16, 61, 14, 14, 16, 2, 20, 23, 54,
+    16, 16, 23, 20, 62, 24, 20, 23, 23, 24, 62, 7, 42, 26, 24, 24,
+    42, 43, 43, 43, 50, 42, 42, 29, 50, 51, 51, 51, 13, 50, 50, 63,
+    13, 43, 70, 70, 70, 63, 13, 18, 33, 51, 32, 18, 39, 67, 33, 34,
+    33, 18, 70, 34, 35, -1, 37, 38, 35, 34, 37, 38, -1, -1, 35, 44,
+    37, 38, 45, 44, 46, -1, 45, 47, 46, 44, -1, 47, 45, -1, 46, 48,
+    49, 47, 64, 48, 49, 65, 66, -1, 64, 48, 49, 65, 66, -1, -1, -1,
+    -1, -1,
+])
+
+# GOTO: per-nonterminal default target plus comb-packed exceptions.
+GOTO_DEFAULT = array("i", [
+    25, 11, 11, 26, 27, 22, 11, 25, 29, 1, 25, 11, 2, 22, 11,
+])
+
+GOTO_BASE = array("i", [
+    5, 0, 7, 1, 0, 0, 9, 12, 0, 0, 15, 13, 0, 6, 10,
+])
+
+GOTO_TABLE = array("i", [
+    -1, -1, -1, -1, -1, -1, 15, -1, -1, -1, -1, -1, -1, 20, -1, -1,
+    -1, 32, 33, -1, -1, -1, -1, 40, 39, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, 53, 54, 41, 55, 56, 41, 53, 54, -1, 59, 61, 62, 63, 64,
+    65, 66, 59, 68, 59, 60, 58, 67, 60, 58, 68, -1, 68, 69, 67, -1,
+    -1, 67, -1, -1, -1, -1, 71, -1, -1, -1, -1, -1, -1, 71, -1, 71,
+    72, -1, -1, -1, -1, -1, -1, -1,
+])
+
+GOTO_CHECK = array("i", [
+    -1, -1, -1, -1, -1, -1, 12, -1, -1, -1, -1, -1, -1, 4, -1, -1,
+    -1, 3, 4, -1, -1, -1, -1, 4, 3, -1, -1, -1, -1, -1, -1, -1,
+    -1, -1, 5, 5, 7, 5, 5, 10, 13, 13, -1, 1, 4, 4, 4, 4,
+    4, 4, 2, 1, 6, 14, 7, 0, 11, 10, 2, -1, 6, 14, 7, -1,
+    -1, 10, -1, -1, -1, -1, 1, -1, -1, -1, -1, -1, -1, 2, -1, 6,
+    14, -1, -1, -1, -1, -1, -1, -1,
+])
+
+# Terminal bitmask of each state's real ACTION entries (error reporting).
+VALID = [
+    25166720, 16777216, 25166720, 16777216, 2, 2048, 9438080, 2048,
+    26215304, 26215304, 26215296, 26215296, 26215296, 133248, 198784, 9438080,
+    198784, 7140469, 133248, 7140469, 4726784, 7140469, 7140469, 198784,
+    198784, 2359297, 2097152, 570480, 2359297, 2359296, 2359297, 26215304,
+    2097152, 2629632, 133248, 133248, 26215304, 133248, 133248, 2097152,
+    2667632, 2359297, 198784, 8389504, 133248, 133248, 133248, 133248,
+    133248, 133248, 198784, 8389504, 7140469, 7140469, 7140469, 7140469,
+    7140469, 2359297, 2359297, 26215304, 26215296, 2891777, 2891777, 2891777,
+    2891777, 2891777, 2891777, 2359297, 26215304, 26215296, 8389504, 26215304,
+    26215296,
+]
+
+PROD_LHS = array("i", [
+    -1, -1, 9, 12, 12, 11, 11, 6, 6, 6, 6, 14, 14, 14, 1, 2,
+    4, 4, 4, 13, 13, 13, 5, 5, 5, 3, 8, 8, 0, 0, 7, 7,
+    7, 10, 10, 10, 10, 10, 10,
+])
+
+PROD_LEN = array("i", [
+    0, 2, 1, 2, 0, 1, 1, 1, 5, 1, 7, 5, 7, 5, 4, 3,
+    3, 3, 1, 3, 3, 1, 1, 1, 3, 1, 3, 1, 3, 1, 2, 3,
+    1, 3, 3, 3, 3, 3, 3,
+])
+
+PROD_LHS_NAME = ["", "S'", "Program", "StmtList", "StmtList", "Stmt", "Stmt", "Matched", "Matched", "Matched", "Matched", "Unmatched", "Unmatched", "Unmatched", "AssignStmt", "Block", "Expr", "Expr", "Expr", "Term", "Term", "Term", "Factor", "Factor", "Factor", "Bool", "OrExpr", "OrExpr", "AndExpr", "AndExpr", "NotExpr", "NotExpr", "NotExpr", "RelExpr", "RelExpr", "RelExpr", "RelExpr", "RelExpr", "RelExpr"]
+# (state, nonterminal) GOTO entries that fold in unit reductions -> skipped productions.
+UNIT_CHAINS = {
+    (2, 1): (7, 5),
+    (2, 2): (9, 5),
+    (2, 6): (5,),
+    (2, 14): (6,),
+    (13, 5): (21,),
+    (14, 5): (21,),
+    (14, 7): (29,),
+    (14, 10): (32, 29),
+    (15, 1): (7, 5),
+    (15, 2): (9, 5),
+    (15, 6): (5,),
+    (15, 14): (6,),
+    (16, 5): (21,),
+    (16, 7): (29,),
+    (16, 10): (32, 29),
+    (18, 5): (21,),
+    (23, 5): (21,),
+    (23, 7): (29,),
+    (23, 10): (32, 29),
+    (24, 5): (21,),
+    (24, 10): (32,),
+    (34, 5): (21,),
+    (35, 5): (21,),
+    (42, 5): (21,),
+    (42, 10): (32,),
+    (43, 1): (7,),
+    (43, 2): (9,),
+    (43, 14): (6,),
+    (44, 5): (21,),
+    (45, 5): (21,),
+    (46, 5): (21,),
+    (47, 5): (21,),
+    (48, 5): (21,),
+    (49, 5): (21,),
+    (50, 5): (21,),
+    (50, 7): (29,),
+    (50, 10): (32, 29),
+    (51, 1): (7,),
+    (51, 2): (9,),
+    (70, 1): (7,),
+    (70, 2): (9,),
+}
+# The same entries -> unit-reduction states they skip (error reporting).
+UNIT_STATES = {
+    (2, 1): (8, 10),
+    (2, 2): (9, 10),
+    (2, 6): (10,),
+    (2, 14): (12,),
+    (13, 5): (21,),
+    (14, 5): (21,),
+    (14, 7): (28,),
+    (14, 10): (30, 28),
+    (15, 1): (8, 10),
+    (15, 2): (9, 10),
+    (15, 6): (10,),
+    (15, 14): (12,),
+    (16, 5): (21,),
+    (16, 7): (28,),
+    (16, 10): (30, 28),
+    (18, 5): (21,),
+    (23, 5): (21,),
+    (23, 7): (28,),
+    (23, 10): (30, 28),
+    (24, 5): (21,),
+    (24, 10): (30,),
+    (34, 5): (21,),
+    (35, 5): (21,),
+    (42, 5): (21,),
+    (42, 10): (30,),
+    (43, 1): (8,),
+    (43, 2): (9,),
+    (43, 14): (12,),
+    (44, 5): (21,),
+    (45, 5): (21,),
+    (46, 5): (21,),
+    (47, 5): (21,),
+    (48, 5): (21,),
+    (49, 5): (21,),
+    (50, 5): (21,),
+    (50, 7): (28,),
+    (50, 10): (30, 28),
+    (51, 1): (8,),
+    (51, 2): (9,),
+    (70, 1): (8,),
+    (70, 2): (9,),
+}
+
+TABLES = CompiledTables(
+    terminals=TERMINALS,
+    nonterminals=NONTERMINALS,
+    term_index={t: i for i, t in enumerate(TERMINALS)},
+    nonterm_index={nt: i for i, nt in enumerate(NONTERMINALS)},
+    n_states=N_STATES,
+    n_terms=len(TERMINALS),
+    n_nonterms=len(NONTERMINALS),
+    action_default=ACTION_DEFAULT,
+    action_base=ACTION_BASE,
+    action_table=ACTION_TABLE,
+    action_check=ACTION_CHECK,
+    goto_default=GOTO_DEFAULT,
+    goto_base=GOTO_BASE,
+    goto_table=GOTO_TABLE,
+    goto_check=GOTO_CHECK,
+    valid=VALID,
+    prod_lhs=PROD_LHS,
+    prod_len=PROD_LEN,
+    prod_lhs_name=PROD_LHS_NAME,
+    unit_chains=UNIT_CHAINS,
+    unit_states=UNIT_STATES,
+)
+
+
+# 1: S' -> Program EOF
+def reduce_1(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 2: Program -> StmtList
+def reduce_2(v: List[object]) -> object:
+    # Program -> StmtList
+    return ast_nodes.Program(stmts=v[0])  # type: ignore[arg-type]
+
+
+# 3: StmtList -> StmtList Stmt
+def reduce_3(v: List[object]) -> object:
+    # StmtList -> StmtList Stmt (left-recursive: append in place, O(1) per statement)
+    stmts: List[ast_nodes.Stmt] = v[0]  # type: ignore[assignment]
+    stmts.append(v[1])  # type: ignore[arg-type]
+    return stmts
+
+
+# 4: StmtList -> ε
+def reduce_4(v: List[object]) -> object:
+    # StmtList -> ε
+    return []
+
+
+# 5: Stmt -> Matched
+def reduce_5(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 6: Stmt -> Unmatched
+def reduce_6(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 7: Matched -> AssignStmt
+def reduce_7(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 8: Matched -> WHILE LPAREN Bool RPAREN Matched
+def reduce_8(v: List[object]) -> object:
+    # Matched/Unmatched -> WHILE LPAREN Bool RPAREN body
+    return ast_nodes.While(cond=v[2], body=v[4])  # type: ignore[arg-type]
+
+
+# 9: Matched -> Block
+def reduce_9(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 10: Matched -> IF LPAREN Bool RPAREN Matched ELSE Matched
+def reduce_10(v: List[object]) -> object:
+    # Matched/Unmatched -> IF LPAREN Bool RPAREN Matched ELSE stmt
+    return ast_nodes.If(cond=v[2], then_branch=v[4], else_branch=v[6])  # type: ignore[arg-type]
+
+
+# 11: Unmatched -> IF LPAREN Bool RPAREN Stmt
+def reduce_11(v: List[object]) -> object:
+    # Unmatched -> IF LPAREN Bool RPAREN Stmt
+    return ast_nodes.If(cond=v[2], then_branch=v[4], else_branch=None)  # type: ignore[arg-type]
+
+
+# 12: Unmatched -> IF LPAREN Bool RPAREN Matched ELSE Unmatched
+def reduce_12(v: List[object]) -> object:
+    # Matched/Unmatched -> IF LPAREN Bool RPAREN Matched ELSE stmt
+    return ast_nodes.If(cond=v[2], then_branch=v[4], else_branch=v[6])  # type: ignore[arg-type]
+
+
+# 13: Unmatched -> WHILE LPAREN Bool RPAREN Unmatched
+def reduce_13(v: List[object]) -> object:
+    # Matched/Unmatched -> WHILE LPAREN Bool RPAREN body
+    return ast_nodes.While(cond=v[2], body=v[4])  # type: ignore[arg-type]
+
+
+# 14: AssignStmt -> ID ASSIGN Expr SEMI
+def reduce_14(v: List[object]) -> object:
+    # AssignStmt -> ID ASSIGN Expr SEMI
+    return ast_nodes.Assign(name=v[0].lexeme, expr=v[2])  # type: ignore[attr-defined,arg-type]
+
+
+# 15: Block -> LBRACE StmtList RBRACE
+def reduce_15(v: List[object]) -> object:
+    # Block -> LBRACE StmtList RBRACE
+    return ast_nodes.Block(stmts=v[1])  # type: ignore[arg-type]
+
+
+# 16: Expr -> Expr PLUS Term
+def reduce_16(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="ADD", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 17: Expr -> Expr MINUS Term
+def reduce_17(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="SUB", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 18: Expr -> Term
+def reduce_18(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 19: Term -> Term MUL Factor
+def reduce_19(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="MUL", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 20: Term -> Term DIV Factor
+def reduce_20(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="DIV", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 21: Term -> Factor
+def reduce_21(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 22: Factor -> ID
+def reduce_22(v: List[object]) -> object:
+    # Factor -> ID
+    return ast_nodes.Id(name=v[0].lexeme)  # type: ignore[attr-defined]
+
+
+# 23: Factor -> NUM
+def reduce_23(v: List[object]) -> object:
+    # Factor -> NUM
+    return ast_nodes.Num(value=v[0].lexeme)  # type: ignore[attr-defined]
+
+
+# 24: Factor -> LPAREN Expr RPAREN
+def reduce_24(v: List[object]) -> object:
+    # Factor -> LPAREN Expr RPAREN / NotExpr -> LPAREN Bool RPAREN
+    return v[1]
+
+
+# 25: Bool -> OrExpr
+def reduce_25(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 26: OrExpr -> OrExpr OR AndExpr
+def reduce_26(v: List[object]) -> object:
+    return ast_nodes.LogicOp(op="OR", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 27: OrExpr -> AndExpr
+def reduce_27(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 28: AndExpr -> AndExpr AND NotExpr
+def reduce_28(v: List[object]) -> object:
+    return ast_nodes.LogicOp(op="AND", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 29: AndExpr -> NotExpr
+def reduce_29(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 30: NotExpr -> NOT NotExpr
+def reduce_30(v: List[object]) -> object:
+    # NotExpr -> NOT NotExpr
+    return ast_nodes.Not(expr=v[1])  # type: ignore[arg-type]
+
+
+# 31: NotExpr -> LPAREN Bool RPAREN
+def reduce_31(v: List[object]) -> object:
+    # Factor -> LPAREN Expr RPAREN / NotExpr -> LPAREN Bool RPAREN
+    return v[1]
+
+
+# 32: NotExpr -> RelExpr
+def reduce_32(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+# 33: RelExpr -> Expr EQ Expr
+def reduce_33(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_EQ", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 34: RelExpr -> Expr NE Expr
+def reduce_34(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_NE", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 35: RelExpr -> Expr LT Expr
+def reduce_35(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_LT", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 36: RelExpr -> Expr GT Expr
+def reduce_36(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_GT", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 37: RelExpr -> Expr LE Expr
+def reduce_37(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_LE", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# 38: RelExpr -> Expr GE Expr
+def reduce_38(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_GE", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+# Indexed by production id (0 is unused).
+REDUCERS = (
+    None,
+    reduce_1,
+    reduce_2,
+    reduce_3,
+    reduce_4,
+    reduce_5,
+    reduce_6,
+    reduce_7,
+    reduce_8,
+    reduce_9,
+    reduce_10,
+    reduce_11,
+    reduce_12,
+    reduce_13,
+    reduce_14,
+    reduce_15,
+    reduce_16,
+    reduce_17,
+    reduce_18,
+    reduce_19,
+    reduce_20,
+    reduce_21,
+    reduce_22,
+    reduce_23,
+    reduce_24,
+    reduce_25,
+    reduce_26,
+    reduce_27,
+    reduce_28,
+    reduce_29,
+    reduce_30,
+    reduce_31,
+    reduce_32,
+    reduce_33,
+    reduce_34,
+    reduce_35,
+    reduce_36,
+    reduce_37,
+    reduce_38,
+)
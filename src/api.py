@@ -0,0 +1,141 @@
+"""
+In-memory compile API: source text in, artifacts out, no filesystem access.
+
+``compile_source(text, stages=...)`` runs the requested stages on a
+``CompilationSession`` built from the text and returns a ``CompileResult``
+holding the tokens, symbol table, AST, parse trace, quads, CFG, optimized
+quads, optimizer report and assembly as objects. ``CompileResult.artifacts()``
+renders them to the same text the pipeline writes to each output file, and
+``CompileResult.write(out_dir)`` writes those files, which is the only step
+that touches the disk::
+
+    result = compile_source("x = 1 + 2;", stages=("opt", "codegen"))
+    print(result.asm)
+    result.write("build/snippet")
+
+The ``table`` stage is not per-source and is left to ``run_stage``.
+
+``compile_source`` is thread-safe: each call has its own session, and the
+shared tables are loaded once, by whichever call needs them first.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from .session import CompilationSession
+from .utils import TraceOptions, UserError, format_symtab, format_tokens_csv, write_text_file
+
+if TYPE_CHECKING:
+    from . import ast as ast_nodes
+    from .cfg import BasicBlock
+    from .ir import IRBuilder
+    from .lexer import SymbolEntry, TokenBuffer
+    from .opt import OptResult
+
+SOURCE_STAGES = ("lexer", "parse", "ir", "cfg", "opt", "codegen")
+
+
+@dataclass
+class CompileResult:
+    """Artifacts of the stages asked for; those of other stages are ``None``."""
+
+    stages: List[str]
+    session: CompilationSession = field(repr=False)
+    tokens: TokenBuffer | None = None
+    symbols: List[SymbolEntry] | None = None
+    program: ast_nodes.Program | None = None
+    trace: str | None = None  # parse_trace.txt; None when tracing is off
+    ir: IRBuilder | None = None
+    cfg: List[BasicBlock] | None = None
+    optimized: OptResult | None = None
+    asm: str | None = None
+
+    def artifacts(self) -> Dict[str, str]:
+        """Output file name -> text, exactly as ``run_stage`` writes them."""
+        out: Dict[str, str] = {}
+        if self.tokens is not None:
+            out["tokens.csv"] = format_tokens_csv(self.tokens)
+            out["symtab.txt"] = format_symtab(self.symbols or [])
+        if self.trace is not None:
+            out["parse_trace.txt"] = self.trace
+        if self.ir is not None:
+            out["ir.quad"] = self.ir.render()
+        if self.cfg is not None:
+            from .cfg import render_cfg
+
+            out["cfg.txt"] = render_cfg(self.cfg, self.session.ir.symbols)
+        if self.optimized is not None:
+            out["ir_opt.quad"] = self.optimized.ir.render()
+            out["opt_report.txt"] = self.optimized.report + "\n"
+        if self.asm is not None:
+            out["target.asm"] = self.asm
+        return out
+
+    def write(self, out_dir: str | Path) -> List[Path]:
+        """Write every artifact to ``out_dir``; return the paths written."""
+        out_dir = Path(out_dir)
+        written = []
+        for name, text in self.artifacts().items():
+            path = out_dir / name
+            write_text_file(path, text)
+            written.append(path)
+        return written
+
+
+def compile_source(
+    text: str,
+    stages: Iterable[str] | str = "all",
+    trace: TraceOptions | None = None,
+    unit_bypass: bool = True,
+) -> CompileResult:
+    """Compile source ``text`` through ``stages`` entirely in memory.
+
+    ``stages`` is one stage name or several from ``SOURCE_STAGES``; ``all``
+    means every one of them. Earlier stages a stage depends on are computed
+    once and shared, but only the stages asked for appear in the result.
+    ``trace`` keeps the parse trace as ``CompileResult.trace`` (off by default);
+    ``unit_bypass=False`` traces identity unit reductions as separate steps.
+    Errors are raised as ``UserError``, as from ``run_stage``.
+    """
+    wanted = _normalize_stages(stages)
+    session = CompilationSession(text=text)
+    result = CompileResult(stages=wanted, session=session)
+    for stage in wanted:
+        if stage == "lexer":
+            from .lexer import build_symbol_table
+
+            result.tokens = session.tokens
+            result.symbols = build_symbol_table(session.tokens)
+        elif stage == "parse":
+            if trace is not None and trace.mode != "off":
+                buf = io.StringIO()
+                session.parse_traced(trace, buf, unit_bypass)
+                result.trace = buf.getvalue()
+            result.program = session.program
+        elif stage == "ir":
+            result.ir = session.ir
+        elif stage == "cfg":
+            result.cfg = session.cfg
+        elif stage == "opt":
+            result.optimized = session.optimized
+        else:
+            result.asm = session.target
+    return result
+
+
+def _normalize_stages(stages: Iterable[str] | str) -> List[str]:
+    names = [stages] if isinstance(stages, str) else list(stages)
+    wanted = set()
+    for name in names:
+        normalized = name.lower()
+        if normalized == "all":
+            wanted.update(SOURCE_STAGES)
+        elif normalized in SOURCE_STAGES:
+            wanted.add(normalized)
+        else:
+            raise UserError(f"Error: unsupported stage '{name}'")
+    return [stage for stage in SOURCE_STAGES if stage in wanted]
@@ -0,0 +1,150 @@
+"""
+Batch compilation of many source files in a process pool.
+
+``run_batch`` expands files, glob patterns and directories into ``.min``
+inputs, builds the LALR(1) tables once in the parent and hands them to every
+worker, then runs ``pipeline.run_stage`` on each file. A failing file does not
+stop the others; its error is kept in ``BatchResult.errors``.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from . import lalr, pipeline
+from .tables import ParseTables
+from .utils import StageResult, TraceOptions, UserError, output_dir_for_input
+
+SOURCE_SUFFIX = ".min"
+
+
+@dataclass
+class BatchResult:
+    stage: str
+    inputs: List[Path]
+    results: Dict[Path, StageResult] = field(default_factory=dict)
+    errors: Dict[Path, str] = field(default_factory=dict)
+    jobs: int = 1
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        reused = sum(len(r.reused) for r in self.results.values())
+        return (
+            f"Batch '{self.stage}': {len(self.inputs)} files, {len(self.results)} succeeded, "
+            f"{len(self.errors)} failed, {reused} stage(s) reused in {self.elapsed:.2f}s "
+            f"with {self.jobs} worker(s)"
+        )
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[Path]:
+    """Files as given, glob matches and ``*.min`` under directories, deduplicated in order."""
+    seen: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(p for p in path.rglob(f"*{SOURCE_SUFFIX}") if p.is_file())
+        elif glob.has_magic(pattern):
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True) if Path(p).is_file())
+            if not matches:
+                raise UserError(f"Error: no input files match '{pattern}'")
+        else:
+            matches = [path]
+        for match in matches:
+            seen.setdefault(match, None)
+    inputs = list(seen)
+    if not inputs:
+        raise UserError("Error: no input files found")
+    owners: Dict[Path, Path] = {}
+    for path in inputs:
+        out_dir = output_dir_for_input(path)
+        other = owners.setdefault(out_dir, path)
+        if other != path:
+            raise UserError(f"Error: inputs {other} and {path} share output folder {out_dir}")
+    return inputs
+
+
+def run_batch(
+    stage: str,
+    inputs: List[Path],
+    jobs: int | None = None,
+    table_method: str = "deremer",
+    trace: TraceOptions | None = None,
+    rebuild: bool = False,
+    profile: str | None = None,
+    unit_bypass: bool = True,
+) -> BatchResult:
+    """Run ``stage`` on every input with ``jobs`` worker processes (default: CPU count)."""
+    if stage.lower() not in pipeline.SUPPORTED_STAGES:
+        raise UserError(f"Error: unsupported stage '{stage}'")
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(inputs)))
+    start = time.perf_counter()
+    tables = None
+    if stage.lower() in ("table", "all"):
+        # Loaded once here instead of regenerated per file; only the table
+        # stage itself forces a refresh of the cache.
+        refresh = stage.lower() == "table"
+        tables = lalr.load_tables(refresh=refresh, verbose=True, method=table_method)
+    options = (stage, table_method, trace, rebuild, profile, unit_bypass)
+
+    result = BatchResult(stage=stage.lower(), inputs=inputs, jobs=jobs)
+    if jobs == 1:
+        _init_worker(tables, options)
+        outcomes = map(_compile_one, inputs)
+        _collect(result, inputs, outcomes)
+    else:
+        chunksize = max(1, len(inputs) // (jobs * 8))
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(tables, options)
+        ) as pool:
+            _collect(result, inputs, pool.map(_compile_one, inputs, chunksize=chunksize))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _collect(
+    result: BatchResult, inputs: List[Path], outcomes: Iterable[Tuple[StageResult | None, str]]
+) -> None:
+    for path, (stage_result, error) in zip(inputs, outcomes):
+        if stage_result is not None:
+            result.results[path] = stage_result
+        else:
+            result.errors[path] = error
+
+
+# Per-worker state, set once by the pool initializer.
+_WORKER_TABLES: ParseTables | None = None
+_WorkerOptions = Tuple[str, str, TraceOptions | None, bool, str | None, bool]
+_WORKER_OPTIONS: _WorkerOptions = ("all", "deremer", None, False, None, True)
+
+
+def _init_worker(tables: ParseTables | None, options: _WorkerOptions) -> None:
+    global _WORKER_TABLES, _WORKER_OPTIONS
+    _WORKER_TABLES, _WORKER_OPTIONS = tables, options
+
+
+def _compile_one(path: Path) -> Tuple[StageResult | None, str]:
+    stage, table_method, trace, rebuild, profile, unit_bypass = _WORKER_OPTIONS
+    try:
+        return (
+            pipeline.run_stage(
+                stage,
+                str(path),
+                table_method=table_method,
+                trace=trace,
+                rebuild=rebuild,
+                tables=_WORKER_TABLES,
+                profile=profile,
+                unit_bypass=unit_bypass,
+            ),
+            "",
+        )
+    except UserError as exc:
+        return None, str(exc)
+    except Exception as exc:  # pragma: no cover - defensive
+        return None, f"Unexpected error: {exc}"
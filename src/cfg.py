@@ -3,7 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, List, Set
 
-from .ir import IRBuilder, Quad
+from .ir import IRBuilder, Quad, format_quad
+from .lexer import SymbolTable
 from .utils import UserError
 
 
@@ -21,7 +22,8 @@ def build_cfg(builder: IRBuilder) -> List[BasicBlock]:
     if not quads:
         return []
 
-    label_to_idx: Dict[str, int] = {}
+    none, names = builder.none, builder.symbols.names
+    label_to_idx: Dict[int, int] = {}
     for idx, q in enumerate(quads):
         if q.op == "LABEL":
             label_to_idx[q.res] = idx
@@ -34,10 +36,10 @@ def build_cfg(builder: IRBuilder) -> List[BasicBlock]:
         if q.op in {"GOTO", "IF_LT", "IF_GT", "IF_EQ", "IF_NE"}:
             if idx + 1 < len(quads):
                 leaders.add(idx + 1)
-            if q.res != "-" and q.res in label_to_idx:
+            if q.res != none and q.res in label_to_idx:
                 leaders.add(label_to_idx[q.res])
-            elif q.op in {"GOTO", "IF_LT", "IF_GT", "IF_EQ", "IF_NE"} and q.res != "-":
-                raise UserError(f"Internal error: label {q.res} not found")
+            elif q.op in {"GOTO", "IF_LT", "IF_GT", "IF_EQ", "IF_NE"} and q.res != none:
+                raise UserError(f"Internal error: label {names[q.res]} not found")
 
     leader_list = sorted(leaders)
     block_ranges: List[range] = []
@@ -61,7 +63,7 @@ def build_cfg(builder: IRBuilder) -> List[BasicBlock]:
         if last.op in {"IF_LT", "IF_GT", "IF_EQ", "IF_NE"}:
             succs = []
             if last.res not in label_to_idx:
-                raise UserError(f"Internal error: label {last.res} not found")
+                raise UserError(f"Internal error: label {names[last.res]} not found")
             target_block = quad_to_block[label_to_idx[last.res]]
             succs.append(target_block)
             fall = blk.id + 1
@@ -70,7 +72,7 @@ def build_cfg(builder: IRBuilder) -> List[BasicBlock]:
             blk.succs = sorted(set(succs))
         elif last.op == "GOTO":
             if last.res not in label_to_idx:
-                raise UserError(f"Internal error: label {last.res} not found")
+                raise UserError(f"Internal error: label {names[last.res]} not found")
             blk.succs = [quad_to_block[label_to_idx[last.res]]]
         else:
             fall = blk.id + 1
@@ -79,11 +81,12 @@ def build_cfg(builder: IRBuilder) -> List[BasicBlock]:
     return blocks
 
 
-def render_cfg(blocks: List[BasicBlock]) -> str:
+def render_cfg(blocks: List[BasicBlock], symbols: SymbolTable) -> str:
+    names = symbols.names
     lines: List[str] = []
     for blk in blocks:
         succs = ",".join(f"B{s}" for s in blk.succs)
         lines.append(f"B{blk.id}: {blk.start}..{blk.end} succs=[{succs}]")
         for idx, q in enumerate(blk.quads, start=blk.start):
-            lines.append(f"  {idx}: ({q.op}, {q.arg1}, {q.arg2}, {q.res})")
+            lines.append(f"  {idx}: {format_quad(q, names)}")
     return "\n".join(lines) + "\n"
@@ -1,53 +1,34 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List, Sequence
 
-from .ir import Quad
-from .opt import optimize_ir
+from .ir import IRBuilder, Quad
 from .utils import UserError, write_text_file
 
+if TYPE_CHECKING:  # avoid circular import at runtime
+    from .session import CompilationSession
 
-def emit_target(source_path: Path, out_dir: Path) -> Path:
-    ir_opt_path = out_dir / "ir_opt.quad"
-    if not ir_opt_path.exists():
-        ir_opt_path, _ = optimize_ir(source_path, out_dir)
-    quads = _parse_ir_file(ir_opt_path)
-    _validate_labels(quads)
-    asm_lines = _gen_asm(quads)
+
+def emit_target(session: CompilationSession, out_dir: Path) -> Path:
     target_path = out_dir / "target.asm"
-    write_text_file(target_path, "\n".join(asm_lines) + "\n")
+    write_text_file(target_path, session.target)
     return target_path
 
 
-def _parse_ir_file(path: Path) -> List[Quad]:
-    quads: List[Quad] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        # expected format: idx: (OP, a1, a2, res)
-        if ":" not in line:
-            continue
-        _, rest = line.split(":", 1)
-        rest = rest.strip()
-        if not (rest.startswith("(") and rest.endswith(")")):
-            continue
-        inner = rest[1:-1]
-        parts = [p.strip() for p in inner.split(",")]
-        if len(parts) != 4:
-            continue
-        op, a1, a2, res = parts
-        quads.append(Quad(op=op, arg1=a1, arg2=a2, res=res, orig_index=None))
-    return quads
+def generate_target(ir: IRBuilder) -> str:
+    """Assembly text for the (optimized) quads of ``ir``."""
+    names = ir.symbols.names
+    _validate_labels(ir.quads, names)
+    return "\n".join(_gen_asm(ir.quads, names)) + "\n"
 
 
-def _validate_labels(quads: List[Quad]) -> None:
+def _validate_labels(quads: List[Quad], names: Sequence[str]) -> None:
     defined = {q.res for q in quads if q.op == "LABEL"}
     used = {q.res for q in quads if q.op == "GOTO" or q.op.startswith("IF_")}
     missing = used - defined
     if missing:
-        raise UserError(f"Error: undefined label {sorted(missing)[0]}")
+        raise UserError(f"Error: undefined label {min(names[sym] for sym in missing)}")
 
 
 def _emit_load(val: str, out: List[str]) -> None:
@@ -59,38 +40,40 @@ def _emit_load(val: str, out: List[str]) -> None:
         out.append(f"LOAD {val}")
 
 
-def _gen_asm(quads: List[Quad]) -> List[str]:
+def _gen_asm(quads: List[Quad], names: Sequence[str]) -> List[str]:
     lines: List[str] = []
     for q in quads:
+        # assembly is text: resolve the operand names once per quad
+        a1, a2, res = names[q.arg1], names[q.arg2], names[q.res]
         if q.op == "LABEL":
-            lines.append(f"{q.res}:")
+            lines.append(f"{res}:")
             continue
         if q.op == "GOTO":
-            lines.append(f"JMP {q.res}")
+            lines.append(f"JMP {res}")
             continue
         if q.op == "ASSIGN":
-            _emit_load(q.arg1, lines)
-            lines.append(f"STORE {q.res}")
+            _emit_load(a1, lines)
+            lines.append(f"STORE {res}")
             continue
         if q.op in {"ADD", "SUB", "MUL", "DIV"}:
-            _emit_load(q.arg1, lines)
-            _emit_load(q.arg2, lines)
+            _emit_load(a1, lines)
+            _emit_load(a2, lines)
             lines.append(q.op)
-            lines.append(f"STORE {q.res}")
+            lines.append(f"STORE {res}")
             continue
         if q.op in {"IF_GT", "IF_LT", "IF_EQ", "IF_NE", "IF_LE", "IF_GE"}:
-            _emit_load(q.arg1, lines)
-            _emit_load(q.arg2, lines)
+            _emit_load(a1, lines)
+            _emit_load(a2, lines)
             if q.op in {"IF_GT", "IF_LT", "IF_EQ", "IF_NE"}:
                 cmp_op = {"IF_GT": "GT", "IF_LT": "LT", "IF_EQ": "EQ", "IF_NE": "NE"}[q.op]
                 lines.append(cmp_op)
-                lines.append(f"JNZ {q.res}")
+                lines.append(f"JNZ {res}")
             elif q.op == "IF_LE":
                 lines.append("GT")
-                lines.append(f"JZ {q.res}")
+                lines.append(f"JZ {res}")
             elif q.op == "IF_GE":
                 lines.append("LT")
-                lines.append(f"JZ {q.res}")
+                lines.append(f"JZ {res}")
             continue
         raise UserError(f"Internal error: unsupported op {q.op}")
     lines.append("HALT")
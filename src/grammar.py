@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
-from typing import Iterable, List, Set, Tuple
+from typing import FrozenSet, Iterable, Tuple
 
 
 @dataclass(frozen=True)
@@ -13,65 +14,79 @@ class Production:
 
 @dataclass(frozen=True)
 class Grammar:
-    terminals: Set[str]
-    nonterminals: Set[str]
-    productions: List[Production]
+    """An immutable grammar, safe to share between threads.
+
+    Symbol sets are frozen and productions a tuple, whatever was passed in.
+    """
+
+    terminals: FrozenSet[str]
+    nonterminals: FrozenSet[str]
+    productions: Tuple[Production, ...]
     start_symbol: str
     augmented_start: str
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "terminals", frozenset(self.terminals))
+        object.__setattr__(self, "nonterminals", frozenset(self.nonterminals))
+        object.__setattr__(self, "productions", tuple(self.productions))
+
+
+TERMINALS: FrozenSet[str] = frozenset(
+    {
+        "IF",
+        "ELSE",
+        "WHILE",
+        "AND",
+        "OR",
+        "NOT",
+        "ID",
+        "NUM",
+        "ASSIGN",
+        "PLUS",
+        "MINUS",
+        "MUL",
+        "DIV",
+        "EQ",
+        "NE",
+        "LT",
+        "GT",
+        "LE",
+        "GE",
+        "LPAREN",
+        "RPAREN",
+        "LBRACE",
+        "RBRACE",
+        "SEMI",
+        "EOF",
+    }
+)
+
+NONTERMINALS: FrozenSet[str] = frozenset(
+    {
+        "S'",
+        "Program",
+        "StmtList",
+        "Stmt",
+        "Matched",
+        "Unmatched",
+        "AssignStmt",
+        "Block",
+        "Expr",
+        "Term",
+        "Factor",
+        "Bool",
+        "OrExpr",
+        "AndExpr",
+        "NotExpr",
+        "RelExpr",
+    }
+)
+
 
-TERMINALS: Set[str] = {
-    "IF",
-    "ELSE",
-    "WHILE",
-    "AND",
-    "OR",
-    "NOT",
-    "ID",
-    "NUM",
-    "ASSIGN",
-    "PLUS",
-    "MINUS",
-    "MUL",
-    "DIV",
-    "EQ",
-    "NE",
-    "LT",
-    "GT",
-    "LE",
-    "GE",
-    "LPAREN",
-    "RPAREN",
-    "LBRACE",
-    "RBRACE",
-    "SEMI",
-    "EOF",
-}
-
-NONTERMINALS: Set[str] = {
-    "S'",
-    "Program",
-    "StmtList",
-    "Stmt",
-    "Matched",
-    "Unmatched",
-    "AssignStmt",
-    "Block",
-    "Expr",
-    "Term",
-    "Factor",
-    "Bool",
-    "OrExpr",
-    "AndExpr",
-    "NotExpr",
-    "RelExpr",
-}
-
-
-PRODUCTIONS: List[Production] = [
+PRODUCTIONS: Tuple[Production, ...] = (
     Production(1, "S'", ("Program", "EOF")),
     Production(2, "Program", ("StmtList",)),
-    Production(3, "StmtList", ("Stmt", "StmtList")),
+    Production(3, "StmtList", ("StmtList", "Stmt")),
     Production(4, "StmtList", ()),
     Production(5, "Stmt", ("Matched",)),
     Production(6, "Stmt", ("Unmatched",)),
@@ -107,7 +122,7 @@ PRODUCTIONS: List[Production] = [
     Production(36, "RelExpr", ("Expr", "GT", "Expr")),
     Production(37, "RelExpr", ("Expr", "LE", "Expr")),
     Production(38, "RelExpr", ("Expr", "GE", "Expr")),
-]
+)
 
 GRAMMAR = Grammar(
     terminals=TERMINALS,
@@ -117,6 +132,23 @@ GRAMMAR = Grammar(
     augmented_start="S'",
 )
 
+# Unit productions whose semantic value is just their only child (see
+# parser.REDUCERS); the table generator may bypass their reductions.
+IDENTITY_UNIT_PRODUCTIONS: FrozenSet[int] = frozenset({5, 6, 7, 9, 18, 21, 25, 27, 29, 32})
+
+
+def grammar_hash(grammar: Grammar | None = None) -> str:
+    """Return a stable SHA-256 fingerprint of the grammar definition."""
+    g = grammar if grammar is not None else GRAMMAR
+    parts = [
+        "start=" + g.start_symbol,
+        "augmented=" + g.augmented_start,
+        "terminals=" + ",".join(sorted(g.terminals)),
+        "nonterminals=" + ",".join(sorted(g.nonterminals)),
+    ]
+    parts.extend(f"{p.id}:{p.lhs}->{' '.join(p.rhs)}" for p in g.productions)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
 
 def dump_productions(lines: Iterable[Production] | None = None) -> str:
     items = list(lines) if lines is not None else GRAMMAR.productions
@@ -160,6 +160,8 @@ class MiniLangGUI:
         )
         self.output_var.set(str(result.output_dir))
         self._log(f"Success: stage '{stage}' finished. Output at {result.output_dir}")
+        if result.reused:
+            self._log(f"Reused unchanged stages: {', '.join(result.reused)}")
 
     def _open_output_dir(self) -> None:
         if not self.file_path:
@@ -0,0 +1,337 @@
+"""
+Incremental front end: re-lex and re-parse only the statements an edit touches.
+
+The source is kept as a tree of statement segments mirroring the AST. Every
+segment records the character span of one statement and, for each block it
+contains directly, the span of the block body with that body's own statement
+segments. An edit is mapped to the innermost statement list that fully
+contains it. Only the statements it touches, plus the whitespace around them,
+are re-lexed and parsed as a standalone ``StmtList``. The resulting statements
+are spliced into a new ``ast.Program`` that shares every untouched node with
+the previous one.
+
+Offsets are stored relative to the enclosing container (a segment's blocks
+relative to the segment start, a block's children relative to the body start).
+An edit therefore only shifts the later siblings along its path, never their
+subtrees; that shift and the list/string splices are the only per-edit work
+that grows with the file, and they are plain integer updates and memcpys.
+
+Whenever the incremental result could differ from a full parse, the front end
+falls back to one: a region that does not parse on its own, a lexing error, or
+a token or line comment that might run across the region boundary.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from . import ast as ast_nodes
+from .lexer import Token, TokenType, tokenize_text
+from .parser import parse_tokens
+from .utils import UserError, ensure_input_file
+
+
+@dataclass
+class _Segment:
+    start: int  # offset of the first token, relative to the container
+    end: int  # offset just past the last token, relative to the container
+    stmt: ast_nodes.Stmt
+    blocks: List["_BlockSpan"]  # blocks owned directly by this statement, in source order
+
+
+@dataclass
+class _BlockSpan:
+    open: int  # offset just past '{', relative to the segment start
+    close: int  # offset of '}', relative to the segment start
+    block: ast_nodes.Block
+    children: List[_Segment]  # offsets relative to ``open``
+
+
+@dataclass
+class ReparseStats:
+    """Size of the region re-lexed and re-parsed by the most recent update."""
+
+    chars: int
+    tokens: int
+    full: bool
+
+
+class IncrementalParser:
+    """Holds the source text and parse tree of one program across edits."""
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._segments, self._program = _parse_all(text)
+        self._tokens: List[Token] | None = None
+        self.last_reparse = ReparseStats(chars=len(text), tokens=-1, full=True)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "IncrementalParser":
+        return cls(ensure_input_file(path).read_text(encoding="utf-8"))
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def program(self) -> ast_nodes.Program:
+        return self._program
+
+    @property
+    def tokens(self) -> List[Token]:
+        """Token stream of the current text (re-lexed on demand after edits)."""
+        if self._tokens is None:
+            self._tokens = tokenize_text(self._text)
+        return self._tokens
+
+    def update(self, new_text: str) -> ast_nodes.Program:
+        """Replace the whole text, reparsing only the span that differs."""
+        old = self._text
+        prefix = _common_prefix(old, new_text, min(len(old), len(new_text)))
+        limit = min(len(old), len(new_text)) - prefix
+        suffix = _common_prefix(old[::-1], new_text[::-1], limit)
+        return self.edit(prefix, len(old) - suffix, new_text[prefix : len(new_text) - suffix])
+
+    def edit(self, start: int, end: int, replacement: str) -> ast_nodes.Program:
+        """Replace ``text[start:end]`` with ``replacement`` and return the new Program.
+
+        On a lexing or parsing error the previous state is kept and the error of
+        a full parse of the edited text is raised.
+        """
+        if not 0 <= start <= end <= len(self._text):
+            raise UserError(f"Error: edit range {start}:{end} outside the source text")
+        new_text = self._text[:start] + replacement + self._text[end:]
+        delta = len(replacement) - (end - start)
+        result = _edit_list(
+            new_text, self._segments, self._program.stmts, 0, len(self._text), start, end, delta
+        )
+        if result is None:
+            self._segments, self._program = _parse_all(new_text)
+            self.last_reparse = ReparseStats(chars=len(new_text), tokens=-1, full=True)
+        else:
+            self._segments, stmts, self.last_reparse = result
+            self._program = ast_nodes.Program(stmts=stmts)
+        self._text = new_text
+        self._tokens = None
+        return self._program
+
+
+_EditResult = Tuple[List[_Segment], List[ast_nodes.Stmt], ReparseStats]
+
+
+def _parse_all(text: str) -> Tuple[List[_Segment], ast_nodes.Program]:
+    offsets: List[int] = []
+    tokens = tokenize_text(text, offsets=offsets)
+    program = _parse_program(tokens)
+    segments, _ = _build_segments(tokens, offsets, 0, program.stmts, 0)
+    return segments, program
+
+
+def _parse_program(tokens: List[Token]) -> ast_nodes.Program:
+    program = parse_tokens(tokens).program
+    if program is None:
+        raise UserError("Error: parse did not produce a program")
+    return program
+
+
+def _edit_list(
+    text: str,
+    segs: List[_Segment],
+    stmts: List[ast_nodes.Stmt],
+    base: int,
+    limit: int,
+    start: int,
+    end: int,
+    delta: int,
+) -> Optional[_EditResult]:
+    """Apply an edit to one statement list; offsets are relative to ``base``.
+
+    ``limit`` is the old length of the list's span and ``text`` is the already
+    edited source. Returns None when only a full reparse is trustworthy.
+    """
+    # segments touching the edit, inclusive at both ends
+    i = bisect_left(segs, start, key=lambda g: g.end)
+    j = bisect_right(segs, end, key=lambda g: g.start)
+
+    if j - i == 1:
+        seg = segs[i]
+        for b, blk in enumerate(seg.blocks):
+            body = seg.start + blk.open
+            if body <= start and end <= seg.start + blk.close:
+                inner = _edit_list(
+                    text,
+                    blk.children,
+                    blk.block.stmts,
+                    base + body,
+                    blk.close - blk.open,
+                    start - body,
+                    end - body,
+                    delta,
+                )
+                if inner is None:
+                    return None
+                children, child_stmts, stats = inner
+                new_block = ast_nodes.Block(stmts=child_stmts)
+                blocks = list(seg.blocks)
+                blocks[b] = _BlockSpan(blk.open, blk.close + delta, new_block, children)
+                for k in range(b + 1, len(blocks)):
+                    later = blocks[k]
+                    blocks[k] = replace(later, open=later.open + delta, close=later.close + delta)
+                new_seg = _Segment(
+                    seg.start, seg.end + delta, _replace_block(seg.stmt, blk.block, new_block), blocks
+                )
+                return (
+                    segs[:i] + [new_seg] + _shifted(segs[i + 1 :], delta),
+                    stmts[:i] + [new_seg.stmt] + stmts[i + 1 :],
+                    stats,
+                )
+
+    lo = segs[i - 1].end if i > 0 else 0
+    hi = (segs[j].start if j < len(segs) else limit) + delta
+    region = _reparse_region(text, base + lo, base + hi)
+    if region is None:
+        return None
+    new_segs, new_stmts, stats = region
+    for seg in new_segs:
+        seg.start -= base
+        seg.end -= base
+    return (
+        segs[:i] + new_segs + _shifted(segs[j:], delta),
+        stmts[:i] + new_stmts + stmts[j:],
+        stats,
+    )
+
+
+def _reparse_region(text: str, lo: int, hi: int) -> Optional[_EditResult]:
+    """Lex and parse ``text[lo:hi]`` as a statement list (absolute offsets)."""
+    if _joins(text, lo) or _joins(text, hi):
+        return None
+    line = text.count("\n", 0, lo) + 1
+    col = lo - text.rfind("\n", 0, lo)
+    offsets: List[int] = []
+    try:
+        tokens = tokenize_text(text, lo, hi, line, col, offsets)
+        # a trailing line comment must end inside the region, or it would swallow what follows
+        tail_from = offsets[-1] + len(tokens[-1].lexeme) if tokens else lo
+        comment = text.find("//", tail_from, hi)
+        if comment >= 0 and text.find("\n", comment, hi) < 0 and hi < len(text):
+            return None
+        program = _parse_program(tokens)
+    except UserError:
+        return None
+    segs, _ = _build_segments(tokens, offsets, 0, program.stmts, 0)
+    return segs, program.stmts, ReparseStats(chars=hi - lo, tokens=len(tokens), full=False)
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    """Length of the common prefix of ``a`` and ``b``, capped at ``limit``."""
+    # bisect on slice equality so the comparisons run as memcmp, not per character
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _joins(text: str, pos: int) -> bool:
+    """True if characters on either side of ``pos`` could lex as one token."""
+    if pos <= 0 or pos >= len(text):
+        return False
+    a, b = text[pos - 1], text[pos]
+    if (a.isalnum() or a == "_") and (b.isalnum() or b == "_"):
+        return True
+    return a + b in ("==", "!=", "<=", ">=", "//")
+
+
+def _shifted(segs: List[_Segment], delta: int) -> List[_Segment]:
+    # In place: the previous tree's segments are dropped once an edit succeeds,
+    # and only the later siblings' own offsets move (their contents are relative).
+    if delta:
+        for seg in segs:
+            seg.start += delta
+            seg.end += delta
+    return segs
+
+
+def _replace_block(
+    node: ast_nodes.Stmt, old: ast_nodes.Block, new: ast_nodes.Block
+) -> ast_nodes.Stmt:
+    """Rebuild only the If/While nodes on the path from ``node`` to block ``old``."""
+    if node is old:
+        return new
+    if isinstance(node, ast_nodes.While):
+        body = _replace_block(node.body, old, new)
+        return node if body is node.body else replace(node, body=body)
+    if isinstance(node, ast_nodes.If):
+        then_branch = _replace_block(node.then_branch, old, new)
+        else_branch = (
+            _replace_block(node.else_branch, old, new) if node.else_branch is not None else None
+        )
+        if then_branch is node.then_branch and else_branch is node.else_branch:
+            return node
+        return replace(node, then_branch=then_branch, else_branch=else_branch)
+    return node
+
+
+def _build_segments(
+    tokens: List[Token], offsets: List[int], k: int, stmts: List[ast_nodes.Stmt], base: int
+) -> Tuple[List[_Segment], int]:
+    """Pair each statement with its token span, starting at token ``k``."""
+    segs: List[_Segment] = []
+    for stmt in stmts:
+        start = offsets[k]
+        blocks: List[_BlockSpan] = []
+        k = _walk_stmt(tokens, offsets, k, stmt, start, blocks)
+        end = offsets[k - 1] + len(tokens[k - 1].lexeme)
+        segs.append(_Segment(start - base, end - base, stmt, blocks))
+    return segs, k
+
+
+def _walk_stmt(
+    tokens: List[Token],
+    offsets: List[int],
+    k: int,
+    stmt: ast_nodes.Stmt,
+    seg_start: int,
+    blocks: List[_BlockSpan],
+) -> int:
+    """Return the index just past ``stmt``'s tokens, collecting its blocks."""
+    if isinstance(stmt, ast_nodes.Assign):
+        while tokens[k].type != TokenType.SEMI:
+            k += 1
+        return k + 1
+    if isinstance(stmt, ast_nodes.Block):
+        body = offsets[k] + 1
+        children, k = _build_segments(tokens, offsets, k + 1, stmt.stmts, body)
+        blocks.append(_BlockSpan(body - seg_start, offsets[k] - seg_start, stmt, children))
+        return k + 1
+    if isinstance(stmt, ast_nodes.While):
+        k = _skip_parens(tokens, k + 1)
+        return _walk_stmt(tokens, offsets, k, stmt.body, seg_start, blocks)
+    if isinstance(stmt, ast_nodes.If):
+        k = _skip_parens(tokens, k + 1)
+        k = _walk_stmt(tokens, offsets, k, stmt.then_branch, seg_start, blocks)
+        if stmt.else_branch is not None:
+            k = _walk_stmt(tokens, offsets, k + 1, stmt.else_branch, seg_start, blocks)
+        return k
+    raise UserError(f"Internal error: unknown statement {type(stmt).__name__}")
+
+
+def _skip_parens(tokens: List[Token], k: int) -> int:
+    """``tokens[k]`` is LPAREN; return the index just past its matching RPAREN."""
+    depth = 0
+    while True:
+        tt = tokens[k].type
+        if tt == TokenType.LPAREN:
+            depth += 1
+        elif tt == TokenType.RPAREN:
+            depth -= 1
+            if depth == 0:
+                return k + 1
+        k += 1
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Sequence
+from typing import TYPE_CHECKING, List, Sequence
 
 from . import ast as ast_nodes
-from .lexer import tokenize
-from .parser import parse_tokens
+from .lexer import SymbolTable
 from .utils import UserError, write_text_file
 
+if TYPE_CHECKING:  # avoid circular import at runtime
+    from .session import CompilationSession
+
 
 @dataclass
 class BoolCode:
@@ -18,34 +20,60 @@ class BoolCode:
 
 @dataclass
 class Quad:
+    """One quadruple; operands are ids in the builder's ``SymbolTable``."""
+
     op: str
-    arg1: str
-    arg2: str
-    res: str
+    arg1: int
+    arg2: int
+    res: int
     orig_index: int | None = None
 
 
+def format_quad(q: Quad, names: Sequence[str]) -> str:
+    return f"({q.op}, {names[q.arg1]}, {names[q.arg2]}, {names[q.res]})"
+
+
 class IRBuilder:
-    def __init__(self) -> None:
+    """Emits quads whose operands (identifiers, constants, temporaries, labels and
+    the empty operand ``-``) are interned in ``symbols``, normally the table the
+    lexer filled, so identifiers keep their lexer ids. Names are looked up again
+    only when quads are rendered.
+    """
+
+    def __init__(self, symbols: SymbolTable | None = None) -> None:
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.none = self.symbols.intern("-")
         self.quads: List[Quad] = []
         self.temp_counter = 0
         self.label_counter = 0
 
-    def new_temp(self) -> str:
+    def new_temp(self) -> int:
         self.temp_counter += 1
-        return f"t{self.temp_counter}"
+        return self.symbols.intern(f"t{self.temp_counter}")
 
-    def new_label(self) -> str:
+    def new_label(self) -> int:
         self.label_counter += 1
-        return f"L{self.label_counter}"
+        return self.symbols.intern(f"L{self.label_counter}")
 
-    def emit(self, op: str, arg1: str = "-", arg2: str = "-", res: str = "-") -> int:
+    def emit(
+        self, op: str, arg1: int | None = None, arg2: int | None = None, res: int | None = None
+    ) -> int:
+        """Append a quad; an omitted operand is ``-``."""
+        none = self.none
         idx = len(self.quads)
-        self.quads.append(Quad(op, arg1, arg2, res, orig_index=idx))
+        self.quads.append(
+            Quad(
+                op,
+                none if arg1 is None else arg1,
+                none if arg2 is None else arg2,
+                none if res is None else res,
+                orig_index=idx,
+            )
+        )
         return idx
 
-    def emit_label(self, label: str) -> int:
-        return self.emit("LABEL", "-", "-", label)
+    def emit_label(self, label: int) -> int:
+        return self.emit("LABEL", res=label)
 
     def makelist(self, idx: int) -> List[int]:
         return [idx]
@@ -53,7 +81,7 @@ class IRBuilder:
     def merge(self, a: Sequence[int], b: Sequence[int]) -> List[int]:
         return list(a) + list(b)
 
-    def backpatch(self, lst: Sequence[int], label: str) -> None:
+    def backpatch(self, lst: Sequence[int], label: int) -> None:
         for idx in lst:
             if idx < 0 or idx >= len(self.quads):
                 raise UserError(f"Internal error: backpatch index out of range {idx}")
@@ -61,26 +89,23 @@ class IRBuilder:
             self.quads[idx] = Quad(quad.op, quad.arg1, quad.arg2, label, quad.orig_index)
 
     def render(self) -> str:
+        names = self.symbols.names
         lines = []
         for i, q in enumerate(self.quads):
-            lines.append(f"{i}: ({q.op}, {q.arg1}, {q.arg2}, {q.res})")
+            lines.append(f"{i}: {format_quad(q, names)}")
         return "\n".join(lines) + "\n"
 
 
-def generate_ir(source_path: Path, out_dir: Path) -> Path:
-    builder = generate_ir_quads(source_path)
+def generate_ir(session: CompilationSession, out_dir: Path) -> Path:
     out_path = out_dir / "ir.quad"
-    write_text_file(out_path, builder.render())
+    write_text_file(out_path, session.ir.render())
     return out_path
 
 
-def generate_ir_quads(source_path: Path) -> IRBuilder:
-    tokens = tokenize(source_path)
-    parse_result = parse_tokens(tokens)
-    if parse_result.program is None:
-        raise UserError("Internal error: parser did not return Program AST")
-    builder = IRBuilder()
-    _gen_program(parse_result.program, builder)
+def build_ir(program: ast_nodes.Program, symbols: SymbolTable | None = None) -> IRBuilder:
+    """Translate ``program`` to quads, interning operands into ``symbols``."""
+    builder = IRBuilder(symbols)
+    _gen_program(program, builder)
     return builder
 
 
@@ -92,7 +117,7 @@ def _gen_program(node: ast_nodes.Program, b: IRBuilder) -> None:
 def _gen_stmt(stmt: ast_nodes.Stmt, b: IRBuilder) -> None:
     if isinstance(stmt, ast_nodes.Assign):
         place = _gen_expr(stmt.expr, b)
-        b.emit("ASSIGN", place, "-", stmt.name)
+        b.emit("ASSIGN", place, res=b.symbols.intern(stmt.name))
     elif isinstance(stmt, ast_nodes.Block):
         for s in stmt.stmts:
             _gen_stmt(s, b)
@@ -104,7 +129,7 @@ def _gen_stmt(stmt: ast_nodes.Stmt, b: IRBuilder) -> None:
         _gen_stmt(stmt.then_branch, b)
         if stmt.else_branch is not None:
             end_label = b.new_label()
-            b.emit("GOTO", "-", "-", end_label)
+            b.emit("GOTO", res=end_label)
             else_label = b.new_label()
             b.backpatch(cond.false_list, else_label)
             b.emit_label(else_label)
@@ -122,7 +147,7 @@ def _gen_stmt(stmt: ast_nodes.Stmt, b: IRBuilder) -> None:
         b.backpatch(cond.true_list, body_label)
         b.emit_label(body_label)
         _gen_stmt(stmt.body, b)
-        b.emit("GOTO", "-", "-", start_label)
+        b.emit("GOTO", res=start_label)
         end_label = b.new_label()
         b.backpatch(cond.false_list, end_label)
         b.emit_label(end_label)
@@ -130,11 +155,11 @@ def _gen_stmt(stmt: ast_nodes.Stmt, b: IRBuilder) -> None:
         raise UserError(f"Internal error: unsupported stmt {stmt}")
 
 
-def _gen_expr(expr: ast_nodes.Expr, b: IRBuilder) -> str:
+def _gen_expr(expr: ast_nodes.Expr, b: IRBuilder) -> int:
     if isinstance(expr, ast_nodes.Id):
-        return expr.name
+        return b.symbols.intern(expr.name)
     if isinstance(expr, ast_nodes.Num):
-        return expr.value
+        return b.symbols.intern(expr.value)
     if isinstance(expr, ast_nodes.BinOp):
         left = _gen_expr(expr.left, b)
         right = _gen_expr(expr.right, b)
@@ -147,8 +172,8 @@ def _gen_expr(expr: ast_nodes.Expr, b: IRBuilder) -> str:
 def _gen_bool(node: ast_nodes.BoolExpr, b: IRBuilder) -> BoolCode:
     if isinstance(node, ast_nodes.RelOp):
         op = node.op
-        idx_true = b.emit(op, _gen_expr(node.left, b), _gen_expr(node.right, b), "-")
-        idx_false = b.emit("GOTO", "-", "-", "-")
+        idx_true = b.emit(op, _gen_expr(node.left, b), _gen_expr(node.right, b))
+        idx_false = b.emit("GOTO")
         return BoolCode(true_list=b.makelist(idx_true), false_list=b.makelist(idx_false))
     if isinstance(node, ast_nodes.LogicOp):
         if node.op == "OR":
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+import json
+import os
 import sys
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Mapping, MutableMapping, Set, Tuple
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, MutableMapping, Set, Tuple
 
-from .grammar import GRAMMAR, Production
-from .utils import UserError
+from .grammar import GRAMMAR, IDENTITY_UNIT_PRODUCTIONS, Grammar, Production, grammar_hash
+from .tables import (  # noqa: F401  (re-exported for existing importers)
+    ACT_ACCEPT,
+    ACT_ERROR,
+    TABLE_CACHE_VERSION,
+    CompiledTables,
+    ParseTables,
+    StateSummary,
+    compile_tables,
+    decode_action,
+    encode_action,
+)
+from .utils import UserError, cache_dir
 
 
 @dataclass(frozen=True)
@@ -26,27 +42,24 @@ class LRState:
     sources: List[int] | None = None
 
 
-def _production_by_id() -> Dict[int, Production]:
-    return {p.id: p for p in GRAMMAR.productions}
+Core = Tuple[int, int]  # (prod_id, dot)
+Kernel = Tuple[Tuple[int, int], ...]  # sorted (item id, lookahead mask) pairs
+NtTrans = Tuple[int, str]  # (state id, nonterminal)
 
+TABLE_METHODS = ("deremer", "canonical")
 
-PROD_BY_ID = _production_by_id()
-PRODS_BY_LHS: Mapping[str, List[Production]] = {}
-for p in GRAMMAR.productions:
-    PRODS_BY_LHS.setdefault(p.lhs, []).append(p)
 
-
-def _compute_first_sets() -> Dict[str, Set[str]]:
+def _compute_first_sets(grammar: Grammar) -> Dict[str, Set[str]]:
     first: Dict[str, Set[str]] = {}
-    for t in GRAMMAR.terminals:
+    for t in grammar.terminals:
         first[t] = {t}
-    for nt in GRAMMAR.nonterminals:
+    for nt in grammar.nonterminals:
         first[nt] = set()
 
     changed = True
     while changed:
         changed = False
-        for prod in GRAMMAR.productions:
+        for prod in grammar.productions:
             lhs_first = first[prod.lhs]
             before = len(lhs_first)
             if not prod.rhs:
@@ -66,133 +79,306 @@ def _compute_first_sets() -> Dict[str, Set[str]]:
     return first
 
 
-FIRST: Dict[str, Set[str]] = _compute_first_sets()
+def _frozen_sets(sets: Mapping[str, Set[str]]) -> Mapping[str, FrozenSet[str]]:
+    return MappingProxyType({sym: frozenset(members) for sym, members in sets.items()})
 
 
-def _compute_follow_sets() -> Dict[str, Set[str]]:
-    follow: Dict[str, Set[str]] = {nt: set() for nt in GRAMMAR.nonterminals}
-    follow[GRAMMAR.start_symbol].add("EOF")
+def _compute_follow_sets(
+    grammar: Grammar, first: Mapping[str, FrozenSet[str]]
+) -> Dict[str, Set[str]]:
+    follow: Dict[str, Set[str]] = {nt: set() for nt in grammar.nonterminals}
+    follow[grammar.start_symbol].add("EOF")
 
     changed = True
     while changed:
         changed = False
-        for prod in GRAMMAR.productions:
+        for prod in grammar.productions:
             trailer = set(follow[prod.lhs])
             for symbol in reversed(prod.rhs):
-                if symbol in GRAMMAR.nonterminals:
+                if symbol in grammar.nonterminals:
                     before = len(follow[symbol])
                     follow[symbol].update(trailer)
-                    if "" in FIRST[symbol]:
-                        trailer = trailer.union(FIRST[symbol] - {""})
+                    if "" in first[symbol]:
+                        trailer = trailer.union(first[symbol] - {""})
                     else:
-                        trailer = FIRST[symbol] - {""}
+                        trailer = first[symbol] - {""}
                     if len(follow[symbol]) != before:
                         changed = True
                 else:
-                    trailer = FIRST[symbol]
-            if not prod.rhs:
-                continue
+                    trailer = first[symbol]
     return follow
 
 
-FOLLOW: Dict[str, Set[str]] = _compute_follow_sets()
+class GrammarAnalysis:
+    """Derived views of one grammar shared by the table builders.
+
+    LR items are interned as ints: production ``p`` owns the ids
+    ``item_base[p] .. item_base[p] + len(p.rhs)`` (one per dot position), so
+    advancing the dot is ``item + 1``. Lookahead and FIRST sets are int
+    bitmasks over ``terminals`` (bit ``i`` is ``terminals[i]``). Closures are
+    memoized by kernel.
+
+    The public views (``prod_by_id``, ``prods_by_lhs``, ``first``, ``follow``)
+    are read-only mappings of frozen values, so one analysis is shared by every
+    thread. The closure memos only ever gain entries equal to what any thread
+    would compute.
+    """
+
+    def __init__(self, grammar: Grammar) -> None:
+        self.grammar = grammar
+        self.prod_by_id: Mapping[int, Production] = MappingProxyType(
+            {p.id: p for p in grammar.productions}
+        )
+        by_lhs: Dict[str, List[Production]] = {}
+        for p in grammar.productions:
+            by_lhs.setdefault(p.lhs, []).append(p)
+        self.prods_by_lhs: Mapping[str, Tuple[Production, ...]] = MappingProxyType(
+            {lhs: tuple(prods) for lhs, prods in by_lhs.items()}
+        )
+        self.start_prod = self.prods_by_lhs[grammar.augmented_start][0]
+        self.first = _frozen_sets(_compute_first_sets(grammar))
+        self.follow = _frozen_sets(_compute_follow_sets(grammar, self.first))
+        self.nullable = frozenset(nt for nt in grammar.nonterminals if "" in self.first[nt])
+
+        # Table column order: terminals sorted with EOF last, then nonterminals.
+        self.terminals = sorted(t for t in grammar.terminals if t != "EOF") + ["EOF"]
+        self.nonterminals = sorted(
+            nt for nt in grammar.nonterminals if nt != grammar.augmented_start
+        )
+        self.symbol_rank = {
+            sym: i for i, sym in enumerate(self.terminals + sorted(grammar.nonterminals))
+        }
+        self.term_bit = {t: 1 << i for i, t in enumerate(self.terminals)}
+        self.first_mask = {sym: self.mask_of(fs) for sym, fs in self.first.items()}
+
+        self.item_base: Dict[int, int] = {}
+        self.item_prod: List[int] = []
+        self.item_dot: List[int] = []
+        self.item_next: List[str | None] = []
+        self.item_beta_first: List[int] = []  # FIRST(rhs[dot + 1:]) as a mask
+        self.item_beta_nullable: List[bool] = []
+        for p in sorted(grammar.productions, key=lambda pr: pr.id):
+            self.item_base[p.id] = len(self.item_prod)
+            for dot in range(len(p.rhs) + 1):
+                self.item_prod.append(p.id)
+                self.item_dot.append(dot)
+                self.item_next.append(p.rhs[dot] if dot < len(p.rhs) else None)
+                mask, nullable = self._sequence_mask(p.rhs[dot + 1 :])
+                self.item_beta_first.append(mask)
+                self.item_beta_nullable.append(nullable)
+        self.nt_items: Dict[str, Tuple[int, ...]] = {
+            nt: tuple(self.item_base[p.id] for p in prods)
+            for nt, prods in self.prods_by_lhs.items()
+        }
+
+        self._lr0_closures: Dict[frozenset[int], frozenset[int]] = {}
+        self._lr1_closures: Dict[Kernel, Dict[int, int]] = {}
+        self._mask_names: Dict[int, frozenset[str]] = {}
+
+    def _sequence_mask(self, symbols: Iterable[str]) -> Tuple[int, bool]:
+        mask = 0
+        for sym in symbols:
+            mask |= self.first_mask[sym]
+            if sym not in self.nullable:
+                return mask, False
+        return mask, True
+
+    def item_id(self, prod_id: int, dot: int) -> int:
+        return self.item_base[prod_id] + dot
+
+    def core_of(self, item: int) -> Core:
+        return (self.item_prod[item], self.item_dot[item])
+
+    def mask_of(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            if name:
+                mask |= self.term_bit[name]
+        return mask
+
+    def names_of(self, mask: int) -> frozenset[str]:
+        names = self._mask_names.get(mask)
+        if names is None:
+            names = frozenset(t for t, bit in self.term_bit.items() if mask & bit)
+            self._mask_names[mask] = names
+        return names
+
+    def first_of_sequence(self, symbols: Iterable[str]) -> Tuple[Set[str], bool]:
+        """Return (first set, derives_epsilon) for a sequence of symbols."""
+        first: Set[str] = set()
+        derives_epsilon = True
+        for sym in symbols:
+            sym_first = self.first[sym]
+            first.update(sym_first - {""})
+            if "" not in sym_first:
+                derives_epsilon = False
+                break
+        if derives_epsilon:
+            first.add("")
+        return first, derives_epsilon
+
+    def lr0_closure(self, kernel: frozenset[int]) -> frozenset[int]:
+        cached = self._lr0_closures.get(kernel)
+        if cached is not None:
+            return cached
+        items = set(kernel)
+        stack = list(kernel)
+        nt_items = self.nt_items
+        while stack:
+            for child in nt_items.get(self.item_next[stack.pop()], ()):
+                if child not in items:
+                    items.add(child)
+                    stack.append(child)
+        result = frozenset(items)
+        self._lr0_closures[kernel] = result
+        return result
+
+    def lr1_closure(self, kernel: Kernel) -> Dict[int, int]:
+        """Closure of a kernel as {item id: lookahead mask}; callers must not mutate it."""
+        cached = self._lr1_closures.get(kernel)
+        if cached is not None:
+            return cached
+        las: Dict[int, int] = dict(kernel)
+        stack = [item for item, _ in kernel]
+        nt_items, item_next = self.nt_items, self.item_next
+        beta_first, beta_nullable = self.item_beta_first, self.item_beta_nullable
+        while stack:
+            item = stack.pop()
+            children = nt_items.get(item_next[item])
+            if not children:
+                continue
+            needed = beta_first[item]
+            if beta_nullable[item]:
+                needed |= las[item]
+            for child in children:
+                prev = las.get(child)
+                if prev is None:
+                    las[child] = needed
+                    stack.append(child)
+                elif needed & ~prev:
+                    las[child] = prev | needed
+                    stack.append(child)
+        self._lr1_closures[kernel] = las
+        return las
+
+    def lr1_items(self, las: Mapping[int, int]) -> frozenset[LR1Item]:
+        return frozenset(
+            LR1Item(self.item_prod[it], self.item_dot[it], self.names_of(mask))
+            for it, mask in las.items()
+        )
+
+    def kernel_of(self, items: Iterable[LR1Item]) -> Kernel:
+        merged: Dict[int, int] = {}
+        for it in items:
+            key = self.item_id(it.prod_id, it.dot)
+            merged[key] = merged.get(key, 0) | self.mask_of(it.lookahead)
+        return tuple(sorted(merged.items()))
+
+    def successors(self, items: Mapping[int, int] | Iterable[int]) -> List[Tuple[str, object]]:
+        """Group items by the symbol after the dot, in table symbol order.
+
+        Returns ``(symbol, moved)`` pairs where ``moved`` is a ``{item + 1: mask}``
+        dict for LR(1) closures and a set of ``item + 1`` for LR(0) closures.
+        """
+        by_symbol: Dict[str, object] = {}
+        item_next = self.item_next
+        if isinstance(items, Mapping):
+            for it, mask in items.items():
+                sym = item_next[it]
+                if sym is not None:
+                    by_symbol.setdefault(sym, {})[it + 1] = mask  # type: ignore[index]
+        else:
+            for it in items:
+                sym = item_next[it]
+                if sym is not None:
+                    by_symbol.setdefault(sym, set()).add(it + 1)  # type: ignore[union-attr]
+        rank = self.symbol_rank
+        return sorted(by_symbol.items(), key=lambda kv: rank[kv[0]])
+
+
+_ANALYSES: Dict[str, GrammarAnalysis] = {}
+
+# Guards the first computation of every memo in this module, so threads that
+# need an analysis or the tables at the same time build them once. Reentrant:
+# load_compiled_tables loads the tables under it.
+_MEMO_LOCK = threading.RLock()
+
+
+def analyze(grammar: Grammar | None = None) -> GrammarAnalysis:
+    """Return the (memoized) GrammarAnalysis for ``grammar`` (default: GRAMMAR)."""
+    g = grammar if grammar is not None else GRAMMAR
+    key = grammar_hash(g)
+    ga = _ANALYSES.get(key)
+    if ga is None:
+        with _MEMO_LOCK:
+            ga = _ANALYSES.get(key)
+            if ga is None:
+                ga = GrammarAnalysis(g)
+                _ANALYSES[key] = ga
+    return ga
+
+
+# PROD_BY_ID, PRODS_BY_LHS, FIRST and FOLLOW of the default grammar are computed
+# on first access (module __getattr__), not when the module is imported. They
+# are the shared analysis's read-only views.
+_ANALYSIS_ATTRS = {
+    "PROD_BY_ID": "prod_by_id",
+    "PRODS_BY_LHS": "prods_by_lhs",
+    "FIRST": "first",
+    "FOLLOW": "follow",
+}
+
+
+def __getattr__(name: str) -> object:
+    attr = _ANALYSIS_ATTRS.get(name)
+    if attr is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(analyze(GRAMMAR), attr)
 
 
 def first_of_sequence(symbols: Iterable[str]) -> Tuple[Set[str], bool]:
     """Return (first set, derives_epsilon) for a sequence of symbols."""
-    first: Set[str] = set()
-    derives_epsilon = True
-    for sym in symbols:
-        sym_first = FIRST[sym]
-        first.update(sym_first - {""})
-        if "" not in sym_first:
-            derives_epsilon = False
-            break
-    if derives_epsilon:
-        first.add("")
-    return first, derives_epsilon
-
-
-def closure(items: Set[LR1Item]) -> Set[LR1Item]:
+    return analyze(GRAMMAR).first_of_sequence(symbols)
+
+
+def closure(items: Set[LR1Item], grammar: Grammar | None = None) -> Set[LR1Item]:
     """Compute LR(1) closure while merging lookahead sets per core."""
-    item_map: Dict[Tuple[int, int], Set[str]] = {}
-    for it in items:
-        item_map.setdefault(it.core(), set()).update(it.lookahead)
-
-    queue: List[Tuple[int, int]] = sorted(item_map.keys())
-    while queue:
-        core = queue.pop(0)
-        lookaheads = item_map[core]
-        prod = PROD_BY_ID[core[0]]
-        dot = core[1]
-        if dot >= len(prod.rhs):
-            continue
-        symbol = prod.rhs[dot]
-        if symbol in GRAMMAR.terminals:
-            continue
-        beta = prod.rhs[dot + 1 :]
-        needed: Set[str] = set()
-        for la in sorted(lookaheads):
-            first_set, _ = first_of_sequence(list(beta) + [la])
-            needed.update(first_set - {""})
-        for p in sorted(PRODS_BY_LHS.get(symbol, []), key=lambda pr: pr.id):
-            key = (p.id, 0)
-            prev = item_map.get(key)
-            if prev is None:
-                item_map[key] = set(needed)
-                queue.append(key)
-            else:
-                new_las = needed - prev
-                if new_las:
-                    prev.update(new_las)
-                    queue.append(key)
-
-    return {
-        LR1Item(prod_id=pid, dot=dot, lookahead=frozenset(las))
-        for (pid, dot), las in item_map.items()
-    }
-
-
-def goto(items: Set[LR1Item], symbol: str) -> Set[LR1Item]:
-    moved: Dict[Tuple[int, int], Set[str]] = {}
-    for item in sorted(items, key=lambda it: (it.prod_id, it.dot, sorted(it.lookahead))):
-        prod = PROD_BY_ID[item.prod_id]
-        if item.dot < len(prod.rhs) and prod.rhs[item.dot] == symbol:
-            key = (item.prod_id, item.dot + 1)
-            moved.setdefault(key, set()).update(item.lookahead)
-    if not moved:
-        return set()
-    shifted = {LR1Item(prod_id=pid, dot=dot, lookahead=frozenset(las)) for (pid, dot), las in moved.items()}
-    return closure(shifted)
-
-
-def canonical_collection() -> List[LRState]:
-    start_prod = PROD_BY_ID[1]  # S' -> Program EOF
-    start_item = LR1Item(prod_id=start_prod.id, dot=0, lookahead=frozenset({"EOF"}))
-    start_state_items = frozenset(closure({start_item}))
-
-    states: List[LRState] = [LRState(id=0, items=start_state_items, transitions={}, sources=[0])]
-    state_index: Dict[frozenset[LR1Item], int] = {start_state_items: 0}
+    ga = analyze(grammar)
+    return set(ga.lr1_items(ga.lr1_closure(ga.kernel_of(items))))
+
+
+def goto(items: Set[LR1Item], symbol: str, grammar: Grammar | None = None) -> Set[LR1Item]:
+    ga = analyze(grammar)
+    las = ga.lr1_closure(ga.kernel_of(items))
+    for sym, moved in ga.successors(las):
+        if sym == symbol:
+            return set(ga.lr1_items(ga.lr1_closure(tuple(sorted(moved.items())))))  # type: ignore[attr-defined]
+    return set()
+
+
+def canonical_collection(grammar: Grammar | None = None) -> List[LRState]:
+    ga = analyze(grammar)
+    start: Kernel = ((ga.item_id(ga.start_prod.id, 0), ga.term_bit["EOF"]),)
+
+    closures: List[Dict[int, int]] = [ga.lr1_closure(start)]
+    transitions: List[Dict[str, int]] = [{}]
+    index: Dict[Kernel, int] = {start: 0}
     i = 0
-    terminal_list = sorted(t for t in GRAMMAR.terminals if t != "EOF") + ["EOF"]
-    nonterminal_list = sorted(GRAMMAR.nonterminals)
-    symbols = terminal_list + nonterminal_list
-    while i < len(states):
-        state = states[i]
+    while i < len(closures):
+        for sym, moved in ga.successors(closures[i]):
+            kernel: Kernel = tuple(sorted(moved.items()))  # type: ignore[attr-defined]
+            idx = index.get(kernel)
+            if idx is None:
+                idx = len(closures)
+                closures.append(ga.lr1_closure(kernel))
+                transitions.append({})
+                index[kernel] = idx
+            transitions[i][sym] = idx
         i += 1
-        for sym in symbols:
-            next_items = goto(set(state.items), sym)
-            if not next_items:
-                continue
-            frozen_items = frozenset(next_items)
-            if frozen_items not in state_index:
-                idx = len(states)
-                states.append(LRState(id=idx, items=frozen_items, transitions={}, sources=[idx]))
-                state_index[frozen_items] = idx
-            else:
-                idx = state_index[frozen_items]
-            state.transitions[sym] = idx
-    return states
+    return [
+        LRState(id=idx, items=ga.lr1_items(las), transitions=transitions[idx], sources=[idx])
+        for idx, las in enumerate(closures)
+    ]
 
 
 @dataclass
@@ -255,37 +441,199 @@ def merge_to_lalr(lr_states: List[LRState]) -> List[LALRState]:
     return lalr_states
 
 
+def lr0_collection(
+    grammar: Grammar | None = None,
+) -> Tuple[List[frozenset[int]], List[Dict[str, int]]]:
+    """Build the LR(0) automaton as closures of interned item ids.
+
+    State numbering matches merge_to_lalr's core ids: states are discovered
+    breadth-first with the same symbol order as canonical_collection, and a
+    canonical LR(1) state only yields new cores when it is the first state with
+    its core, so both walks number cores alike.
+    """
+    ga = analyze(grammar)
+    start = ga.lr0_closure(frozenset({ga.item_id(ga.start_prod.id, 0)}))
+    states: List[frozenset[int]] = [start]
+    transitions: List[Dict[str, int]] = [{}]
+    index: Dict[frozenset[int], int] = {start: 0}
+    i = 0
+    while i < len(states):
+        for sym, moved in ga.successors(states[i]):
+            target = ga.lr0_closure(frozenset(moved))  # type: ignore[arg-type]
+            idx = index.get(target)
+            if idx is None:
+                idx = len(states)
+                states.append(target)
+                transitions.append({})
+                index[target] = idx
+            transitions[i][sym] = idx
+        i += 1
+    return states, transitions
+
+
+def _digraph(
+    nodes: List[NtTrans],
+    relation: Mapping[NtTrans, List[NtTrans]],
+    initial: Mapping[NtTrans, int],
+) -> Dict[NtTrans, int]:
+    """DeRemer-Pennello DIGRAPH: F(x) = F'(x) | F(y) for all x R y, collapsing SCCs.
+
+    Sets are terminal bitmasks. The traversal keeps its own stack of
+    ``(node, depth, successors)`` frames instead of recursing, so a deep
+    relation needs no change to the process-wide recursion limit.
+    """
+    result: Dict[NtTrans, int] = {}
+    depth: Dict[NtTrans, int] = {x: 0 for x in nodes}
+    stack: List[NtTrans] = []
+    infinity = len(nodes) + 1
+
+    def enter(x: NtTrans) -> Tuple[NtTrans, int, Iterator[NtTrans]]:
+        stack.append(x)
+        d = depth[x] = len(stack)
+        result[x] = initial.get(x, 0)
+        return x, d, iter(relation.get(x, ()))
+
+    for root in nodes:
+        if depth[root] != 0:
+            continue
+        frames = [enter(root)]
+        while frames:
+            x, d, successors = frames[-1]
+            for y in successors:
+                if depth[y] == 0:
+                    frames.append(enter(y))
+                    break
+                depth[x] = min(depth[x], depth[y])
+                result[x] |= result[y]
+            else:
+                frames.pop()
+                if depth[x] == d:
+                    while True:
+                        top = stack.pop()
+                        depth[top] = infinity
+                        if top == x:
+                            break
+                        result[top] = result[x]
+                if frames:
+                    parent = frames[-1][0]
+                    depth[parent] = min(depth[parent], depth[x])
+                    result[parent] |= result[x]
+    return result
+
+
+def deremer_pennello_states(grammar: Grammar | None = None) -> List[LALRState]:
+    """Compute LALR(1) states from the LR(0) automaton with relational lookaheads.
+
+    Produces the same item sets (and therefore the same ACTION/GOTO tables) as
+    merge_to_lalr(canonical_collection()), without building LR(1) states.
+    """
+    ga = analyze(grammar)
+    states, transitions = lr0_collection(ga.grammar)
+    return [
+        LALRState(id=sid, items=ga.lr1_items(las), transitions=transitions[sid], sources=[])
+        for sid, las in enumerate(_lalr_lookaheads(ga, states, transitions))
+    ]
+
+
+def _lalr_lookaheads(
+    ga: GrammarAnalysis, states: List[frozenset[int]], transitions: List[Dict[str, int]]
+) -> List[Dict[int, int]]:
+    """DeRemer-Pennello lookaheads of an LR(0) automaton as {item id: mask} per state."""
+    g = ga.grammar
+    nullable = ga.nullable
+
+    nt_trans: List[NtTrans] = [
+        (p, sym) for p, trans in enumerate(transitions) for sym in trans if sym in g.nonterminals
+    ]
+
+    # Direct reads and reads relation
+    direct_reads: Dict[NtTrans, int] = {}
+    reads: Dict[NtTrans, List[NtTrans]] = {}
+    for p, a in nt_trans:
+        r = transitions[p][a]
+        direct_reads[(p, a)] = ga.mask_of(sym for sym in transitions[r] if sym in g.terminals)
+        reads[(p, a)] = [(r, c) for c in transitions[r] if c in nullable]
+    read_sets = _digraph(nt_trans, reads, direct_reads)
+
+    # includes and lookback, walking every production from each transition source
+    includes: Dict[NtTrans, List[NtTrans]] = {x: [] for x in nt_trans}
+    lookback: Dict[Tuple[int, int], List[NtTrans]] = {}
+    for p, b in nt_trans:
+        for prod in ga.prods_by_lhs.get(b, []):
+            q = p
+            item = ga.item_id(prod.id, 0)
+            rhs = prod.rhs
+            for dot, sym in enumerate(rhs):
+                lookback.setdefault((q, item + dot), []).append((p, b))
+                if sym in g.nonterminals and all(s in nullable for s in rhs[dot + 1 :]):
+                    includes[(q, sym)].append((p, b))
+                q = transitions[q][sym]
+            lookback.setdefault((q, item + len(rhs)), []).append((p, b))
+    follow_sets = _digraph(nt_trans, includes, read_sets)
+
+    eof_mask = ga.term_bit["EOF"]
+    start_prod = ga.start_prod.id
+    result: List[Dict[int, int]] = []
+    for sid, items in enumerate(states):
+        las: Dict[int, int] = {}
+        for item in items:
+            if ga.item_prod[item] == start_prod:
+                mask = eof_mask
+            else:
+                mask = 0
+                for x in lookback.get((sid, item), ()):
+                    mask |= follow_sets[x]
+            las[item] = mask
+        result.append(las)
+    return result
+
+
 def generate_tables(
     verbose: bool = True,
+    method: str = "deremer",
+    grammar: Grammar | None = None,
 ) -> Tuple[List[LALRState], List[str], List[str], Dict[int, Dict[str, str]], Dict[int, Dict[str, int]]]:
-    lr_states = canonical_collection()
-    terminals = sorted(t for t in GRAMMAR.terminals if t != "EOF")
-    terminals.append("EOF")
-    nonterminals = sorted(nt for nt in GRAMMAR.nonterminals if nt != "S'")
+    """Build LALR(1) tables for ``grammar`` (default: GRAMMAR).
+
+    ``method="deremer"`` (default) derives lookaheads from the LR(0) automaton;
+    ``method="canonical"`` builds the full LR(1) collection and merges it, which
+    additionally reports LR(1) conflicts so LALR merge conflicts can be told apart.
+    """
+    if method not in TABLE_METHODS:
+        raise UserError(f"Error: unsupported table method '{method}'")
+    ga = analyze(grammar)
+    g = ga.grammar
+    terminals = list(ga.terminals)
+    nonterminals = list(ga.nonterminals)
+
+    if method == "deremer":
+        lalr_states = deremer_pennello_states(g)
+        lalr_conflicts = detect_conflicts(lalr_states, terminals, nonterminals, "LALR(1)", g)
+        if verbose:
+            _report_conflicts("LALR(1)", lalr_conflicts)
+        try:
+            action, goto_table = build_action_goto(lalr_states, terminals, nonterminals, True, g)
+        except UserError as err:
+            raise UserError(
+                f"{err}\nRerun with --table-method canonical to check for LR(1) conflicts."
+            ) from err
+        return lalr_states, terminals, nonterminals, action, goto_table
+
+    lr_states = canonical_collection(g)
 
     # Diagnose canonical LR(1) conflicts without applying policies
-    lr_conflicts = detect_conflicts(lr_states, terminals, nonterminals, label="LR(1)")
+    lr_conflicts = detect_conflicts(lr_states, terminals, nonterminals, "LR(1)", g)
     if verbose:
-        if lr_conflicts:
-            print(f"LR(1) conflicts: {len(lr_conflicts)}", file=sys.stderr)
-            for msg in lr_conflicts:
-                print(msg, file=sys.stderr)
-        else:
-            print("LR(1) conflicts: 0", file=sys.stderr)
+        _report_conflicts("LR(1)", lr_conflicts)
 
     lalr_states = merge_to_lalr(lr_states)
-    lalr_conflicts = detect_conflicts(lalr_states, terminals, nonterminals, label="LALR(1)")
+    lalr_conflicts = detect_conflicts(lalr_states, terminals, nonterminals, "LALR(1)", g)
     if verbose:
-        if lalr_conflicts:
-            print(f"LALR(1) conflicts: {len(lalr_conflicts)}", file=sys.stderr)
-            for msg in lalr_conflicts:
-                print(msg, file=sys.stderr)
-        else:
-            print("LALR(1) conflicts: 0", file=sys.stderr)
+        _report_conflicts("LALR(1)", lalr_conflicts)
 
     # Build final tables (may apply dangling-else policy)
     try:
-        action, goto_table = build_action_goto(lalr_states, terminals, nonterminals, is_lalr=True)
+        action, goto_table = build_action_goto(lalr_states, terminals, nonterminals, True, g)
     except UserError as err:
         raise UserError(
             f"{err}\nCanonical LR(1) table had no conflicts; conflict introduced during LALR merge."
@@ -294,13 +642,459 @@ def generate_tables(
     return lalr_states, terminals, nonterminals, action, goto_table
 
 
+def _report_conflicts(label: str, conflicts: List[str]) -> None:
+    print(f"{label} conflicts: {len(conflicts)}", file=sys.stderr)
+    for msg in conflicts:
+        print(msg, file=sys.stderr)
+
+
+TABLE_CACHE_FILE = f"lalr_tables.v{TABLE_CACHE_VERSION}.json"
+
+
+_TABLES_MEMO: Dict[str, ParseTables] = {}
+_COMPILED_MEMO: Dict[Tuple[str, bool], CompiledTables] = {}
+
+
+def build_parse_tables(
+    verbose: bool = False, method: str = "deremer", grammar: Grammar | None = None
+) -> ParseTables:
+    """Generate LALR(1) tables from scratch and package them as ParseTables."""
+    g = grammar if grammar is not None else GRAMMAR
+    states, terminals, nonterminals, action, goto_table = generate_tables(
+        verbose=verbose, method=method, grammar=g
+    )
+    return ParseTables(
+        grammar_hash=grammar_hash(g),
+        terminals=terminals,
+        nonterminals=nonterminals,
+        action=action,
+        goto=goto_table,
+        productions={p.id: (p.lhs, p.rhs) for p in g.productions},
+        states=[_summarize(st) for st in states],
+    )
+
+
+def _summarize(st: LRState | LALRState) -> StateSummary:
+    return StateSummary(
+        id=st.id,
+        sources=list(st.sources or []),
+        items=sorted((it.prod_id, it.dot, tuple(sorted(it.lookahead))) for it in st.items),
+    )
+
+
+@dataclass
+class RebuildStats:
+    """What rebuild_parse_tables took over from the previous build."""
+
+    states: int
+    reused_states: int  # LR(0) closures renumbered from the previous build
+    reused_rows: int  # ACTION/GOTO rows (and state summaries) renumbered, not rebuilt
+    changed_nonterminals: List[str]
+
+    def report(self) -> str:
+        changed = ", ".join(self.changed_nonterminals) or "none"
+        return (
+            f"Incremental table rebuild: reused {self.reused_states}/{self.states} LR(0) states, "
+            f"{self.reused_rows}/{self.states} ACTION/GOTO rows; changed nonterminals: {changed}"
+        )
+
+
+def rebuild_parse_tables(
+    previous: ParseTables,
+    verbose: bool = False,
+    grammar: Grammar | None = None,
+    self_check: bool = False,
+) -> Tuple[ParseTables, RebuildStats]:
+    """Regenerate LALR(1) tables after a grammar edit, reusing ``previous``.
+
+    Productions are matched by (lhs, rhs); a nonterminal that gained or lost a
+    production is *changed*. Only states holding an item of a removed
+    production, or an item with the dot before a changed nonterminal, can
+    close or move differently, so every other state of ``previous`` is taken
+    over with its closure renumbered; the rest are closed afresh. Lookaheads
+    are then recomputed over the whole automaton (a FIRST set change can reach
+    any state) and the ACTION/GOTO rows of taken-over states whose lookaheads
+    came out unchanged are renumbered from ``previous``. Only the remaining
+    rows are built and checked for conflicts.
+
+    The result is identical to build_parse_tables(method="deremer"); with
+    ``self_check`` a from-scratch build is compared and any difference raises
+    UserError.
+    """
+    if previous.unit_chains:
+        raise UserError("Error: cannot rebuild from tables with unit reductions bypassed")
+    ga = analyze(grammar)
+    g = ga.grammar
+    terminals = list(ga.terminals)
+    nonterminals = list(ga.nonterminals)
+
+    # old production id -> new production id, for the productions that survived
+    by_rule: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+    for p in sorted(g.productions, key=lambda pr: pr.id):
+        by_rule.setdefault((p.lhs, p.rhs), []).append(p.id)
+    pid_map: Dict[int, int] = {}
+    changed: Set[str] = set()
+    for pid in sorted(previous.productions):
+        lhs, rhs = previous.productions[pid]
+        matches = by_rule.get((lhs, rhs))
+        if matches:
+            pid_map[pid] = matches.pop(0)
+        else:
+            changed.add(lhs)
+    changed.update(lhs for (lhs, _), left in by_rule.items() if left)
+
+    # Closures of the reusable old states in new item ids, indexed by kernel.
+    start_item = ga.item_id(ga.start_prod.id, 0)
+    reusable: Dict[int, frozenset[int]] = {}
+    old_by_kernel: Dict[frozenset[int], int] = {}
+    for st in previous.states:
+        items: List[int] = []
+        for pid, dot, _ in st.items:
+            new_pid = pid_map.get(pid)
+            if new_pid is None:
+                break
+            item = ga.item_id(new_pid, dot)
+            if ga.item_next[item] in changed:
+                break
+            items.append(item)
+        else:
+            reusable[st.id] = frozenset(items)
+            kernel = frozenset(it for it in items if ga.item_dot[it] > 0 or it == start_item)
+            old_by_kernel[kernel] = st.id
+
+    # LR(0) automaton, discovered in the same order as lr0_collection.
+    def close(kernel: frozenset[int]) -> Tuple[frozenset[int], int]:
+        old = old_by_kernel.get(kernel, -1)
+        return (reusable[old] if old >= 0 else ga.lr0_closure(kernel)), old
+
+    first, first_old = close(frozenset({start_item}))
+    states: List[frozenset[int]] = [first]
+    origin: List[int] = [first_old]  # old state id whose closure was reused, or -1
+    transitions: List[Dict[str, int]] = [{}]
+    index: Dict[frozenset[int], int] = {first: 0}
+    i = 0
+    while i < len(states):
+        for sym, moved in ga.successors(states[i]):
+            target, old = close(frozenset(moved))  # type: ignore[arg-type]
+            idx = index.get(target)
+            if idx is None:
+                idx = len(states)
+                states.append(target)
+                origin.append(old)
+                transitions.append({})
+                index[target] = idx
+            transitions[i][sym] = idx
+        i += 1
+
+    lookaheads = _lalr_lookaheads(ga, states, transitions)
+    old_states = {st.id: st for st in previous.states}
+    action: Dict[int, Dict[str, str]] = {}
+    goto_table: Dict[int, Dict[str, int]] = {}
+    summaries: List[StateSummary] = []
+    rebuilt: List[LALRState] = []
+    masks: Dict[Tuple[str, ...], int] = {}
+    for sid, las in enumerate(lookaheads):
+        old = origin[sid]
+        summary = (
+            _renumbered_summary(old_states[old], sid, las, pid_map, ga, masks) if old >= 0 else None
+        )
+        if summary is None:
+            rebuilt.append(
+                LALRState(id=sid, items=ga.lr1_items(las), transitions=transitions[sid], sources=[])
+            )
+            summaries.append(_summarize(rebuilt[-1]))
+            continue
+        summaries.append(summary)
+        row: Dict[str, str] = {}
+        goto_row: Dict[str, int] = {}
+        for sym, tgt in transitions[sid].items():
+            if sym in g.terminals:
+                row[sym] = f"s{tgt}"
+            else:
+                goto_row[sym] = tgt
+        for terminal, act in previous.action[old].items():
+            if act[0] == "r":
+                row[terminal] = f"r{pid_map[int(act[1:])]}"
+            elif act == "acc":
+                row[terminal] = act
+        action[sid] = row
+        goto_table[sid] = goto_row
+
+    conflicts = detect_conflicts(rebuilt, terminals, nonterminals, "LALR(1)", g)
+    if verbose:
+        _report_conflicts("LALR(1)", conflicts)
+    try:
+        fresh_action, fresh_goto = build_action_goto(rebuilt, terminals, nonterminals, True, g)
+    except UserError as err:
+        raise UserError(
+            f"{err}\nRerun with --table-method canonical to check for LR(1) conflicts."
+        ) from err
+    action.update(fresh_action)
+    goto_table.update(fresh_goto)
+
+    tables = ParseTables(
+        grammar_hash=grammar_hash(g),
+        terminals=terminals,
+        nonterminals=nonterminals,
+        action=dict(sorted(action.items())),
+        goto=dict(sorted(goto_table.items())),
+        productions={p.id: (p.lhs, p.rhs) for p in g.productions},
+        states=summaries,
+    )
+    stats = RebuildStats(
+        states=len(states),
+        reused_states=sum(1 for old in origin if old >= 0),
+        reused_rows=len(states) - len(rebuilt),
+        changed_nonterminals=sorted(changed),
+    )
+    if verbose:
+        print(stats.report(), file=sys.stderr)
+    if self_check:
+        _check_rebuild(tables, build_parse_tables(method="deremer", grammar=g))
+    return tables, stats
+
+
+def _renumbered_summary(
+    old: StateSummary,
+    sid: int,
+    las: Mapping[int, int],
+    pid_map: Mapping[int, int],
+    ga: GrammarAnalysis,
+    masks: Dict[Tuple[str, ...], int],
+) -> StateSummary | None:
+    """``old`` in new production ids, or None if its lookaheads no longer match ``las``.
+
+    ``masks`` caches the lookahead mask of each name tuple across calls.
+    """
+    if len(old.items) != len(las):
+        return None
+    item_base = ga.item_base
+    items: List[Tuple[int, int, Tuple[str, ...]]] = []
+    for pid, dot, names in old.items:
+        new_pid = pid_map[pid]
+        mask = masks.get(names)
+        if mask is None:
+            mask = masks[names] = _names_mask(names, ga.term_bit)
+        if las.get(item_base[new_pid] + dot) != mask:
+            return None
+        items.append((new_pid, dot, names))
+    items.sort()
+    return StateSummary(id=sid, sources=[], items=items)
+
+
+def _names_mask(names: Iterable[str], term_bit: Mapping[str, int]) -> int:
+    """Lookahead mask of ``names``; -1 (never a valid mask) if a terminal is gone."""
+    mask = 0
+    for name in names:
+        bit = term_bit.get(name)
+        if bit is None:
+            return -1
+        mask |= bit
+    return mask
+
+
+def _check_rebuild(tables: ParseTables, expected: ParseTables) -> None:
+    """Raise UserError describing the first difference between two builds."""
+    if tables == expected:
+        return
+    for name in ("terminals", "nonterminals", "productions"):
+        if getattr(tables, name) != getattr(expected, name):
+            raise UserError(f"Error: incremental table rebuild differs from a full build ({name})")
+    if len(tables.states) != len(expected.states):
+        raise UserError(
+            f"Error: incremental table rebuild has {len(tables.states)} states, "
+            f"a full build {len(expected.states)}"
+        )
+    for st in expected.states:
+        sid = st.id
+        if (
+            tables.states[sid] != st
+            or tables.action.get(sid) != expected.action.get(sid)
+            or tables.goto.get(sid) != expected.goto.get(sid)
+        ):
+            raise UserError(f"Error: incremental table rebuild differs from a full build at state {sid}")
+    raise UserError("Error: incremental table rebuild differs from a full build")
+
+
+def bypass_unit_reductions(
+    tables: ParseTables,
+    units: Iterable[int] = IDENTITY_UNIT_PRODUCTIONS,
+    grammar: Grammar | None = None,
+) -> ParseTables:
+    """Fold reductions by the unit productions ``units`` into GOTO.
+
+    A state whose every ACTION entry reduces by the same unit production
+    ``A -> B`` is entered only through GOTO on ``B`` and immediately leaves
+    through GOTO on ``A`` from the state below it. Each GOTO entry leading into
+    such a state is redirected to where that chain of reductions ends, so the
+    parser pushes ``A`` in one step. Only use this when each unit production's
+    semantic value is its child's value. The skipped productions are recorded in
+    ``unit_chains`` and the skipped states in ``unit_states``; the bypassed
+    states become unreachable but keep their ids.
+    """
+    g = grammar if grammar is not None else GRAMMAR
+    prods = {p.id: p for p in g.productions}
+    units = set(units)
+    for pid in units:
+        if pid not in prods or len(prods[pid].rhs) != 1 or prods[pid].rhs[0] not in g.nonterminals:
+            raise UserError(f"Error: production {pid} is not a unit production")
+
+    unit_only: Dict[int, int] = {}
+    for state, row in tables.action.items():
+        acts = set(row.values())
+        if len(acts) == 1:
+            act = next(iter(acts))
+            if act.startswith("r") and int(act[1:]) in units:
+                unit_only[state] = int(act[1:])
+
+    goto_table: Dict[int, Dict[str, int]] = {}
+    chains: Dict[Tuple[int, str], Tuple[int, ...]] = {}
+    skipped: Dict[Tuple[int, str], Tuple[int, ...]] = {}
+    for state, row in tables.goto.items():
+        new_row: Dict[str, int] = {}
+        for nt, target in row.items():
+            chain: List[int] = []
+            passed: List[int] = []
+            while target in unit_only:
+                pid = unit_only[target]
+                chain.append(pid)
+                passed.append(target)
+                target = tables.goto[state][prods[pid].lhs]
+            new_row[nt] = target
+            if chain:
+                chains[(state, nt)] = tuple(chain)
+                skipped[(state, nt)] = tuple(passed)
+        goto_table[state] = new_row
+    return replace(tables, goto=goto_table, unit_chains=chains, unit_states=skipped)
+
+
+def table_cache_path(directory: Path | None = None) -> Path:
+    return (directory if directory is not None else cache_dir()) / TABLE_CACHE_FILE
+
+
+def load_tables(
+    refresh: bool = False,
+    verbose: bool = False,
+    directory: Path | None = None,
+    method: str = "deremer",
+    self_check: bool | None = None,
+) -> ParseTables:
+    """Return LALR(1) tables, reusing the on-disk cache when the grammar is unchanged.
+
+    The cache is keyed by ``grammar_hash(GRAMMAR)`` and the cache format version;
+    a missing or unreadable cache file is rebuilt transparently. With
+    ``refresh`` the tables are regenerated (and the cache rewritten) regardless;
+    ``method`` only selects how a regeneration builds them (see generate_tables).
+    A cache left by an older grammar is not discarded: with the default method
+    it seeds rebuild_parse_tables, which redoes only what the grammar edit
+    touched. ``self_check`` (default: ``MINILANG_TABLE_SELF_CHECK=1``) compares
+    such a rebuild with a from-scratch build.
+
+    The tables returned are shared by every caller (and thread) in the process
+    and must not be modified.
+    """
+    key = grammar_hash(GRAMMAR)
+    if not refresh:
+        memo = _TABLES_MEMO.get(key)
+        if memo is not None:
+            return memo
+    with _MEMO_LOCK:
+        if not refresh:
+            memo = _TABLES_MEMO.get(key)
+            if memo is not None:
+                return memo  # another thread loaded them while this one waited
+        return _load_tables(key, refresh, verbose, directory, method, self_check)
+
+
+def _load_tables(
+    key: str,
+    refresh: bool,
+    verbose: bool,
+    directory: Path | None,
+    method: str,
+    self_check: bool | None,
+) -> ParseTables:
+    path = table_cache_path(directory)
+    cached = _read_table_cache(path)
+    tables = cached if cached is not None and cached.grammar_hash == key and not refresh else None
+    for unit_bypass in (False, True):
+        _COMPILED_MEMO.pop((key, unit_bypass), None)
+    rebuilt = tables is None
+    if tables is None:
+        if cached is not None and cached.grammar_hash != key and method == "deremer":
+            if self_check is None:
+                self_check = os.environ.get("MINILANG_TABLE_SELF_CHECK") == "1"
+            try:
+                tables, _ = rebuild_parse_tables(cached, verbose=verbose, self_check=self_check)
+            except (KeyError, IndexError, ValueError):
+                tables = None  # inconsistent cache file: fall back to a full build
+        if tables is None:
+            tables = build_parse_tables(verbose=verbose, method=method)
+        _write_table_cache(path, tables)
+    _TABLES_MEMO[key] = tables
+    if rebuilt and verbose:
+        print(load_compiled_tables().size_report(), file=sys.stderr)
+    return tables
+
+
+def load_compiled_tables(unit_bypass: bool = True) -> CompiledTables:
+    """Return the compressed integer tables for the current grammar (memoized per process).
+
+    With ``unit_bypass`` the identity unit reductions are folded into GOTO
+    (see bypass_unit_reductions); the ASTs built are the same either way.
+    """
+    key = grammar_hash(GRAMMAR)
+    compiled = _COMPILED_MEMO.get((key, unit_bypass))
+    if compiled is None:
+        with _MEMO_LOCK:
+            compiled = _COMPILED_MEMO.get((key, unit_bypass))
+            if compiled is None:
+                tables = load_tables()
+                compiled = compile_tables(
+                    bypass_unit_reductions(tables) if unit_bypass else tables
+                )
+                _COMPILED_MEMO[(key, unit_bypass)] = compiled
+    return compiled
+
+
+def _read_table_cache(path: Path) -> ParseTables | None:
+    """The cached tables of whichever grammar last wrote ``path``, if readable."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != TABLE_CACHE_VERSION:
+        return None
+    try:
+        return ParseTables.from_json(data)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _write_table_cache(path: Path, tables: ParseTables) -> None:
+    """Best-effort atomic write; an unwritable cache directory only costs speed."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(tables.to_json(), separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
 def detect_conflicts(
     states: List[LRState] | List[LALRState],
     terminals: List[str],
     nonterminals: List[str],
     label: str,
+    grammar: Grammar | None = None,
 ) -> List[str]:
     """Build ACTION/GOTO without policy resolution; return conflict messages."""
+    ga = analyze(grammar)
+    g = ga.grammar
     action: Dict[int, Dict[str, str]] = {}
     goto_table: Dict[int, Dict[str, int]] = {}
     conflicts: List[str] = []
@@ -315,19 +1109,19 @@ def detect_conflicts(
     for idx, st in enumerate(states):
         cur_id = sid(idx, st)
         for sym, tgt in st.transitions.items():
-            if sym in GRAMMAR.terminals:
-                _record_action(action, cur_id, sym, f"s{tgt}", st, None, conflicts, label)
-            elif sym in GRAMMAR.nonterminals:
+            if sym in g.terminals:
+                _record_action(action, cur_id, sym, f"s{tgt}", st, None, conflicts, label, ga)
+            elif sym in g.nonterminals:
                 goto_table[cur_id][sym] = tgt
         for item in st.items:
-            prod = PROD_BY_ID[item.prod_id]
+            prod = ga.prod_by_id[item.prod_id]
             if item.dot == len(prod.rhs):
                 for la in sorted(item.lookahead):
-                    if prod.lhs == GRAMMAR.augmented_start:
+                    if prod.lhs == g.augmented_start:
                         if la == "EOF":
-                            _record_action(action, cur_id, "EOF", "acc", st, item, conflicts, label)
+                            _record_action(action, cur_id, "EOF", "acc", st, item, conflicts, label, ga)
                         continue
-                    _record_action(action, cur_id, la, f"r{prod.id}", st, item, conflicts, label)
+                    _record_action(action, cur_id, la, f"r{prod.id}", st, item, conflicts, label, ga)
     return conflicts
 
 
@@ -336,7 +1130,10 @@ def build_action_goto(
     terminals: List[str],
     nonterminals: List[str],
     is_lalr: bool,
+    grammar: Grammar | None = None,
 ) -> Tuple[Dict[int, Dict[str, str]], Dict[int, Dict[str, int]]]:
+    ga = analyze(grammar)
+    g = ga.grammar
     action: Dict[int, Dict[str, str]] = {}
     goto_table: Dict[int, Dict[str, int]] = {}
 
@@ -351,20 +1148,20 @@ def build_action_goto(
         cur_id = sid(idx, st)
         # shifts
         for sym, tgt in st.transitions.items():
-            if sym in GRAMMAR.terminals:
-                _set_action(action, cur_id, sym, f"s{tgt}", st, None)
-            elif sym in GRAMMAR.nonterminals:
+            if sym in g.terminals:
+                _set_action(action, cur_id, sym, f"s{tgt}", st, None, ga)
+            elif sym in g.nonterminals:
                 goto_table[cur_id][sym] = tgt
         # reductions
         for item in st.items:
-            prod = PROD_BY_ID[item.prod_id]
+            prod = ga.prod_by_id[item.prod_id]
             if item.dot == len(prod.rhs):
                 for la in sorted(item.lookahead):
-                    if prod.lhs == GRAMMAR.augmented_start:
+                    if prod.lhs == g.augmented_start:
                         if la == "EOF":
-                            _set_action(action, cur_id, "EOF", "acc", st, item)
+                            _set_action(action, cur_id, "EOF", "acc", st, item, ga)
                         continue
-                    _set_action(action, cur_id, la, f"r{prod.id}", st, item)
+                    _set_action(action, cur_id, la, f"r{prod.id}", st, item, ga)
 
     return action, goto_table
 
@@ -376,10 +1173,11 @@ def _set_action(
     value: str,
     state: object,
     item: LR1Item | None = None,
+    ga: GrammarAnalysis | None = None,
 ) -> None:
     existing = table[state_id].get(terminal)
     if existing and existing != value:
-        details = _describe_conflict(state, terminal, existing, value, item)
+        details = _describe_conflict(state, terminal, existing, value, item, ga)
         raise UserError(details)
     table[state_id][terminal] = value
 
@@ -393,17 +1191,25 @@ def _record_action(
     item: LR1Item | None,
     conflicts: List[str],
     label: str,
+    ga: GrammarAnalysis | None = None,
 ) -> None:
     existing = table[state_id].get(terminal)
     if existing and existing != value:
-        conflicts.append(f"[{label}] {_describe_conflict(state, terminal, existing, value, item)}")
+        details = _describe_conflict(state, terminal, existing, value, item, ga)
+        conflicts.append(f"[{label}] {details}")
         return
     table[state_id][terminal] = value
 
 
 def _describe_conflict(
-    state: object, terminal: str, existing: str, new: str, item: LR1Item | None
+    state: object,
+    terminal: str,
+    existing: str,
+    new: str,
+    item: LR1Item | None,
+    ga: GrammarAnalysis | None = None,
 ) -> str:
+    prod_by_id = (ga if ga is not None else analyze()).prod_by_id
     sid = state.id if hasattr(state, "id") else "?"
     sources = getattr(state, "sources", [])
     parts = [
@@ -411,7 +1217,7 @@ def _describe_conflict(
         f"  sources (LR states): {sources}",
     ]
     if item:
-        prod = PROD_BY_ID[item.prod_id]
+        prod = prod_by_id[item.prod_id]
         rhs = list(prod.rhs)
         rhs.insert(item.dot, "·")
         parts.append(f"  item: [{prod.lhs} -> {' '.join(rhs)}, {sorted(item.lookahead)}]")
@@ -419,7 +1225,7 @@ def _describe_conflict(
     def _la_sort(it: LR1Item) -> Tuple[int, int, Tuple[str, ...]]:
         return (it.prod_id, it.dot, tuple(sorted(it.lookahead)))
     for it in sorted(state.items, key=_la_sort):
-        prod = PROD_BY_ID[it.prod_id]
+        prod = prod_by_id[it.prod_id]
         rhs = list(prod.rhs)
         rhs.insert(it.dot, "·")
         parts.append(f"    [{prod.id}] {prod.lhs} -> {' '.join(rhs)}, {sorted(it.lookahead)}]")
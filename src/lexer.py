@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import mmap
+import re
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 
 from .utils import UserError, ensure_input_file
 
@@ -57,13 +61,137 @@ class Token:
 
 def tokenize(path: str | Path) -> List[Token]:
     source_path = ensure_input_file(path)
-    text = source_path.read_text(encoding="utf-8")
+    return tokenize_text(source_path.read_text(encoding="utf-8"))
+
+
+# Sources at least this long go through the NumPy fast path when NumPy is
+# installed; below it, importing NumPy costs more than it saves.
+NUMPY_MIN_CHARS = 64 * 1024
+
+
+def tokenize_buffer(path: str | Path) -> TokenBuffer:
+    source_path = ensure_input_file(path)
+    return tokenize_source(source_path.read_text(encoding="utf-8"))
+
+
+def tokenize_source(text: str) -> TokenBuffer:
+    """Tokenize source ``text`` held in memory; the same tokens as ``tokenize_buffer``.
+
+    ``\\r\\n`` and a lone ``\\r`` end a line, as they do for ``read_text``.
+    """
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if len(text) >= NUMPY_MIN_CHARS:
+        try:
+            from .lexer_numpy import tokenize_numpy
+        except ModuleNotFoundError as exc:
+            if exc.name != "numpy":
+                raise
+        else:
+            return tokenize_numpy(text)
+    return TokenBuffer.from_text(text)
+
+
+def tokenize_text(
+    text: str,
+    start: int = 0,
+    end: int | None = None,
+    line: int = 1,
+    col: int = 1,
+    offsets: List[int] | None = None,
+) -> List[Token]:
+    """Tokenize ``text[start:end]``, whose first character sits at ``line``:``col``.
+
+    When ``offsets`` is given, the start offset (into ``text``) of every token is
+    appended to it, which the incremental front end uses to map edits to tokens.
+
+    Each line is lexed with one ``findall`` of a compiled regex, so the per-token
+    work in Python is a dict lookup and a ``Token``. Lines the regex cannot take
+    (non-ASCII, or anything the scanner would reject) go to the character
+    scanner instead, so tokens and error messages are the scanner's either way.
+    Tokens never span a newline, which makes a line a safe unit.
+    """
     tokens: List[Token] = []
-    i = 0
-    line = 1
-    col = 1
+    stop = len(text) if end is None else end
+    fixed, append, ident, num = _FIXED_TOKENS, tokens.append, TokenType.ID, TokenType.NUM
+    pos = start
+
+    while pos < stop:
+        eol = text.find("\n", pos, stop)
+        if eol < 0:
+            eol = stop
+        src = text[pos:eol]
+        cut = src.find("//")
+        if cut >= 0:
+            src = src[:cut]
+        if not src.isascii() or _REJECT_RE.search(src) is not None:
+            _scan(text, pos, eol, line, col, offsets, tokens)
+        else:
+            # ``c`` is the column of the next unread character of ``src``.
+            c = col
+            for blank, lexeme in _TOKEN_RE.findall(src):
+                c += len(blank)
+                ttype = fixed.get(lexeme)
+                if ttype is None:
+                    ttype = num if lexeme[0] <= "9" else ident
+                append(Token(len(tokens), ttype, lexeme, line, c))
+                if offsets is not None:
+                    offsets.append(pos + c - col)
+                c += len(lexeme)
+        pos = eol + 1
+        line += 1
+        col = 1
+    return tokens
+
+
+# One token per match, with the blanks before it. Every character of an ASCII
+# line that passes ``_REJECT_RE`` is a blank or part of a token, so ``findall``
+# never skips anything but trailing blanks.
+_TOKEN_RE = re.compile(r"([ \t\r]*)([A-Za-z_][A-Za-z0-9_]*|[0-9]+|[=!<>]=|[-+*/=<>;(){}])")
+
+# What the regex would lex where the scanner raises: "===", "!==", "12abc", a
+# lone "!", and characters outside the language.
+_REJECT_RE = re.compile(
+    r"[=!]==|(?<![A-Za-z0-9_])[0-9]+[A-Za-z_]|!(?!=)|[^ \t\rA-Za-z0-9_=!<>+\-*/;(){}]"
+)
+
+_SINGLE_CHAR_TOKENS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MUL,
+    "/": TokenType.DIV,
+    "=": TokenType.ASSIGN,
+    "<": TokenType.LT,
+    ">": TokenType.GT,
+    ";": TokenType.SEMI,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+}
+
+_TWO_CHAR_TOKENS = {
+    "==": TokenType.EQ,
+    "!=": TokenType.NE,
+    "<=": TokenType.LE,
+    ">=": TokenType.GE,
+}
+
+# Lexemes with a fixed token type: keywords and operators.
+_FIXED_TOKENS = {**KEYWORDS, **_SINGLE_CHAR_TOKENS, **_TWO_CHAR_TOKENS}
+
 
-    while i < len(text):
+def _scan(
+    text: str,
+    i: int,
+    stop: int,
+    line: int,
+    col: int,
+    offsets: List[int] | None,
+    tokens: List[Token],
+) -> None:
+    """Character-at-a-time scanner for ``text[i:stop]``; appends to ``tokens``."""
+    while i < stop:
         ch = text[i]
 
         # Whitespace and newlines
@@ -78,77 +206,65 @@ def tokenize(path: str | Path) -> List[Token]:
             continue
 
         # Line comment
-        if ch == "/" and _peek(text, i) == "/":
-            while i < len(text) and text[i] != "\n":
+        if ch == "/" and i + 1 < stop and text[i + 1] == "/":
+            while i < stop and text[i] != "\n":
                 i += 1
                 col += 1
             continue
 
         start_line, start_col = line, col
+        token_start = i
 
         # Identifiers / keywords
         if ch.isalpha() or ch == "_":
-            start = i
-            while i < len(text) and (text[i].isalnum() or text[i] == "_"):
+            while i < stop and (text[i].isalnum() or text[i] == "_"):
                 i += 1
                 col += 1
-            lexeme = text[start:i]
+            lexeme = text[token_start:i]
             ttype = KEYWORDS.get(lexeme, TokenType.ID)
             tokens.append(Token(len(tokens), ttype, lexeme, start_line, start_col))
+            if offsets is not None:
+                offsets.append(token_start)
             continue
 
         # Numbers
         if ch.isdigit():
-            start = i
-            while i < len(text) and text[i].isdigit():
+            while i < stop and text[i].isdigit():
                 i += 1
                 col += 1
-            lexeme = text[start:i]
-            if i < len(text) and (text[i].isalpha() or text[i] == "_"):
+            lexeme = text[token_start:i]
+            if i < stop and (text[i].isalpha() or text[i] == "_"):
                 raise UserError(
                     f"Error {start_line}:{start_col}: Invalid identifier starting with digit"
                 )
             tokens.append(Token(len(tokens), TokenType.NUM, lexeme, start_line, start_col))
+            if offsets is not None:
+                offsets.append(token_start)
             continue
 
         # Two-char operators
-        two_char = text[i : i + 2]
-        if two_char in ("==", "!=", "<=", ">="):
+        two_char = text[i : min(i + 2, stop)]
+        if two_char in _TWO_CHAR_TOKENS:
             # Reject triple operators like "===" or "!=="
-            if two_char in ("==", "!=") and i + 2 < len(text) and text[i + 2] == "=":
+            if two_char in ("==", "!=") and i + 2 < stop and text[i + 2] == "=":
                 raise UserError(
                     f"Error {start_line}:{start_col + 2}: Expected valid token, but got CHAR('=')"
                 )
-            if two_char == "==":
-                tt = TokenType.EQ
-            elif two_char == "!=":
-                tt = TokenType.NE
-            elif two_char == "<=":
-                tt = TokenType.LE
-            else:
-                tt = TokenType.GE
-            tokens.append(Token(len(tokens), tt, two_char, start_line, start_col))
+            tokens.append(
+                Token(len(tokens), _TWO_CHAR_TOKENS[two_char], two_char, start_line, start_col)
+            )
+            if offsets is not None:
+                offsets.append(token_start)
             i += 2
             col += 2
             continue
 
         # Single-char tokens
-        single_map = {
-            "+": TokenType.PLUS,
-            "-": TokenType.MINUS,
-            "*": TokenType.MUL,
-            "/": TokenType.DIV,
-            "=": TokenType.ASSIGN,
-            "<": TokenType.LT,
-            ">": TokenType.GT,
-            ";": TokenType.SEMI,
-            "(": TokenType.LPAREN,
-            ")": TokenType.RPAREN,
-            "{": TokenType.LBRACE,
-            "}": TokenType.RBRACE,
-        }
-        if ch in single_map:
-            tokens.append(Token(len(tokens), single_map[ch], ch, start_line, start_col))
+        single = _SINGLE_CHAR_TOKENS.get(ch)
+        if single is not None:
+            tokens.append(Token(len(tokens), single, ch, start_line, start_col))
+            if offsets is not None:
+                offsets.append(token_start)
             i += 1
             col += 1
             continue
@@ -158,9 +274,288 @@ def tokenize(path: str | Path) -> List[Token]:
             f"Error {start_line}:{start_col}: Expected valid token, but got CHAR('{ch}')"
         )
 
+
+# Type codes stored by ``TokenBuffer``: the position in ``TokenType``.
+TOKEN_TYPES = list(TokenType)
+_TYPE_CODES = {ttype: code for code, ttype in enumerate(TOKEN_TYPES)}
+_FIXED_CODES = {lexeme: _TYPE_CODES[ttype] for lexeme, ttype in _FIXED_TOKENS.items()}
+
+
+class TokenView:
+    """Read-only ``Token`` look-alike for one entry of a ``TokenBuffer``."""
+
+    __slots__ = ("_buffer", "index")
+
+    def __init__(self, buffer: TokenBuffer, index: int):
+        self._buffer = buffer
+        self.index = index
+
+    @property
+    def type(self) -> TokenType:
+        return TOKEN_TYPES[self._buffer.types[self.index]]
+
+    @property
+    def lexeme(self) -> str:
+        buf = self._buffer
+        offset = buf.offsets[self.index]
+        return buf.source[offset : offset + buf.lengths[self.index]]
+
+    @property
+    def line(self) -> int:
+        return self._buffer.lines[self.index]
+
+    @property
+    def col(self) -> int:
+        return self._buffer.cols[self.index]
+
+    def __repr__(self) -> str:
+        return (
+            f"TokenView(index={self.index}, type={self.type}, lexeme={self.lexeme!r}, "
+            f"line={self.line}, col={self.col})"
+        )
+
+
+class TokenBuffer:
+    """A token list stored as parallel ``array('i')`` columns over one source string.
+
+    A token costs five machine ints instead of a dataclass instance and its
+    lexeme string. Indexing returns a ``TokenView`` (built on demand, not kept);
+    slicing returns a new buffer over the same source and symbol table.
+
+    ``symbols`` holds the identifiers of the whole source, interned while it
+    was lexed, with their first occurrence and count.
+    """
+
+    def __init__(self, source: str, symbols: SymbolTable | None = None):
+        self.source = source
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.types = array("i")  # index into TOKEN_TYPES
+        self.offsets = array("i")  # into ``source``
+        self.lengths = array("i")
+        self.lines = array("i")
+        self.cols = array("i")
+
+    @classmethod
+    def from_text(cls, text: str) -> TokenBuffer:
+        """Lex ``text`` straight into a buffer; same tokens and errors as ``tokenize_text``."""
+        buf = cls(text)
+        add_type, add_offset, add_length = buf.types.append, buf.offsets.append, buf.lengths.append
+        add_line, add_col = buf.lines.append, buf.cols.append
+        fixed, ident, num = _FIXED_CODES, _TYPE_CODES[TokenType.ID], _TYPE_CODES[TokenType.NUM]
+        symbols = buf.symbols
+        sym_ids, sym_counts, record = symbols.ids, symbols.counts, symbols.record
+        stop = len(text)
+        line, pos = 1, 0
+        while pos < stop:
+            eol = text.find("\n", pos)
+            if eol < 0:
+                eol = stop
+            src = text[pos:eol]
+            cut = src.find("//")
+            if cut >= 0:
+                src = src[:cut]
+            if not src.isascii() or _REJECT_RE.search(src) is not None:
+                offsets: List[int] = []
+                for tok, offset in zip(_scan_line(text, pos, eol, line, offsets), offsets):
+                    if tok.type == TokenType.ID:
+                        record(tok.lexeme, line, tok.col)
+                    add_type(_TYPE_CODES[tok.type])
+                    add_offset(offset)
+                    add_length(len(tok.lexeme))
+                    add_line(line)
+                    add_col(tok.col)
+            else:
+                c = 1
+                for blank, lexeme in _TOKEN_RE.findall(src):
+                    c += len(blank)
+                    code = fixed.get(lexeme)
+                    if code is None:
+                        if lexeme[0] <= "9":
+                            code = num
+                        else:
+                            code = ident
+                            sym = sym_ids.get(lexeme)
+                            if sym is None:
+                                record(lexeme, line, c)
+                            else:
+                                sym_counts[sym] += 1
+                    add_type(code)
+                    add_offset(pos + c - 1)
+                    add_length(len(lexeme))
+                    add_line(line)
+                    add_col(c)
+                    c += len(lexeme)
+            pos = eol + 1
+            line += 1
+        return buf
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, key: int | slice) -> TokenView | TokenBuffer:
+        if isinstance(key, slice):
+            part = TokenBuffer(self.source, self.symbols)
+            for name in ("types", "offsets", "lengths", "lines", "cols"):
+                setattr(part, name, getattr(self, name)[key])
+            return part
+        if key < 0:
+            key += len(self.types)
+        if not 0 <= key < len(self.types):
+            raise IndexError("token index out of range")
+        return TokenView(self, key)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        for i in range(len(self.types)):
+            yield TokenView(self, i)
+
+    def with_eof(self) -> TokenBuffer:
+        """A copy with an EOF token just past the last token (1:1 when empty)."""
+        buf = self[:]
+        if self.types:
+            end = self.offsets[-1] + self.lengths[-1]
+            line, col = self.lines[-1], self.cols[-1] + self.lengths[-1]
+        else:
+            end, line, col = 0, 1, 1
+        buf.types.append(_TYPE_CODES[TokenType.EOF])
+        buf.offsets.append(end)
+        buf.lengths.append(0)
+        buf.lines.append(line)
+        buf.cols.append(col)
+        return buf
+
+
+def _scan_line(text: str, pos: int, eol: int, line: int, offsets: List[int]) -> List[Token]:
+    tokens: List[Token] = []
+    _scan(text, pos, eol, line, 1, offsets, tokens)
     return tokens
 
 
+_TOKEN_RE_BYTES = re.compile(_TOKEN_RE.pattern.encode())
+_REJECT_RE_BYTES = re.compile(_REJECT_RE.pattern.encode())
+_FIXED_TOKENS_BYTES = {lexeme.encode(): ttype for lexeme, ttype in _FIXED_TOKENS.items()}
+
+
+@dataclass
+class MappedToken:
+    index: int
+    type: TokenType
+    offset: int  # byte offset into the file
+    length: int  # in bytes
+
+
+class MappedSource:
+    """A source file lexed lazily from a read-only memory map.
+
+    ``iter_tokens`` yields ``MappedToken`` records that keep a byte span instead
+    of a copied lexeme; ``lexeme`` and ``line_col`` resolve them on demand, the
+    latter through a line-start index that is extended only as far as asked.
+    Only the current line is ever decoded, so lexing needs memory for one line
+    and the index (a machine word per line), whatever the file size.
+
+    Tokens and errors match ``tokenize``: like ``read_text``, lines end at
+    ``\\n``, ``\\r\\n`` or a lone ``\\r``.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = ensure_input_file(path)
+        with self.path.open("rb") as fp:
+            # An empty file cannot be mapped.
+            size = fp.seek(0, 2)
+            self._buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._line_starts = array("q", [0])
+        self._indexed = 0  # line breaks before this offset are in ``_line_starts``
+        self._cr = -1  # the next ``\r`` for ``_index_to`` (see _line_break)
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self) -> MappedSource:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def iter_tokens(self) -> Iterator[MappedToken]:
+        buf = self._buf
+        size = len(buf)
+        fixed, ident, num = _FIXED_TOKENS_BYTES, TokenType.ID, TokenType.NUM
+        index, line, pos, cr = 0, 1, 0, -1
+        while pos < size:
+            eol, nxt, cr = _line_break(buf, pos, cr)
+            src = buf[pos:eol]
+            cut = src.find(b"//")
+            if cut >= 0:
+                src = src[:cut]
+            if src.isascii() and _REJECT_RE_BYTES.search(src) is None:
+                for m in _TOKEN_RE_BYTES.finditer(src):
+                    a, b = m.span(2)
+                    lexeme = m.group(2)
+                    ttype = fixed.get(lexeme)
+                    if ttype is None:
+                        ttype = num if lexeme[0] <= 0x39 else ident
+                    yield MappedToken(index, ttype, pos + a, b - a)
+                    index += 1
+            else:
+                # Non-ASCII or erroneous: the scanner lexes the decoded line and
+                # its character offsets are mapped back to bytes.
+                text = buf[pos:eol].decode("utf-8")
+                offsets: List[int] = []
+                for tok, off in zip(_scan_line(text, 0, len(text), line, offsets), offsets):
+                    a = pos + len(text[:off].encode("utf-8"))
+                    yield MappedToken(index, tok.type, a, len(tok.lexeme.encode("utf-8")))
+                    index += 1
+            pos = nxt
+            line += 1
+
+    def iter_full_tokens(self) -> Iterator[Token]:
+        """``iter_tokens`` resolved to ``Token`` objects, one at a time."""
+        for tok in self.iter_tokens():
+            line, col = self.line_col(tok.offset)
+            yield Token(tok.index, tok.type, self.lexeme(tok), line, col)
+
+    def lexeme(self, tok: MappedToken) -> str:
+        return self._buf[tok.offset : tok.offset + tok.length].decode("utf-8")
+
+    def line_col(self, offset: int) -> tuple[int, int]:
+        """1-based line and column (in characters) of a byte offset."""
+        self._index_to(offset)
+        line = bisect_right(self._line_starts, offset)
+        start = self._line_starts[line - 1]
+        prefix = self._buf[start:offset]
+        return line, (len(prefix) if prefix.isascii() else len(prefix.decode("utf-8"))) + 1
+
+    def _index_to(self, offset: int) -> None:
+        buf, starts = self._buf, self._line_starts
+        while self._indexed <= offset:
+            eol, nxt, self._cr = _line_break(buf, self._indexed, self._cr)
+            if eol >= len(buf):
+                self._indexed = len(buf) + 1
+                break
+            starts.append(nxt)
+            self._indexed = nxt
+
+
+def _line_break(buf: bytes | mmap.mmap, pos: int, cr: int) -> Tuple[int, int, int]:
+    """End of the line starting at ``pos``, start of the next one, and the next ``\\r``.
+
+    ``cr`` is the offset of the next ``\\r`` returned by the previous call (-1
+    at first); it is only searched for again once passed, so a file without
+    any ``\\r`` is scanned for one once rather than once per line.
+    """
+    size = len(buf)
+    if cr < pos and cr != size:
+        cr = buf.find(b"\r", pos)
+        if cr < 0:
+            cr = size
+    nl = buf.find(b"\n", pos)
+    if nl < 0:
+        nl = size
+    if cr < nl:
+        return cr, cr + 2 if buf[cr + 1 : cr + 2] == b"\n" else cr + 1, cr
+    return nl, nl + 1, cr
+
+
 @dataclass
 class SymbolEntry:
     name: str
@@ -168,20 +563,75 @@ class SymbolEntry:
     count: int
 
 
-def build_symbol_table(tokens: List[Token]) -> List[SymbolEntry]:
+class SymbolTable:
+    """Names interned to dense integer ids, with the first occurrence and count of each.
+
+    The lexer records identifier occurrences. Later stages intern their other
+    operands (temporaries, constants, labels) into the same table without
+    counting them, so one id space covers every IR operand.
+    """
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.ids: dict[str, int] = {}
+        self.counts = array("i")
+        self.first_seen: List[str] = []  # "line:col", empty until recorded
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, name: str) -> int:
+        sym = self.ids.get(name)
+        if sym is None:
+            sym = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.counts.append(0)
+            self.first_seen.append("")
+        return sym
+
+    def record(self, name: str, line: int, col: int) -> int:
+        """Intern ``name`` and count an occurrence of it at ``line``:``col``."""
+        sym = self.intern(name)
+        if not self.counts[sym]:
+            self.first_seen[sym] = f"{line}:{col}"
+        self.counts[sym] += 1
+        return sym
+
+    def entries(self) -> List[SymbolEntry]:
+        """Recorded names only, sorted by name."""
+        return sorted(
+            (
+                SymbolEntry(name=name, first_seen=first, count=count)
+                for name, first, count in zip(self.names, self.first_seen, self.counts)
+                if count
+            ),
+            key=lambda e: e.name,
+        )
+
+
+def build_symbol_table(tokens: Iterable[Token] | TokenBuffer) -> List[SymbolEntry]:
+    if isinstance(tokens, TokenBuffer):
+        # interned while lexing; no rescan
+        return tokens.symbols.entries()
     seen: dict[str, SymbolEntry] = {}
+    for _ in count_symbols(tokens, seen):
+        pass
+    return symbol_entries(seen)
+
+
+def count_symbols(tokens: Iterable[Token], seen: dict[str, SymbolEntry]) -> Iterator[Token]:
+    """Yield ``tokens`` unchanged while counting their identifiers into ``seen``."""
     for tok in tokens:
-        if tok.type != TokenType.ID:
-            continue
-        entry = seen.get(tok.lexeme)
-        if entry is None:
-            seen[tok.lexeme] = SymbolEntry(
-                name=tok.lexeme, first_seen=f"{tok.line}:{tok.col}", count=1
-            )
-        else:
-            entry.count += 1
-    return sorted(seen.values(), key=lambda e: e.name)
+        if tok.type == TokenType.ID:
+            entry = seen.get(tok.lexeme)
+            if entry is None:
+                seen[tok.lexeme] = SymbolEntry(
+                    name=tok.lexeme, first_seen=f"{tok.line}:{tok.col}", count=1
+                )
+            else:
+                entry.count += 1
+        yield tok
 
 
-def _peek(text: str, idx: int) -> str:
-    return text[idx + 1] if idx + 1 < len(text) else ""
+def symbol_entries(seen: dict[str, SymbolEntry]) -> List[SymbolEntry]:
+    return sorted(seen.values(), key=lambda e: e.name)
@@ -0,0 +1,158 @@
+"""
+Vectorized lexer fast path for large ASCII sources (requires NumPy).
+
+The source is viewed as a ``uint8`` array and every byte is classified at once
+through a lookup table. Comments, line starts, word runs and operator pairs are
+found with array operations; Python only runs per identifier or keyword, to
+tell keywords apart and intern identifiers. The token columns of the resulting
+``TokenBuffer`` are copied straight from the arrays.
+
+Anything the fast path does not handle exactly like the scanner (non-ASCII text,
+a byte outside the language, and the patterns the scanner rejects: ``===``,
+``!==``, a lone ``!``, a number running into letters, and a ``<==``-style run it
+would need to lex sequentially) sends the whole source to
+``TokenBuffer.from_text``. Tokens and error messages are therefore always the
+scanner's.
+"""
+
+from __future__ import annotations
+
+from array import array
+
+import numpy as np
+
+from .lexer import (
+    KEYWORDS,
+    TokenBuffer,
+    TokenType,
+    _SINGLE_CHAR_TOKENS,
+    _TWO_CHAR_TOKENS,
+    _TYPE_CODES,
+)
+
+# Byte classes.
+_OTHER, _LETTER, _DIGIT, _OP, _BLANK, _NEWLINE = range(6)
+
+_CLASS = np.full(256, _OTHER, dtype=np.uint8)
+for _ch in b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_":
+    _CLASS[_ch] = _LETTER
+for _ch in b"0123456789":
+    _CLASS[_ch] = _DIGIT
+for _ch in b"+-*/=<>;(){}!":
+    _CLASS[_ch] = _OP
+for _ch in b" \t\r":
+    _CLASS[_ch] = _BLANK
+_CLASS[ord("\n")] = _NEWLINE
+
+# Type code of a one-byte operator, and of a two-byte one by its first byte.
+_SINGLE_CODE = np.full(256, -1, dtype=np.int32)
+for _lexeme, _ttype in _SINGLE_CHAR_TOKENS.items():
+    _SINGLE_CODE[ord(_lexeme)] = _TYPE_CODES[_ttype]
+_PAIR_CODE = np.full(256, -1, dtype=np.int32)
+for _lexeme, _ttype in _TWO_CHAR_TOKENS.items():
+    _PAIR_CODE[ord(_lexeme[0])] = _TYPE_CODES[_ttype]
+
+_EQ, _BANG, _SLASH = ord("="), ord("!"), ord("/")
+_ID, _NUM = _TYPE_CODES[TokenType.ID], _TYPE_CODES[TokenType.NUM]
+_KEYWORD_CODES = {lexeme: _TYPE_CODES[ttype] for lexeme, ttype in KEYWORDS.items()}
+
+
+def tokenize_numpy(text: str) -> TokenBuffer:
+    """Lex ``text`` into a ``TokenBuffer``; same result as ``TokenBuffer.from_text``."""
+    if not text.isascii():
+        return TokenBuffer.from_text(text)
+    data = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    n = len(data)
+    if n == 0:
+        return TokenBuffer(text)
+    cls = _CLASS[data]
+    newline = cls == _NEWLINE
+    nxt = np.empty_like(data)
+    nxt[:-1] = data[1:]
+    nxt[-1] = 0
+
+    # Line of every byte (0-based) and the offset each line starts at.
+    line_of = np.cumsum(newline, dtype=np.int64)
+    line_of[newline] -= 1  # a newline belongs to the line it ends
+    line_starts = np.concatenate(([0], np.flatnonzero(newline) + 1))
+
+    # A comment runs from the first "//" of a line to its end.
+    comment_start = (data == _SLASH) & (nxt == _SLASH)
+    seen = np.cumsum(comment_start, dtype=np.int64)
+    before_line = np.concatenate(([0], seen))[line_starts][line_of]
+    in_comment = (seen - before_line) > 0
+    cls = np.where(in_comment & ~newline, _BLANK, cls)
+
+    if (cls == _OTHER).any():
+        return TokenBuffer.from_text(text)
+    is_op = cls == _OP
+    is_eq_next = nxt == _EQ
+    pair = is_op & (_PAIR_CODE[data] >= 0) & is_eq_next
+    # A pair whose second "=" also starts a pair ("===", "<==") would need the
+    # sequential rule; a "!" must start "!=".
+    if (pair[1:] & pair[:-1]).any() or ((data == _BANG) & ~pair & ~in_comment).any():
+        return TokenBuffer.from_text(text)
+
+    # Word runs: [A-Za-z0-9_]+; a run starting with a digit must be all digits.
+    word = (cls == _LETTER) | (cls == _DIGIT)
+    prev_word = np.concatenate(([False], word[:-1]))
+    next_word = np.concatenate((word[1:], [False]))
+    word_starts = np.flatnonzero(word & ~prev_word)
+    word_ends = np.flatnonzero(word & ~next_word) + 1
+    letters = np.concatenate(([0], np.cumsum(cls == _LETTER, dtype=np.int64)))
+    letter_count = letters[word_ends] - letters[word_starts]
+    numeric = cls[word_starts] == _DIGIT
+    if (numeric & (letter_count > 0)).any():
+        return TokenBuffer.from_text(text)
+
+    second = np.concatenate(([False], pair[:-1]))
+    op_starts = np.flatnonzero(is_op & ~second)
+    op_lengths = np.where(pair[op_starts], 2, 1)
+    op_bytes = data[op_starts]
+    op_codes = np.where(pair[op_starts], _PAIR_CODE[op_bytes], _SINGLE_CODE[op_bytes])
+
+    starts = np.concatenate((word_starts, op_starts))
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    lengths = np.concatenate((word_ends - word_starts, op_lengths))[order]
+    codes = np.concatenate((np.where(numeric, _NUM, _ID), op_codes))[order].astype(np.int32)
+    lines = line_of[starts]
+    cols = starts - line_starts[lines] + 1
+    lines += 1
+
+    # Python only for words: keywords and symbol interning.
+    buf = TokenBuffer(text)
+    symbols = buf.symbols
+    sym_ids, sym_counts, record = symbols.ids, symbols.counts, symbols.record
+    keyword = _KEYWORD_CODES.get
+    idents = np.flatnonzero(codes == _ID)
+    for k, s, length, line, col in zip(
+        idents.tolist(),
+        starts[idents].tolist(),
+        lengths[idents].tolist(),
+        lines[idents].tolist(),
+        cols[idents].tolist(),
+    ):
+        lexeme = text[s : s + length]
+        code = keyword(lexeme)
+        if code is not None:
+            codes[k] = code
+            continue
+        sym = sym_ids.get(lexeme)
+        if sym is None:
+            record(lexeme, line, col)
+        else:
+            sym_counts[sym] += 1
+
+    buf.types = _column(codes)
+    buf.offsets = _column(starts)
+    buf.lengths = _column(lengths)
+    buf.lines = _column(lines)
+    buf.cols = _column(cols)
+    return buf
+
+
+def _column(values: np.ndarray) -> array:
+    column = array("i")
+    column.frombytes(values.astype(np.intc).tobytes())
+    return column
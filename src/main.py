@@ -1,30 +1,92 @@
 from __future__ import annotations
 
 import argparse
+import glob
 import sys
 from pathlib import Path
 
 from . import pipeline
-from .gui import launch
-from .utils import UserError
+from .utils import TRACE_MODES, TraceOptions, UserError
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="MiniLang compiler driver (M0 stub)")
     parser.add_argument(
         "--mode",
-        choices=["gui", "cli"],
+        choices=["gui", "cli", "server"],
         default="gui",
-        help="Run in tkinter GUI mode (default) or CLI mode.",
+        help="Run in tkinter GUI mode (default), CLI mode, or as a compile server "
+        "answering JSON-lines requests (see src/server.py).",
     )
     parser.add_argument(
-        "--input", dest="input_file", help="Path to the MiniLang source file."
+        "--socket",
+        help="Server mode: listen on this Unix socket instead of stdin/stdout.",
+    )
+    parser.add_argument(
+        "--input",
+        dest="input_file",
+        nargs="+",
+        help="Path to the MiniLang source file. Several files, glob patterns or "
+        "directories (searched for *.min) compile them all in batch mode.",
     )
     parser.add_argument(
         "--stage",
         choices=pipeline.SUPPORTED_STAGES,
         help="Which stage to run in CLI mode.",
     )
+    parser.add_argument(
+        "--table-method",
+        choices=["deremer", "canonical"],
+        default="deremer",
+        help="LALR(1) construction for the table stage: DeRemer-Pennello lookaheads "
+        "(default) or canonical LR(1) merge with LR(1) conflict diagnostics.",
+    )
+    parser.add_argument(
+        "--trace",
+        choices=TRACE_MODES,
+        default="full",
+        help="parse_trace.txt detail for the parse stage: every step (default), remaining "
+        "input truncated to --trace-limit tokens, every --trace-every-th step, or none.",
+    )
+    parser.add_argument(
+        "--trace-limit",
+        type=int,
+        default=10,
+        help="Remaining-input tokens shown per step with --trace truncated (default 10).",
+    )
+    parser.add_argument(
+        "--trace-every",
+        type=int,
+        default=100,
+        help="Sampling interval in steps with --trace sampled (default 100).",
+    )
+    parser.add_argument(
+        "--no-unit-bypass",
+        dest="unit_bypass",
+        action="store_false",
+        help="Trace every identity unit reduction (e.g. Term -> Factor) as its own parse "
+        "step instead of folding it into the previous one (r22+r21).",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Run every stage even if build_manifest.json shows its inputs unchanged.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="basic",
+        choices=["basic", "cprofile"],
+        help="Record wall/CPU time, peak memory and counts per stage in profile.json; "
+        "--profile=cprofile also dumps profile_<stage>.pstats.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes in batch and server mode (default: CPU count).",
+    )
     return parser.parse_args(argv)
 
 
@@ -32,19 +94,43 @@ def main(argv: list[str] | None = None) -> None:
     args = parse_args(argv)
 
     if args.mode == "gui":
-        initial = Path(args.input_file) if args.input_file else None
+        from .gui import launch  # tkinter is only imported for the GUI
+
+        initial = Path(args.input_file[0]) if args.input_file else None
         launch(initial_file=initial)
         return
 
+    if args.mode == "server":
+        from .server import serve_socket, serve_stdio
+
+        _check_jobs(args)
+        if args.socket:
+            serve_socket(args.socket, jobs=args.jobs, table_method=args.table_method)
+        else:
+            serve_stdio(jobs=args.jobs, table_method=args.table_method)
+        return
+
     # CLI mode
     if not args.input_file:
         print("Error: --input is required in cli mode", file=sys.stderr)
         sys.exit(2)
 
     stage = args.stage or "all"
+    if _is_batch(args.input_file):
+        _main_batch(args, stage)
+        return
 
     try:
-        result = pipeline.run_stage(stage, args.input_file)
+        trace = TraceOptions(mode=args.trace, limit=args.trace_limit, every=args.trace_every)
+        result = pipeline.run_stage(
+            stage,
+            args.input_file[0],
+            table_method=args.table_method,
+            trace=trace,
+            rebuild=args.rebuild,
+            profile=args.profile,
+            unit_bypass=args.unit_bypass,
+        )
     except UserError as exc:
         print(str(exc), file=sys.stderr)
         sys.exit(1)
@@ -59,9 +145,58 @@ def main(argv: list[str] | None = None) -> None:
             print(f"  {path}")
     else:
         print("No files were generated.")
+    if result.reused:
+        print(f"Reused unchanged stages: {', '.join(result.reused)}")
+    if result.profile is not None:
+        from .profiling import format_profile
+
+        print(format_profile(result.profile))
     if result.stage == "all":
         print(f"Success: output written to {result.output_dir}")
 
 
+def _is_batch(inputs: list[str]) -> bool:
+    return len(inputs) > 1 or Path(inputs[0]).is_dir() or glob.has_magic(inputs[0])
+
+
+def _check_jobs(args: argparse.Namespace) -> None:
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(2)
+
+
+def _main_batch(args: argparse.Namespace, stage: str) -> None:
+    from .batch import expand_inputs, run_batch
+
+    _check_jobs(args)
+    try:
+        trace = TraceOptions(mode=args.trace, limit=args.trace_limit, every=args.trace_every)
+        batch = run_batch(
+            stage,
+            expand_inputs(args.input_file),
+            jobs=args.jobs,
+            table_method=args.table_method,
+            trace=trace,
+            rebuild=args.rebuild,
+            profile=args.profile,
+            unit_bypass=args.unit_bypass,
+        )
+    except UserError as exc:
+        print(str(exc), file=sys.stderr)
+        sys.exit(1)
+
+    for path in batch.inputs:
+        result = batch.results.get(path)
+        if result is None:
+            print(f"FAILED {path}: {batch.errors[path]}")
+        elif result.reused:
+            print(f"ok     {path} -> {result.output_dir} (reused: {', '.join(result.reused)})")
+        else:
+            print(f"ok     {path} -> {result.output_dir}")
+    print(batch.summary())
+    if batch.errors:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,118 @@
+"""
+Build manifest for incremental builds of ``out/<name>/``.
+
+``build_manifest.json`` records, for every stage that last succeeded, the key of
+its inputs and the size and mtime of each file it wrote. A stage key is a
+SHA-256 over the compiler fingerprint (the contents of every ``src/*.py``,
+which covers the grammar in ``src/grammar.py``), the source file's content hash
+(stages that read it) and the stage's options. A stage is reused when its key matches and its files are
+still on disk as written; otherwise it runs and its entry is replaced.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+from .utils import partial_path
+
+MANIFEST_FILE = "build_manifest.json"
+MANIFEST_VERSION = 1
+
+_SRC_DIR = Path(__file__).resolve().parent
+
+
+@lru_cache(maxsize=None)
+def compiler_fingerprint() -> str:
+    """SHA-256 of the compiler sources, standing in for a version number."""
+    digest = hashlib.sha256()
+    for path in sorted(_SRC_DIR.glob("*.py")):
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Stage entries of one output directory; ``save`` writes them back."""
+
+    def __init__(self, out_dir: Path, source_hash: str):
+        self.out_dir = out_dir
+        self.source_hash = source_hash
+        self.path = out_dir / MANIFEST_FILE
+        self.stages: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        stages = data.get("stages")
+        return stages if isinstance(stages, dict) else {}
+
+    def stage_key(self, stage: str, options: str = "", uses_source: bool = True) -> str:
+        parts = [stage, options, compiler_fingerprint()]
+        if uses_source:
+            parts.append(self.source_hash)
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def reusable(self, stage: str, key: str) -> List[Path] | None:
+        """Return the stage's recorded files if ``key`` matches and they are intact.
+
+        A missing or malformed entry (hand-edited, truncated, from another
+        version) is not reusable, so the stage runs again.
+        """
+        entry = self.stages.get(stage)
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        files = entry.get("files")
+        if not isinstance(files, list):
+            return None
+        paths: List[Path] = []
+        for record in files:
+            try:
+                name, size, mtime_ns = record
+                path = self.out_dir / name
+                st = path.stat()
+            except (OSError, TypeError, ValueError):
+                return None
+            if path.name != name:
+                return None  # only files directly in out_dir are recorded
+            if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                return None
+            paths.append(path)
+        return paths
+
+    def invalidate(self, stage: str) -> None:
+        self.stages.pop(stage, None)
+
+    def record(self, stage: str, key: str, files: List[Path]) -> None:
+        recorded = []
+        for path in files:
+            st = path.stat()
+            recorded.append([path.name, st.st_size, st.st_mtime_ns])
+        self.stages[stage] = {"key": key, "files": recorded}
+
+    def save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "compiler": compiler_fingerprint(),
+            "source": self.source_hash,
+            "stages": self.stages,
+        }
+        partial = partial_path(self.path)
+        partial.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        os.replace(partial, self.path)
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
-from .cfg import build_cfg, render_cfg
-from .ir import IRBuilder, Quad, generate_ir_quads
-from .utils import UserError, write_text_file
+from .cfg import BasicBlock, build_cfg, render_cfg
+from .ir import IRBuilder, Quad, format_quad
+from .lexer import SymbolTable
+from .utils import write_text_file
+
+if TYPE_CHECKING:  # avoid circular import at runtime
+    from .session import CompilationSession
 
 
 @dataclass
@@ -16,11 +20,29 @@ class PassStats:
     notes: List[str]
 
 
-def optimize_ir(source_path: Path, out_dir: Path) -> Tuple[Path, Path]:
-    builder = generate_ir_quads(source_path)
-    cfg_blocks = build_cfg(builder)
+@dataclass
+class OptResult:
+    ir: IRBuilder  # optimized quads
+    report: str  # opt_report.txt
+
 
-    quads = list(builder.quads)
+def optimize_ir(session: CompilationSession, out_dir: Path) -> Tuple[Path, Path]:
+    result = session.optimized
+    ir_opt_path = out_dir / "ir_opt.quad"
+    write_text_file(ir_opt_path, result.ir.render())
+    report_path = out_dir / "opt_report.txt"
+    write_text_file(report_path, result.report + "\n")
+    return ir_opt_path, report_path
+
+
+def optimize_quads(ir: IRBuilder, cfg_blocks: List[BasicBlock]) -> OptResult:
+    """Run the block-local passes over ``ir`` (whose CFG is ``cfg_blocks``).
+
+    Neither argument is modified; the optimized quads share ``ir.symbols``.
+    """
+    symbols = ir.symbols
+    operands = _Operands(symbols)
+    quads = list(ir.quads)
     pipeline = ["Folding", "ConstProp", "CopyProp", "DCE"]
     stats = {name: PassStats([], [], []) for name in pipeline}
 
@@ -28,56 +50,83 @@ def optimize_ir(source_path: Path, out_dir: Path) -> Tuple[Path, Path]:
     for _ in range(3):
         changed = False
         new_quads: List[Quad] = []
-        offset = 0
         for blk in cfg_blocks:
             blk_quads = quads[blk.start : blk.end + 1]
-            optimized, blk_changed = _opt_block(blk_quads, stats)
+            optimized, blk_changed = _opt_block(blk_quads, stats, operands)
             changed = changed or blk_changed
             new_quads.extend(optimized)
-            blk.end = offset + len(optimized) - 1
-            offset += len(optimized)
         quads = new_quads
         # rebuild cfg for next round if changed
-        builder = IRBuilder()
+        builder = IRBuilder(symbols)
         builder.quads = quads
         cfg_blocks = build_cfg(builder)
         if not changed:
             break
 
-    # Write optimized IR
-    builder = IRBuilder()
+    builder = IRBuilder(symbols)
     builder.quads = quads
-    ir_opt_path = out_dir / "ir_opt.quad"
-    write_text_file(ir_opt_path, builder.render())
+    cfg_summary = render_cfg(cfg_blocks, symbols).strip().splitlines()
+    report = _render_report(pipeline, stats, len(ir.quads), len(quads), cfg_summary)
+    return OptResult(ir=builder, report=report)
 
-    # Build report
-    cfg_summary = render_cfg(cfg_blocks).strip().splitlines()
-    report = _render_report(pipeline, stats, len(generate_ir_quads(source_path).quads), len(quads), cfg_summary)
-    report_path = out_dir / "opt_report.txt"
-    write_text_file(report_path, report + "\n")
 
-    return ir_opt_path, report_path
+class _Operands:
+    """What the passes need to know about each operand id, by id.
+
+    ``value`` is the integer of a constant (``None`` for anything else) and
+    ``temp`` marks names DCE may delete. Constants made by folding are interned
+    through ``const``, which keeps both lists in step with the symbol table.
+    """
+
+    def __init__(self, symbols: SymbolTable) -> None:
+        self.symbols = symbols
+        self.none = symbols.intern("-")
+        self.value: List[int | None] = []
+        self.temp: List[bool] = []
+        self._sync()
+
+    def _sync(self) -> None:
+        for name in self.symbols.names[len(self.value) :]:
+            self.value.append(int(name) if _is_const(name) else None)
+            self.temp.append(name.startswith("t"))
+
+    def const(self, value: int) -> int:
+        sym = self.symbols.intern(str(value))
+        self._sync()
+        return sym
+
+    def is_var(self, sym: int) -> bool:
+        return sym != self.none and self.value[sym] is None
 
 
-def _opt_block(quads: List[Quad], stats: Dict[str, PassStats]) -> Tuple[List[Quad], bool]:
+def _opt_block(
+    quads: List[Quad], stats: Dict[str, PassStats], operands: _Operands
+) -> Tuple[List[Quad], bool]:
     changed = False
     qlist = [q for q in quads]
+    names = operands.symbols.names
+    value, is_var, none = operands.value, operands.is_var, operands.none
 
     # Constant folding
     for i, q in enumerate(qlist):
-        if q.op in {"ADD", "SUB", "MUL", "DIV"} and _is_const(q.arg1) and _is_const(q.arg2):
-            if q.op == "DIV" and q.arg2 == "0":
+        if q.op in {"ADD", "SUB", "MUL", "DIV"}:
+            x, y = value[q.arg1], value[q.arg2]
+            if x is None or y is None:
+                continue
+            if q.op == "DIV" and y == 0:
                 stats["Folding"].notes.append(f"Skip div-by-zero folding at {q.orig_index}")
                 continue
-            val = _calc(q.op, q.arg1, q.arg2)
-            new_q = Quad("ASSIGN", val, "-", q.res, q.orig_index)
+            val = operands.const(_calc(q.op, x, y))
+            new_q = Quad("ASSIGN", val, none, q.res, q.orig_index)
             if new_q != q:
-                stats["Folding"].replaced.append((q.orig_index or i, _fmt_quad(q), _fmt_quad(new_q)))
+                stats["Folding"].replaced.append(
+                    (q.orig_index or i, format_quad(q, names), format_quad(new_q, names))
+                )
                 qlist[i] = new_q
                 changed = True
 
     # Const propagation
-    const_env: Dict[str, str] = {}
+    const_env: Dict[int, int] = {}
     for i, q in enumerate(qlist):
         if q.op in {"LABEL", "GOTO", "IF_LT", "IF_GT", "IF_EQ", "IF_NE"}:
             const_env.clear()
@@ -89,12 +138,14 @@ def _opt_block(quads: List[Quad], stats: Dict[str, PassStats]) -> Tuple[List[Qua
             a2 = const_env[a2]
         new_q = Quad(q.op, a1, a2, q.res, q.orig_index)
         if new_q != q:
-            stats["ConstProp"].replaced.append((q.orig_index or i, _fmt_quad(q), _fmt_quad(new_q)))
+            stats["ConstProp"].replaced.append(
+                (q.orig_index or i, format_quad(q, names), format_quad(new_q, names))
+            )
             qlist[i] = new_q
             changed = True
         # Update env on assignments
-        if q.res != "-":
-            if new_q.op == "ASSIGN" and _is_const(new_q.arg1):
+        if q.res != none:
+            if new_q.op == "ASSIGN" and value[new_q.arg1] is not None:
                 const_env[new_q.res] = new_q.arg1
             else:
                 # kill bindings mentioning res
@@ -104,7 +155,7 @@ def _opt_block(quads: List[Quad], stats: Dict[str, PassStats]) -> Tuple[List[Qua
                         const_env.pop(k, None)
 
     # Copy propagation
-    copy_env: Dict[str, str] = {}
+    copy_env: Dict[int, int] = {}
     for i, q in enumerate(qlist):
         if q.op in {"LABEL", "GOTO", "IF_LT", "IF_GT", "IF_EQ", "IF_NE"}:
             copy_env.clear()
@@ -113,12 +164,14 @@ def _opt_block(quads: List[Quad], stats: Dict[str, PassStats]) -> Tuple[List[Qua
         a2 = _resolve_copy(q.arg2, copy_env)
         new_q = Quad(q.op, a1, a2, q.res, q.orig_index)
         if new_q != q:
-            stats["CopyProp"].replaced.append((q.orig_index or i, _fmt_quad(q), _fmt_quad(new_q)))
+            stats["CopyProp"].replaced.append(
+                (q.orig_index or i, format_quad(q, names), format_quad(new_q, names))
+            )
             qlist[i] = new_q
             changed = True
-        if new_q.op == "ASSIGN" and _is_var(new_q.arg1) and _is_var(new_q.res):
+        if new_q.op == "ASSIGN" and is_var(new_q.arg1) and is_var(new_q.res):
             copy_env[new_q.res] = _resolve_copy(new_q.arg1, copy_env)
-        if new_q.res != "-":
+        if new_q.res != none:
             # kill entries involving res
             copy_env.pop(new_q.res, None)
             for k in list(copy_env.keys()):
@@ -126,26 +179,26 @@ def _opt_block(quads: List[Quad], stats: Dict[str, PassStats]) -> Tuple[List[Qua
                     copy_env.pop(k, None)
 
     # DCE (only temporaries)
-    live: set[str] = set()
+    temp = operands.temp
+    live: set[int] = set()
     keep: List[Quad] = []
     for q in reversed(qlist):
         if q.op in {"LABEL", "GOTO", "IF_LT", "IF_GT", "IF_EQ", "IF_NE"}:
             keep.append(q)
-            if _is_var(q.arg1):
+            if is_var(q.arg1):
                 live.add(q.arg1)
-            if _is_var(q.arg2):
+            if is_var(q.arg2):
                 live.add(q.arg2)
             continue
-        removable = q.res.startswith("t") if q.res else False
-        if removable and q.res not in live:
+        if temp[q.res] and q.res not in live:
             stats["DCE"].removed.append(q.orig_index or 0)
             changed = True
             continue
-        if _is_var(q.res):
+        if is_var(q.res):
             live.discard(q.res)
-        if _is_var(q.arg1):
+        if is_var(q.arg1):
             live.add(q.arg1)
-        if _is_var(q.arg2):
+        if is_var(q.arg2):
             live.add(q.arg2)
         keep.append(q)
     keep.reverse()
@@ -153,7 +206,7 @@ def _opt_block(quads: List[Quad], stats: Dict[str, PassStats]) -> Tuple[List[Qua
     return keep, changed
 
 
-def _resolve_copy(name: str, env: Dict[str, str]) -> str:
+def _resolve_copy(name: int, env: Dict[int, int]) -> int:
     seen = set()
     cur = name
     while cur in env and cur not in seen:
@@ -166,25 +219,16 @@ def _is_const(val: str) -> bool:
     return val.lstrip("-").isdigit()
 
 
-def _is_var(val: str) -> bool:
-    return val not in ("-", "") and not _is_const(val)
-
-
-def _calc(op: str, a: str, b: str) -> str:
-    x, y = int(a), int(b)
+def _calc(op: str, x: int, y: int) -> int:
     if op == "ADD":
-        return str(x + y)
+        return x + y
     if op == "SUB":
-        return str(x - y)
+        return x - y
     if op == "MUL":
-        return str(x * y)
+        return x * y
     if op == "DIV":
-        return str(x // y)
-    return a
-
-
-def _fmt_quad(q: Quad) -> str:
-    return f"({q.op}, {q.arg1}, {q.arg2}, {q.res})"
+        return x // y
+    return x
 
 
 def _render_report(
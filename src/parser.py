@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import importlib
+import threading
+import warnings
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, TextIO, Tuple, Union
 
-from .grammar import GRAMMAR
-from .lalr import PROD_BY_ID, generate_tables
-from .lexer import Token, TokenType
-from .utils import UserError
+from .tables import ACT_ACCEPT, ACT_ERROR, CompiledTables, decode_action
+from .grammar import IDENTITY_UNIT_PRODUCTIONS
+from .lexer import TOKEN_TYPES, Token, TokenBuffer, TokenType
+from .utils import TRACE_MODES, TraceOptions, UserError  # noqa: F401  (re-exported)
 from . import ast as ast_nodes
 
 
@@ -25,8 +29,13 @@ class ParseStep:
         return f"{self.step}\t{states_repr}\t{symbols_repr}\t{input_repr}\t{self.action}"
 
 
-def _append_eof(tokens: List[Token]) -> List[Token]:
+Tokens = Union[List[Token], TokenBuffer]
+
+
+def _append_eof(tokens: Tokens) -> Tokens:
     """Return a new token list with an EOF token appended."""
+    if isinstance(tokens, TokenBuffer):
+        return tokens.with_eof()
     if tokens:
         last = tokens[-1]
         line, col = last.line, last.col + len(last.lexeme)
@@ -40,237 +49,439 @@ def _append_eof(tokens: List[Token]) -> List[Token]:
 class ParseResult:
     trace: str
     program: Optional[ast_nodes.Program]
+    steps: int = 0  # shift/reduce steps taken, including accept
+
+
+TRACE_HEADER = "step\tstates\tsymbols\tinput\taction"
+
+
+class _TraceSink:
+    """Formats parse steps and streams them to a file handle (or buffers them)."""
+
+    def __init__(self, options: TraceOptions, tokens: Tokens, out: TextIO | None) -> None:
+        self.options = options
+        self.out = out
+        self.lines: List[str] = []
+        self.last_step = -1
+        # Per-token display strings are built once; each step only slices them.
+        self.display = [_display_token(t) for t in tokens]
+        self._write(TRACE_HEADER)
+
+    def wants(self, step: int) -> bool:
+        return self.options.mode != "sampled" or step % self.options.every == 0
+
+    def emit(
+        self, step: int, state_stack: List[int], symbol_stack: List[str], pos: int, action: str
+    ) -> None:
+        if self.options.mode == "truncated":
+            end = pos + self.options.limit
+            remaining = self.display[pos:end]
+            hidden = len(self.display) - end
+            if hidden > 0:
+                remaining.append(f"...(+{hidden})")
+        else:
+            remaining = self.display[pos:]
+        self.last_step = step
+        self._write(ParseStep(step, state_stack, symbol_stack, remaining, action).format())
+
+    def _write(self, line: str) -> None:
+        if self.out is not None:
+            self.out.write(line + "\n")
+        else:
+            self.lines.append(line)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n" if self.lines else ""
+
+
+def _display_token(tok: Token) -> str:
+    if tok.type == TokenType.EOF:
+        return "EOF"
+    if tok.lexeme:
+        return f"{tok.type.value}({tok.lexeme})"
+    return tok.type.value
+
 
+def parse_tokens(
+    tokens: Tokens,
+    trace: TraceOptions | None = None,
+    trace_out: TextIO | None = None,
+    unit_bypass: bool = True,
+) -> ParseResult:
+    """Run shift/reduce parsing and return the Program AST (if accept).
 
-def parse_tokens(tokens: List[Token]) -> ParseResult:
-    """Run shift/reduce parsing and return trace plus Program AST (if accept)."""
-    states, terminals, nonterminals, action, goto_table = generate_tables(verbose=False)
+    Without ``trace`` (or with mode ``off``) no trace is kept at all. Otherwise
+    trace lines are streamed to ``trace_out`` as they are produced, or collected
+    into ``ParseResult.trace`` when no handle is given.
+
+    With ``unit_bypass`` (the default) identity unit reductions are folded into
+    GOTO, so e.g. ``Factor -> ID`` followed by ``Term -> Factor`` is one step,
+    traced as ``r22+r21``. The AST is the same either way.
+
+    ``tokens`` may be a ``TokenBuffer``; shifted tokens are then ``TokenView``s.
+    """
+    tables, reducers = load_parser_runtime(unit_bypass)
+    unit_chains, unit_states = tables.unit_chains, tables.unit_states
+    action_default, action_base = tables.action_default, tables.action_base
+    action_table, action_check = tables.action_table, tables.action_check
+    goto_default, goto_base = tables.goto_default, tables.goto_base
+    goto_table, goto_check = tables.goto_table, tables.goto_check
+    valid = tables.valid
+    prod_lhs, prod_len = tables.prod_lhs, tables.prod_len
     tokens = _append_eof(tokens)
+    eof_pos = len(tokens) - 1
+    la_codes = _terminal_codes(tokens, tables)
+    sink = None
+    if trace is not None and trace.mode != "off":
+        sink = _TraceSink(trace, tokens, trace_out)
 
     state_stack: List[int] = [0]
     symbol_stack: List[str] = []
     value_stack: List[object] = []
-    steps: List[ParseStep] = []
+    # States whose default reduction ran without checking the lookahead since
+    # the last shift; the error, if any, belongs to the first that rejects it.
+    unchecked: List[int] = []
     pos = 0
     step_idx = 0
     program: Optional[ast_nodes.Program] = None
 
     while True:
         state = state_stack[-1]
-        lookahead = tokens[pos]
-        la_type = lookahead.type.value
-        act = action.get(state, {}).get(la_type, "")
-
-        remaining_display = []
-        for t in tokens[pos:]:
-            if t.type == TokenType.EOF:
-                remaining_display.append("EOF")
-            elif t.lexeme:
-                remaining_display.append(f"{t.type.value}({t.lexeme})")
-            else:
-                remaining_display.append(t.type.value)
-
-        recorded_action = act if act else "error"
-        steps.append(
-            ParseStep(
-                step=step_idx,
-                state_stack=list(state_stack),
-                symbol_stack=list(symbol_stack),
-                remaining=remaining_display,
-                action=recorded_action,
-            )
-        )
-        step_idx += 1
-
-        if not act:
-            expected = sorted(action.get(state, {}).keys())
-            expected_str = ", ".join(expected) if expected else "<none>"
-            raise UserError(
-                f"Error {lookahead.line}:{lookahead.col}: Expected {expected_str}, "
-                f"but got {la_type}({lookahead.lexeme})"
-            )
+        act = ACT_ERROR
+        base = action_base[state]
+        if base >= 0:
+            idx = base + la_codes[pos]
+            if action_check[idx] == state:
+                act = action_table[idx]
+        if act == ACT_ERROR:
+            act = action_default[state]
+            if act != ACT_ERROR:
+                if sink is not None and not valid[state] >> la_codes[pos] & 1:
+                    # traced runs stop as soon as a visited state rejects the lookahead
+                    act = ACT_ERROR
+                else:
+                    unchecked.append(state)
 
-        if act == "acc":
-            break
+        if sink is not None and (act in (ACT_ERROR, ACT_ACCEPT) or sink.wants(step_idx)):
+            # error and accept steps are always logged, even when sampling
+            recorded_action = decode_action(act) if act != ACT_ERROR else "error"
+            if act < ACT_ACCEPT and unit_chains:
+                below = state_stack[-1 - prod_len[-act]]
+                for unit in unit_chains.get((below, prod_lhs[-act]), ()):
+                    recorded_action += f"+r{unit}"
+            sink.emit(step_idx, state_stack, symbol_stack, pos, recorded_action)
+        step_idx += 1
 
-        if act.startswith("s"):
-            new_state = int(act[1:])
-            symbol_stack.append(la_type)
+        if act > 0:
+            lookahead = tokens[pos]
+            if sink is not None:
+                symbol_stack.append(lookahead.type.value)
             value_stack.append(lookahead)
-            state_stack.append(new_state)
-            if lookahead.type != TokenType.EOF:
+            state_stack.append(act - 1)
+            if unchecked:
+                unchecked.clear()
+            if pos < eof_pos:
                 pos += 1
             continue
 
-        if act.startswith("r"):
-            prod_id = int(act[1:])
-            prod = PROD_BY_ID[prod_id]
-            rhs_len = len(prod.rhs)
+        if act < ACT_ACCEPT:
+            prod_id = -act
+            rhs_len = prod_len[prod_id]
             rhs_vals: List[object] = []
             if rhs_len:
+                # Truncate in place: slicing copies would make each reduce O(depth).
                 rhs_vals = value_stack[-rhs_len:]
-                value_stack = value_stack[:-rhs_len]
-                state_stack = state_stack[:-rhs_len]
-                symbol_stack = symbol_stack[:-rhs_len]
-            goto_state = goto_table.get(state_stack[-1], {}).get(prod.lhs)
-            if goto_state is None:
+                del value_stack[-rhs_len:]
+                del state_stack[-rhs_len:]
+                if sink is not None:
+                    del symbol_stack[-rhs_len:]
+            lhs = prod_lhs[prod_id]
+            top = state_stack[-1]
+            idx = goto_base[lhs] + top
+            goto_state = goto_table[idx] if goto_check[idx] == lhs else goto_default[lhs]
+            if goto_state < 0:
                 raise UserError(
-                    f"Internal error: goto missing for state {state_stack[-1]} on {prod.lhs}"
+                    f"Internal error: goto missing for state {top} "
+                    f"on {tables.prod_lhs_name[prod_id]}"
                 )
-            symbol_stack.append(prod.lhs)
+            if unit_states:
+                skipped = unit_states.get((top, lhs))
+                if skipped:
+                    # the bypassed states reduce without looking at the lookahead
+                    unchecked.extend(skipped)
+            if sink is not None:
+                chain = unit_chains.get((top, lhs))
+                symbol_stack.append(tables.prod_lhs_name[chain[-1] if chain else prod_id])
             state_stack.append(goto_state)
-            node = _build_node(prod_id, rhs_vals)
-            if node is not None:
-                value_stack.append(node)
+            value_stack.append(reducers[prod_id](rhs_vals))
             continue
 
-        raise UserError(f"Error: unknown parser action '{act}'")
+        if act == ACT_ACCEPT:
+            break
+
+        lookahead = tokens[pos]
+        la = la_codes[pos]
+        error_state = next((s for s in unchecked if not valid[s] >> la & 1), state)
+        expected = tables.expected_terminals(error_state)
+        expected_str = ", ".join(expected) if expected else "<none>"
+        raise UserError(
+            f"Error {lookahead.line}:{lookahead.col}: Expected {expected_str}, "
+            f"but got {lookahead.type.value}({lookahead.lexeme})"
+        )
 
-    lines = ["step\tstates\tsymbols\tinput\taction"]
-    lines.extend(step.format() for step in steps)
     if value_stack:
         for v in reversed(value_stack):
             if isinstance(v, ast_nodes.Program):
                 program = v
                 break
-    return ParseResult(trace="\n".join(lines) + "\n", program=program)
-
-
-def _build_node(prod_id: int, vals: List[object]) -> object | None:
-    """Map production id to AST node construction."""
-    if prod_id == 1:
-        # S' -> Program EOF
-        return vals[0]
-    if prod_id == 2:
-        # Program -> StmtList
-        return ast_nodes.Program(stmts=vals[0])
-    if prod_id == 3:
-        # StmtList -> Stmt StmtList
-        stmt: ast_nodes.Stmt = vals[0]  # type: ignore[assignment]
-        rest: List[ast_nodes.Stmt] = vals[1]  # type: ignore[assignment]
-        return [stmt] + rest
-    if prod_id == 4:
-        # StmtList -> ε
-        return []
-    if prod_id == 5 or prod_id == 6:
-        # Stmt -> Matched / Stmt -> Unmatched
-        return vals[0]
-    if prod_id == 7:
-        # Matched -> AssignStmt
-        return vals[0]
-    if prod_id == 8:
-        # Matched -> WHILE LPAREN Bool RPAREN Matched
-        cond = vals[2]  # type: ignore[assignment]
-        body = vals[4]  # type: ignore[assignment]
-        return ast_nodes.While(cond=cond, body=body)
-    if prod_id == 9:
-        # Matched -> Block
-        return vals[0]
-    if prod_id == 10:
-        # Matched -> IF LPAREN Bool RPAREN Matched ELSE Matched
-        cond = vals[2]  # type: ignore[assignment]
-        then_stmt = vals[4]  # type: ignore[assignment]
-        else_stmt = vals[6]  # type: ignore[assignment]
-        return ast_nodes.If(cond=cond, then_branch=then_stmt, else_branch=else_stmt)
-    if prod_id == 11:
-        # Unmatched -> IF LPAREN Bool RPAREN Stmt
-        cond = vals[2]  # type: ignore[assignment]
-        then_stmt = vals[4]  # type: ignore[assignment]
-        return ast_nodes.If(cond=cond, then_branch=then_stmt, else_branch=None)
-    if prod_id == 12:
-        # Unmatched -> IF LPAREN Bool RPAREN Matched ELSE Unmatched
-        cond = vals[2]  # type: ignore[assignment]
-        then_stmt = vals[4]  # type: ignore[assignment]
-        else_stmt = vals[6]  # type: ignore[assignment]
-        return ast_nodes.If(cond=cond, then_branch=then_stmt, else_branch=else_stmt)
-    if prod_id == 13:
-        # Unmatched -> WHILE LPAREN Bool RPAREN Unmatched
-        cond = vals[2]  # type: ignore[assignment]
-        body = vals[4]  # type: ignore[assignment]
-        return ast_nodes.While(cond=cond, body=body)
-    if prod_id == 14:
-        # AssignStmt -> ID ASSIGN Expr SEMI
-        ident_tok: Token = vals[0]  # type: ignore[assignment]
-        expr = vals[2]  # type: ignore[assignment]
-        return ast_nodes.Assign(name=ident_tok.lexeme, expr=expr)
-    if prod_id == 15:
-        # Block -> LBRACE StmtList RBRACE
-        stmts: List[ast_nodes.Stmt] = vals[1]  # type: ignore[assignment]
-        return ast_nodes.Block(stmts=stmts)
-    if prod_id == 16 or prod_id == 17:
-        # Expr -> Expr PLUS/MINUS Term
-        left = vals[0]  # type: ignore[assignment]
-        right = vals[2]  # type: ignore[assignment]
-        op = "ADD" if prod_id == 16 else "SUB"
-        return ast_nodes.BinOp(op=op, left=left, right=right)
-    if prod_id == 18:
-        # Expr -> Term
-        return vals[0]
-    if prod_id == 19 or prod_id == 20:
-        # Term -> Term MUL/DIV Factor
-        left = vals[0]  # type: ignore[assignment]
-        right = vals[2]  # type: ignore[assignment]
-        op = "MUL" if prod_id == 19 else "DIV"
-        return ast_nodes.BinOp(op=op, left=left, right=right)
-    if prod_id == 21:
-        # Term -> Factor
-        return vals[0]
-    if prod_id == 22:
-        # Factor -> ID
-        tok: Token = vals[0]  # type: ignore[assignment]
-        return ast_nodes.Id(name=tok.lexeme)
-    if prod_id == 23:
-        # Factor -> NUM
-        tok: Token = vals[0]  # type: ignore[assignment]
-        return ast_nodes.Num(value=tok.lexeme)
-    if prod_id == 24:
-        # Factor -> LPAREN Expr RPAREN
-        return vals[1]
-    if prod_id == 25:
-        # Bool -> OrExpr
-        return vals[0]
-    if prod_id == 26:
-        # OrExpr -> OrExpr OR AndExpr
-        left = vals[0]  # type: ignore[assignment]
-        right = vals[2]  # type: ignore[assignment]
-        return ast_nodes.LogicOp(op="OR", left=left, right=right)
-    if prod_id == 27:
-        # OrExpr -> AndExpr
-        return vals[0]
-    if prod_id == 28:
-        # AndExpr -> AndExpr AND NotExpr
-        left = vals[0]  # type: ignore[assignment]
-        right = vals[2]  # type: ignore[assignment]
-        return ast_nodes.LogicOp(op="AND", left=left, right=right)
-    if prod_id == 29:
-        # AndExpr -> NotExpr
-        return vals[0]
-    if prod_id == 30:
-        # NotExpr -> NOT NotExpr
-        expr = vals[1]  # type: ignore[assignment]
-        return ast_nodes.Not(expr=expr)
-    if prod_id == 31:
-        # NotExpr -> LPAREN Bool RPAREN
-        return vals[1]
-    if prod_id == 32:
-        # NotExpr -> RelExpr
-        return vals[0]
-    if prod_id == 33:
-        op = "IF_EQ"
-    elif prod_id == 34:
-        op = "IF_NE"
-    elif prod_id == 35:
-        op = "IF_LT"
-    elif prod_id == 36:
-        op = "IF_GT"
-    elif prod_id == 37:
-        op = "IF_LE"
-    elif prod_id == 38:
-        op = "IF_GE"
-    else:
+    return ParseResult(
+        trace=sink.text() if sink is not None else "", program=program, steps=step_idx
+    )
+
+
+GENERATED_MODULE = "_generated_parser"
+# Bump when ``parsergen`` renders the module differently; part of ``reducers_hash``.
+PARSERGEN_VERSION = 1
+
+_RUNTIME: Dict[bool, Tuple[CompiledTables, List[Reducer]]] = {}
+_RUNTIME_LOCK = threading.Lock()  # threads parsing first all wait for one load
+
+
+def load_parser_runtime(unit_bypass: bool = True) -> Tuple[CompiledTables, List[Reducer]]:
+    """Return the compiled tables and per-production reducers used by the driver.
+
+    The ahead-of-time module written by ``python -m src.parsergen`` is preferred:
+    importing it is the only table cost. Without it (or when it is stale) the
+    tables come from ``lalr.load_compiled_tables`` and the reducers from
+    ``REDUCERS`` below.
+    """
+    runtime = _RUNTIME.get(unit_bypass)
+    if runtime is None:
+        with _RUNTIME_LOCK:
+            runtime = _RUNTIME.get(unit_bypass)
+            if runtime is None:
+                runtime = (unit_bypass and _generated_runtime()) or _built_runtime(unit_bypass)
+                _RUNTIME[unit_bypass] = runtime
+    return runtime
+
+
+def _generated_runtime() -> Tuple[CompiledTables, List[Reducer]] | None:
+    module_name = f"{__package__}.{GENERATED_MODULE}"
+    try:
+        generated = importlib.import_module(module_name)
+    except ModuleNotFoundError as exc:
+        if exc.name != module_name:
+            raise
+        return None
+    except ImportError as exc:
+        # the module checks its grammar and reducer hashes on import and refuses to load if stale
+        warnings.warn(f"{exc}; falling back to table generation", RuntimeWarning, stacklevel=3)
         return None
-    if prod_id in (33, 34, 35, 36, 37, 38):
-        left = vals[0]  # type: ignore[assignment]
-        right = vals[2]  # type: ignore[assignment]
-        return ast_nodes.RelOp(op=op, left=left, right=right)
-    return None
+    return generated.TABLES, list(generated.REDUCERS)
+
+
+def _built_runtime(unit_bypass: bool) -> Tuple[CompiledTables, List[Reducer]]:
+    from .lalr import load_compiled_tables
+
+    tables = load_compiled_tables(unit_bypass)
+    return tables, _reducer_list(REDUCERS, len(tables.prod_len))
+
+
+def _terminal_codes(tokens: Tokens, tables: CompiledTables) -> List[int]:
+    """Map each token to its terminal column in the compiled ACTION table."""
+    by_type = {tt: tables.term_index[tt.value] for tt in TokenType if tt.value in tables.term_index}
+    try:
+        if isinstance(tokens, TokenBuffer):
+            return [by_type[TOKEN_TYPES[code]] for code in tokens.types]
+        return [by_type[tok.type] for tok in tokens]
+    except KeyError as exc:
+        raise UserError(f"Internal error: token type {exc.args[0]} has no terminal") from None
+
+
+Reducer = Callable[[List[object]], object]
+
+# Semantic action per production id; ``parsergen`` copies these functions into
+# the generated parser module, so each must be self-contained (only ``ast_nodes``
+# and its argument in scope).
+REDUCERS: Dict[int, Reducer] = {}
+
+
+def _reduces(*prod_ids: int) -> Callable[[Reducer], Reducer]:
+    def register(fn: Reducer) -> Reducer:
+        for pid in prod_ids:
+            REDUCERS[pid] = fn
+        return fn
+
+    return register
+
+
+@_reduces(1, *sorted(IDENTITY_UNIT_PRODUCTIONS))
+def _reduce_pass(v: List[object]) -> object:
+    # S' -> Program EOF and unit productions (Stmt -> Matched, Expr -> Term, ...)
+    return v[0]
+
+
+@_reduces(24, 31)
+def _reduce_paren(v: List[object]) -> object:
+    # Factor -> LPAREN Expr RPAREN / NotExpr -> LPAREN Bool RPAREN
+    return v[1]
+
+
+@_reduces(2)
+def _reduce_program(v: List[object]) -> object:
+    # Program -> StmtList
+    return ast_nodes.Program(stmts=v[0])  # type: ignore[arg-type]
+
+
+@_reduces(3)
+def _reduce_stmt_list_append(v: List[object]) -> object:
+    # StmtList -> StmtList Stmt (left-recursive: append in place, O(1) per statement)
+    stmts: List[ast_nodes.Stmt] = v[0]  # type: ignore[assignment]
+    stmts.append(v[1])  # type: ignore[arg-type]
+    return stmts
+
+
+@_reduces(4)
+def _reduce_stmt_list_empty(v: List[object]) -> object:
+    # StmtList -> ε
+    return []
+
+
+@_reduces(8, 13)
+def _reduce_while(v: List[object]) -> object:
+    # Matched/Unmatched -> WHILE LPAREN Bool RPAREN body
+    return ast_nodes.While(cond=v[2], body=v[4])  # type: ignore[arg-type]
+
+
+@_reduces(10, 12)
+def _reduce_if_else(v: List[object]) -> object:
+    # Matched/Unmatched -> IF LPAREN Bool RPAREN Matched ELSE stmt
+    return ast_nodes.If(cond=v[2], then_branch=v[4], else_branch=v[6])  # type: ignore[arg-type]
+
+
+@_reduces(11)
+def _reduce_if(v: List[object]) -> object:
+    # Unmatched -> IF LPAREN Bool RPAREN Stmt
+    return ast_nodes.If(cond=v[2], then_branch=v[4], else_branch=None)  # type: ignore[arg-type]
+
+
+@_reduces(14)
+def _reduce_assign(v: List[object]) -> object:
+    # AssignStmt -> ID ASSIGN Expr SEMI
+    return ast_nodes.Assign(name=v[0].lexeme, expr=v[2])  # type: ignore[attr-defined,arg-type]
+
+
+@_reduces(15)
+def _reduce_block(v: List[object]) -> object:
+    # Block -> LBRACE StmtList RBRACE
+    return ast_nodes.Block(stmts=v[1])  # type: ignore[arg-type]
+
+
+@_reduces(16)
+def _reduce_add(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="ADD", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(17)
+def _reduce_sub(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="SUB", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(19)
+def _reduce_mul(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="MUL", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(20)
+def _reduce_div(v: List[object]) -> object:
+    return ast_nodes.BinOp(op="DIV", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(22)
+def _reduce_id(v: List[object]) -> object:
+    # Factor -> ID
+    return ast_nodes.Id(name=v[0].lexeme)  # type: ignore[attr-defined]
+
+
+@_reduces(23)
+def _reduce_num(v: List[object]) -> object:
+    # Factor -> NUM
+    return ast_nodes.Num(value=v[0].lexeme)  # type: ignore[attr-defined]
+
+
+@_reduces(26)
+def _reduce_or(v: List[object]) -> object:
+    return ast_nodes.LogicOp(op="OR", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(28)
+def _reduce_and(v: List[object]) -> object:
+    return ast_nodes.LogicOp(op="AND", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(30)
+def _reduce_not(v: List[object]) -> object:
+    # NotExpr -> NOT NotExpr
+    return ast_nodes.Not(expr=v[1])  # type: ignore[arg-type]
+
+
+@_reduces(33)
+def _reduce_eq(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_EQ", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(34)
+def _reduce_ne(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_NE", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(35)
+def _reduce_lt(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_LT", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(36)
+def _reduce_gt(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_GT", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(37)
+def _reduce_le(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_LE", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+@_reduces(38)
+def _reduce_ge(v: List[object]) -> object:
+    return ast_nodes.RelOp(op="IF_GE", left=v[0], right=v[2])  # type: ignore[arg-type]
+
+
+def reducers_hash() -> str:
+    """Return a SHA-256 fingerprint of the ``REDUCERS`` sources and ``PARSERGEN_VERSION``.
+
+    Raises ``ImportError`` when the sources are unavailable (e.g. a ``.pyc``-only
+    install), so the generated module refuses to load and the parser falls back.
+    """
+    import inspect  # only the generated module's staleness check needs it
+
+    digest = hashlib.sha256(f"parsergen={PARSERGEN_VERSION}\n".encode("utf-8"))
+    sources: Dict[Reducer, str] = {}
+    for pid in sorted(REDUCERS):
+        fn = REDUCERS[pid]
+        if fn not in sources:
+            try:
+                sources[fn] = inspect.getsource(fn)
+            except (OSError, TypeError) as exc:
+                raise ImportError(
+                    f"cannot read the source of reducer {fn.__name__}: {exc}"
+                ) from None
+        digest.update(f"{pid}:{sources[fn]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _reducer_list(reducers: Dict[int, Reducer], n_prods: int) -> List[Reducer]:
+    """Index reducers by production id; productions without one fail loudly."""
+
+    def missing(v: List[object]) -> object:
+        raise UserError("Internal error: no semantic action for production")
+
+    return [reducers.get(pid, missing) for pid in range(n_prods)]
@@ -0,0 +1,207 @@
+"""
+Ahead-of-time parser generator.
+
+Renders ``grammar.GRAMMAR`` and its LALR(1) tables into a standalone module
+(``src/_generated_parser.py``) holding the tables as literal constants and one
+reduce function per production, copied from ``parser.REDUCERS``. The output is
+deterministic, so regenerating an up-to-date module is a no-op; the module
+checks the grammar hash and ``parser.reducers_hash()`` (the reducer sources and
+the generator version) on import and refuses to load when stale.
+
+Usage: ``python -m src.parsergen [--output PATH] [--check]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import sys
+import textwrap
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .grammar import GRAMMAR, Grammar, grammar_hash
+from .lalr import build_parse_tables, bypass_unit_reductions
+from .parser import GENERATED_MODULE, REDUCERS, Reducer, reducers_hash
+from .tables import CompiledTables, compile_tables
+from .utils import UserError, write_text_file
+
+DEFAULT_OUTPUT = Path(__file__).with_name(f"{GENERATED_MODULE}.py")
+
+_HEADER = '''\
+"""
+Generated by ``python -m src.parsergen``; do not edit by hand.
+
+LALR(1) tables and per-production reduce functions for the MiniLang grammar.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import List
+
+from . import ast as ast_nodes
+from .grammar import grammar_hash
+from .parser import reducers_hash
+from .tables import CompiledTables
+
+GRAMMAR_HASH = "{ghash}"
+REDUCERS_HASH = "{rhash}"
+
+if grammar_hash() != GRAMMAR_HASH:
+    raise ImportError(
+        "{module} is stale: the grammar changed since it was generated "
+        "(regenerate with `python -m src.parsergen`)"
+    )
+if reducers_hash() != REDUCERS_HASH:
+    raise ImportError(
+        "{module} is stale: the semantic actions in src.parser or the generator "
+        "changed since it was generated (regenerate with `python -m src.parsergen`)"
+    )
+'''
+
+
+def render_module(grammar: Grammar | None = None) -> str:
+    """Return the source text of the generated parser module."""
+    g = grammar if grammar is not None else GRAMMAR
+    tables = compile_tables(
+        bypass_unit_reductions(build_parse_tables(method="deremer", grammar=g), grammar=g)
+    )
+    parts = [
+        _HEADER.format(
+            ghash=grammar_hash(g), rhash=reducers_hash(), module=f"src.{GENERATED_MODULE}"
+        ),
+        _render_tables(tables),
+    ]
+    names: List[str] = ["None"]
+    for prod in sorted(g.productions, key=lambda p: p.id):
+        fn = REDUCERS.get(prod.id)
+        if fn is None:
+            raise UserError(f"Error: production {prod.id} has no reducer in parser.REDUCERS")
+        rhs = " ".join(prod.rhs) if prod.rhs else "ε"
+        parts.append(_render_reducer(f"reduce_{prod.id}", fn, f"{prod.id}: {prod.lhs} -> {rhs}"))
+        names.append(f"reduce_{prod.id}")
+    parts.append(
+        "# Indexed by production id (0 is unused).\n"
+        + "REDUCERS = (\n"
+        + "".join(f"    {name},\n" for name in names)
+        + ")\n"
+    )
+    return "\n\n".join(parts)
+
+
+def _render_tables(tables: CompiledTables) -> str:
+    lines = [
+        f"TERMINALS = {json.dumps(tables.terminals)}",
+        f"NONTERMINALS = {json.dumps(tables.nonterminals)}",
+        f"N_STATES = {tables.n_states}",
+        "",
+        "# ACTION: per-state default reduction plus comb-packed explicit entries",
+        "# (0 error, v > 0 shift to v - 1, -1 accept, v < -1 reduce by production -v).",
+        _array_literal("ACTION_DEFAULT", tables.action_default, 16),
+        _array_literal("ACTION_BASE", tables.action_base, 16),
+        _array_literal("ACTION_TABLE", tables.action_table, 16),
+        _array_literal("ACTION_CHECK", tables.action_check, 16),
+        "# GOTO: per-nonterminal default target plus comb-packed exceptions.",
+        _array_literal("GOTO_DEFAULT", tables.goto_default, 16),
+        _array_literal("GOTO_BASE", tables.goto_base, 16),
+        _array_literal("GOTO_TABLE", tables.goto_table, 16),
+        _array_literal("GOTO_CHECK", tables.goto_check, 16),
+        "# Terminal bitmask of each state's real ACTION entries (error reporting).",
+        f"VALID = {_int_list(tables.valid)}",
+        _array_literal("PROD_LHS", tables.prod_lhs, 16),
+        _array_literal("PROD_LEN", tables.prod_len, 16),
+        f"PROD_LHS_NAME = {json.dumps(tables.prod_lhs_name)}",
+        "# (state, nonterminal) GOTO entries that fold in unit reductions -> skipped productions.",
+        f"UNIT_CHAINS = {_chain_dict(tables.unit_chains)}",
+        "# The same entries -> unit-reduction states they skip (error reporting).",
+        f"UNIT_STATES = {_chain_dict(tables.unit_states)}",
+        "",
+        "TABLES = CompiledTables(",
+        "    terminals=TERMINALS,",
+        "    nonterminals=NONTERMINALS,",
+        "    term_index={t: i for i, t in enumerate(TERMINALS)},",
+        "    nonterm_index={nt: i for i, nt in enumerate(NONTERMINALS)},",
+        "    n_states=N_STATES,",
+        "    n_terms=len(TERMINALS),",
+        "    n_nonterms=len(NONTERMINALS),",
+        "    action_default=ACTION_DEFAULT,",
+        "    action_base=ACTION_BASE,",
+        "    action_table=ACTION_TABLE,",
+        "    action_check=ACTION_CHECK,",
+        "    goto_default=GOTO_DEFAULT,",
+        "    goto_base=GOTO_BASE,",
+        "    goto_table=GOTO_TABLE,",
+        "    goto_check=GOTO_CHECK,",
+        "    valid=VALID,",
+        "    prod_lhs=PROD_LHS,",
+        "    prod_len=PROD_LEN,",
+        "    prod_lhs_name=PROD_LHS_NAME,",
+        "    unit_chains=UNIT_CHAINS,",
+        "    unit_states=UNIT_STATES,",
+        ")",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _array_literal(name: str, values: Iterable[int], row: int) -> str:
+    vals = list(values)
+    rows = [
+        "    " + ", ".join(str(v) for v in vals[i : i + row]) + ","
+        for i in range(0, len(vals), max(row, 1))
+    ]
+    return f'{name} = array("i", [\n' + "\n".join(rows) + "\n])\n"
+
+
+def _int_list(values: Iterable[int]) -> str:
+    vals = list(values)
+    rows = ["    " + ", ".join(str(v) for v in vals[i : i + 8]) + "," for i in range(0, len(vals), 8)]
+    return "[\n" + "\n".join(rows) + "\n]\n"
+
+
+def _chain_dict(chains: Dict[Tuple[int, int], Tuple[int, ...]]) -> str:
+    rows = [f"    {key!r}: {chains[key]!r}," for key in sorted(chains)]
+    return "{\n" + "\n".join(rows) + "\n}" if rows else "{}"
+
+
+def _render_reducer(name: str, fn: Reducer, production: str) -> str:
+    source = textwrap.dedent(inspect.getsource(fn))
+    lines = [ln for ln in source.splitlines() if not ln.startswith("@")]
+    header = lines[0]
+    if not header.startswith(f"def {fn.__name__}("):
+        raise UserError(f"Error: cannot copy reducer {fn.__name__}")
+    lines[0] = header.replace(f"def {fn.__name__}(", f"def {name}(", 1)
+    return f"# {production}\n" + "\n".join(lines) + "\n"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the ahead-of-time parser module.")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Module path to write.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Do not write; exit 1 if the module on disk differs from a fresh render.",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        source = render_module()
+    except UserError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    current = args.output.read_text(encoding="utf-8") if args.output.exists() else None
+    if args.check:
+        if current != source:
+            print(f"{args.output} is out of date; run `python -m src.parsergen`", file=sys.stderr)
+            return 1
+        print(f"{args.output} is up to date")
+        return 0
+    if current != source:
+        write_text_file(args.output, source)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
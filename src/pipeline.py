@@ -1,19 +1,20 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import List
-
-from .lexer import tokenize, build_symbol_table
-from .parser import parse_tokens
-from .ir import generate_ir, generate_ir_quads
-from .cfg import build_cfg, render_cfg
-from .codegen import emit_target
-from . import lalr
+from typing import TYPE_CHECKING, Callable, List
+
+# Stage modules are imported by the stages that use them, so e.g. the lexer
+# stage never loads the parser, the IR passes or the LALR(1) builder.
+from .manifest import BuildManifest, file_hash
+from .session import CompilationSession
 from .utils import (
     StageResult,
+    TraceOptions,
     UserError,
     ensure_input_file,
     ensure_output_dir,
+    partial_path,
     write_csv_with_header,
     write_text_file,
     write_tokens_csv,
@@ -21,94 +22,261 @@ from .utils import (
     write_symtab_txt,
 )
 
+if TYPE_CHECKING:
+    from .lexer import SymbolEntry
+    from .profiling import StageProfiler
+    from .tables import ParseTables
+
 SUPPORTED_STAGES = ["lexer", "table", "parse", "ir", "cfg", "opt", "codegen", "all"]
 
 
-def run_stage(stage: str, input_path: str) -> StageResult:
-    """Dispatch a single stage and return basic metadata about the outputs."""
+def run_stage(
+    stage: str,
+    input_path: str,
+    table_method: str = "deremer",
+    trace: TraceOptions | None = None,
+    rebuild: bool = False,
+    tables: ParseTables | None = None,
+    out_dir: str | Path | None = None,
+    profile: str | None = None,
+    unit_bypass: bool = True,
+) -> StageResult:
+    """Dispatch a single stage and return basic metadata about the outputs.
+
+    ``trace`` controls parse_trace.txt for the parse stage (and ``all``); it
+    defaults to a full trace. With ``unit_bypass`` (the default) identity unit
+    reductions are folded into the preceding trace step (``r22+r21``); pass
+    ``False`` for a step-by-step trace. Other stages never trace. All stages share one
+    ``CompilationSession``, so ``all`` lexes, parses and optimizes once.
+
+    A stage whose inputs match ``build_manifest.json`` is reused instead of run
+    (listed in ``StageResult.reused``); ``rebuild`` runs every stage regardless.
+    The ``table`` stage on its own always regenerates, unless prebuilt
+    ``tables`` are passed (batch mode builds them once for all files).
+    Outputs go to ``out_dir``, by default ``out/<input_basename>/``.
+
+    ``profile`` (``basic`` or ``cprofile``, see ``src.profiling``) measures each
+    stage that runs, writes ``profile.json`` and fills ``StageResult.profile``.
+    """
     normalized = stage.lower()
     if normalized not in SUPPORTED_STAGES:
         raise UserError(f"Error: unsupported stage '{stage}'")
 
     source_path = ensure_input_file(input_path)
-    out_dir = ensure_output_dir(source_path)
-    generated: List[Path] = []
-
-    if normalized == "lexer":
-        generated.extend(_emit_tokens(source_path, out_dir))
-    elif normalized == "table":
-        generated.append(_emit_action_goto(out_dir))
-    elif normalized == "parse":
-        generated.append(_emit_parse_trace(source_path, out_dir))
-    elif normalized == "ir":
-        generated.append(generate_ir(source_path, out_dir))
-    elif normalized == "cfg":
-        generated.append(_emit_cfg(source_path, out_dir))
-    elif normalized == "opt":
-        generated.extend(_emit_opt(source_path, out_dir))
-    elif normalized == "codegen":
-        generated.append(_emit_target(source_path, out_dir))
-    elif normalized == "all":
-        generated.extend(_run_all(source_path, out_dir))
-
-    return StageResult(stage=normalized, output_dir=out_dir, generated=generated)
-
-
-def _emit_tokens(source_path: Path, out_dir: Path) -> List[Path]:
-    tokens_path = out_dir / "tokens.csv"
-    symtab_path = out_dir / "symtab.txt"
-    tokens = tokenize(source_path)
-    write_tokens_csv(tokens_path, tokens)
-    sym_entries = build_symbol_table(tokens)
-    write_symtab_txt(symtab_path, sym_entries)
-    return [tokens_path, symtab_path]
+    if out_dir is None:
+        out_dir = ensure_output_dir(source_path)
+    else:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+    session = CompilationSession(source_path)
+    trace = trace if trace is not None else TraceOptions()
+    build = _Build(session, out_dir, BuildManifest(out_dir, file_hash(source_path)), rebuild)
+    if profile is not None:
+        from .profiling import StageProfiler
 
+        build.profiler = StageProfiler(profile, out_dir)
+        build.profiler.start()
 
-def _emit_action_goto(out_dir: Path) -> Path:
-    path = out_dir / "action_goto.csv"
-    _, terminals, nonterminals, action, goto_table = lalr.generate_tables()
-    write_action_goto_csv(path, terminals, nonterminals, action, goto_table)
-    return path
+    try:
+        if normalized == "lexer":
+            build.stage(
+                "lexer", "", lambda: _emit_tokens(session, out_dir, stream=True, counts=build.counts)
+            )
+        elif normalized == "table":
+            build.rebuild = True  # refreshing the table cache is the point of this stage
+            _build_table(build, table_method, tables)
+        elif normalized == "parse":
+            _build_parse(build, trace, unit_bypass)
+        elif normalized == "all":
+            _run_all(build, table_method, trace, tables, unit_bypass)
+        else:
+            _build_session_stage(build, normalized)
+    finally:
+        build.manifest.save()
+        if build.profiler is not None:
+            build.profiler.stop()
 
+    result = StageResult(
+        stage=normalized, output_dir=out_dir, generated=build.generated, reused=build.reused
+    )
+    if build.profiler is not None:
+        result.generated.append(build.profiler.write())
+        result.profile = build.profiler.stages
+    return result
 
-def _emit_parse_trace(source_path: Path, out_dir: Path) -> Path:
-    path = out_dir / "parse_trace.txt"
-    tokens = tokenize(source_path)
-    parse_result = parse_tokens(tokens)
-    write_text_file(path, parse_result.trace)
-    return path
+
+class _Build:
+    """Runs stages of one ``run_stage`` call, reusing those the manifest allows."""
+
+    def __init__(
+        self, session: CompilationSession, out_dir: Path, manifest: BuildManifest, rebuild: bool
+    ):
+        self.session = session
+        self.out_dir = out_dir
+        self.manifest = manifest
+        self.rebuild = rebuild
+        self.generated: List[Path] = []
+        self.reused: List[str] = []
+        self.profiler: StageProfiler | None = None
+        self.counts: dict[str, int] = {}  # filled by emitters that keep no session artifact
+
+    def stage(
+        self, name: str, options: str, emit: Callable[[], List[Path]], uses_source: bool = True
+    ) -> None:
+        key = self.manifest.stage_key(name, options, uses_source)
+        files = None if self.rebuild else self.manifest.reusable(name, key)
+        if files is not None:
+            self.reused.append(name)
+            if self.profiler is not None:
+                self.profiler.reused(name)
+        else:
+            self.manifest.invalidate(name)  # a failed run must not look reusable
+            self.counts = {}
+            if self.profiler is None:
+                files = emit()
+            else:
+                from .profiling import session_counts
+
+                with self.profiler.measure(name) as entry:
+                    files = emit()
+                entry["counts"] = {**self.counts, **session_counts(name, self.session)}
+            self.manifest.record(name, key, files)
+        self.generated.extend(files)
 
 
-def _emit_ir(out_dir: Path) -> Path:
-    raise UserError("Error: IR generation requires source file path")
+def _emit_ir(session: CompilationSession, out_dir: Path) -> List[Path]:
+    from .ir import generate_ir
 
+    return [generate_ir(session, out_dir)]
+
+
+def _emit_cfg(session: CompilationSession, out_dir: Path) -> List[Path]:
+    from .cfg import render_cfg
 
-def _emit_cfg(source_path: Path, out_dir: Path) -> Path:
-    builder = generate_ir_quads(source_path)
-    blocks = build_cfg(builder)
     cfg_path = out_dir / "cfg.txt"
-    write_text_file(cfg_path, render_cfg(blocks))
-    return cfg_path
+    write_text_file(cfg_path, render_cfg(session.cfg, session.ir.symbols))
+    return [cfg_path]
 
 
-def _emit_opt(source_path: Path, out_dir: Path) -> List[Path]:
+def _emit_opt(session: CompilationSession, out_dir: Path) -> List[Path]:
     from .opt import optimize_ir
 
-    ir_opt, report = optimize_ir(source_path, out_dir)
+    ir_opt, report = optimize_ir(session, out_dir)
     return [ir_opt, report]
 
 
-def _emit_target(source_path: Path, out_dir: Path) -> Path:
-    return emit_target(source_path, out_dir)
+def _emit_target(session: CompilationSession, out_dir: Path) -> List[Path]:
+    from .codegen import emit_target
+
+    return [emit_target(session, out_dir)]
+
+
+# Stages that read only the session and take no options.
+_SESSION_STAGES: dict[str, Callable[[CompilationSession, Path], List[Path]]] = {
+    "ir": _emit_ir,
+    "cfg": _emit_cfg,
+    "opt": _emit_opt,
+    "codegen": _emit_target,
+}
+
+
+def _build_session_stage(build: _Build, name: str) -> None:
+    build.stage(name, "", lambda: _SESSION_STAGES[name](build.session, build.out_dir))
+
+
+def _build_table(build: _Build, table_method: str, tables: ParseTables | None) -> None:
+    build.stage(
+        "table",
+        table_method,
+        lambda: [_emit_action_goto(build.out_dir, table_method, tables, build.counts)],
+        uses_source=False,
+    )
+
+
+def _build_parse(build: _Build, trace: TraceOptions, unit_bypass: bool) -> None:
+    options = f"{trace.mode}:{trace.limit}:{trace.every}:bypass={int(unit_bypass)}"
+    build.stage(
+        "parse",
+        options,
+        lambda: _emit_parse_trace(build.session, build.out_dir, trace, unit_bypass),
+    )
+
+
+def _emit_tokens(
+    session: CompilationSession, out_dir: Path, stream: bool, counts: dict[str, int] | None = None
+) -> List[Path]:
+    from .lexer import MappedSource, build_symbol_table, count_symbols, symbol_entries
+
+    tokens_path = out_dir / "tokens.csv"
+    symtab_path = out_dir / "symtab.txt"
+    if not stream:
+        # later stages need the session's tokens anyway
+        write_tokens_csv(tokens_path, session.tokens)
+        write_symtab_txt(symtab_path, build_symbol_table(session.tokens))
+        return [tokens_path, symtab_path]
+    # Tokens are streamed from a memory map into tokens.csv, so a large source
+    # is never held as a token list; the symbol table is counted on the way.
+    # tokens.csv only replaces the previous one once lexing has succeeded.
+    partial = partial_path(tokens_path)
+    seen: dict[str, SymbolEntry] = {}
+    try:
+        with MappedSource(session.source_path) as source:
+            written = write_tokens_csv(partial, count_symbols(source.iter_full_tokens(), seen))
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, tokens_path)
+    write_symtab_txt(symtab_path, symbol_entries(seen))
+    if counts is not None:
+        counts.update(tokens=written, identifiers=len(seen))
+    return [tokens_path, symtab_path]
+
+
+def _emit_action_goto(
+    out_dir: Path,
+    table_method: str = "deremer",
+    tables: ParseTables | None = None,
+    counts: dict[str, int] | None = None,
+) -> Path:
+    path = out_dir / "action_goto.csv"
+    # The table stage always regenerates (printing conflict diagnostics) and
+    # refreshes the on-disk cache used by the parser.
+    if tables is None:
+        from . import lalr
+
+        tables = lalr.load_tables(refresh=True, verbose=True, method=table_method)
+    write_action_goto_csv(path, tables.terminals, tables.nonterminals, tables.action, tables.goto)
+    if counts is not None:
+        counts["lr_states"] = len(tables.action)
+    return path
+
+
+def _emit_parse_trace(
+    session: CompilationSession, out_dir: Path, trace: TraceOptions, unit_bypass: bool = True
+) -> List[Path]:
+    path = out_dir / "parse_trace.txt"
+    if trace.mode == "off":
+        path.unlink(missing_ok=True)  # a trace from an earlier run would not match
+        session.program  # parse for its errors only
+        return []
+    session.tokens  # a lexical error must not leave an empty trace behind
+    # Stream the trace so memory stays flat; on a syntax error the file ends
+    # with the failing step.
+    with path.open("w", encoding="utf-8") as fp:
+        session.parse_traced(trace, fp, unit_bypass)
+    return [path]
 
 
-def _run_all(source_path: Path, out_dir: Path) -> List[Path]:
-    generated: List[Path] = []
-    generated.extend(_emit_tokens(source_path, out_dir))
-    generated.append(_emit_action_goto(out_dir))
-    generated.append(_emit_parse_trace(source_path, out_dir))
-    generated.append(generate_ir(source_path, out_dir))
-    generated.append(_emit_cfg(source_path, out_dir))
-    generated.extend(_emit_opt(source_path, out_dir))
-    generated.append(_emit_target(source_path, out_dir))
-    return generated
+def _run_all(
+    build: _Build,
+    table_method: str,
+    trace: TraceOptions,
+    tables: ParseTables | None,
+    unit_bypass: bool = True,
+) -> None:
+    session, out_dir = build.session, build.out_dir
+    build.stage("lexer", "", lambda: _emit_tokens(session, out_dir, stream=False))
+    _build_table(build, table_method, tables)
+    _build_parse(build, trace, unit_bypass)
+    for name in _SESSION_STAGES:
+        _build_session_stage(build, name)
@@ -0,0 +1,130 @@
+"""
+Per-stage profiling for ``run_stage(..., profile=...)`` and ``--profile``.
+
+Every stage that runs is measured for wall time, CPU time and (in ``basic``
+mode) the peak of Python allocations above what was held when it started,
+from ``tracemalloc``. Key counts of its artifacts are recorded as well. With
+``cprofile`` each stage also runs under ``cProfile`` and its stats are dumped
+to ``profile_<stage>.pstats``. tracemalloc is off in that mode, because
+tracing under the profiler would distort both. tracemalloc itself slows
+allocation-heavy stages, so compare wall times within one mode. The result is
+written to ``profile.json`` in the output directory.
+
+Artifacts are computed lazily by the ``CompilationSession``, so work is
+charged to the first stage that needs it. Profile with ``--rebuild`` or
+``--stage all``, so that each stage does its own work.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator
+
+from .utils import UserError
+
+if TYPE_CHECKING:
+    from .session import CompilationSession
+
+PROFILE_MODES = ("basic", "cprofile")
+PROFILE_FILE = "profile.json"
+
+
+class StageProfiler:
+    def __init__(self, mode: str, out_dir: Path):
+        if mode not in PROFILE_MODES:
+            raise UserError(f"Error: unsupported profile mode '{mode}'")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._owns_tracemalloc = False
+
+    def start(self) -> None:
+        if self.mode == "basic" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[Dict[str, Any]]:
+        """Time the block as ``stage``; the caller may add counts to the yielded entry."""
+        entry: Dict[str, Any] = {}
+        profiler = None
+        if self.mode == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+        tracing = tracemalloc.is_tracing() and self.mode == "basic"
+        if tracing:
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield entry
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            entry["wall_s"] = round(time.perf_counter() - wall, 6)
+            entry["cpu_s"] = round(time.process_time() - cpu, 6)
+            if tracing:
+                entry["peak_mb"] = round((tracemalloc.get_traced_memory()[1] - held) / 1e6, 3)
+            if profiler is not None:
+                pstats_path = self.out_dir / f"profile_{stage}.pstats"
+                profiler.dump_stats(str(pstats_path))
+                entry["pstats"] = pstats_path.name
+            self.stages[stage] = entry
+
+    def reused(self, stage: str) -> None:
+        self.stages[stage] = {"reused": True}
+
+    def write(self) -> Path:
+        path = self.out_dir / PROFILE_FILE
+        data = {"mode": self.mode, "stages": self.stages}
+        path.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+        return path
+
+
+def format_profile(stages: Dict[str, Dict[str, Any]]) -> str:
+    """A table of ``StageResult.profile`` for the console."""
+    lines = [f"{'stage':<8} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}  counts"]
+    for stage, entry in stages.items():
+        if entry.get("reused"):
+            lines.append(f"{stage:<8} {'reused':>8}")
+            continue
+        peak = entry.get("peak_mb")
+        counts = ", ".join(f"{k}={v}" for k, v in entry.get("counts", {}).items())
+        lines.append(
+            f"{stage:<8} {entry['wall_s']:>8.3f} {entry['cpu_s']:>8.3f} "
+            f"{'-' if peak is None else f'{peak:.1f}':>8}  {counts}"
+        )
+    return "\n".join(lines)
+
+
+def session_counts(stage: str, session: CompilationSession) -> Dict[str, int]:
+    """Sizes of the session artifacts ``stage`` produced; nothing is computed here."""
+    have = session.__dict__
+    counts: Dict[str, int] = {}
+    if stage == "lexer" and "tokens" in have:
+        counts["tokens"] = len(session.tokens)
+        counts["identifiers"] = len(session.tokens.symbols.entries())
+    elif stage == "parse" and "parsed" in have:
+        counts["parse_steps"] = session.parsed.steps
+    elif stage == "ir" and "ir" in have:
+        counts["quads"] = len(session.ir.quads)
+    elif stage == "cfg" and "cfg" in have:
+        counts["blocks"] = len(session.cfg)
+    elif stage == "opt" and "optimized" in have:
+        counts["quads_before"] = len(session.ir.quads)
+        counts["quads_after"] = len(session.optimized.ir.quads)
+    elif stage == "codegen" and "target" in have:
+        counts["asm_lines"] = session.target.count("\n")
+    return counts
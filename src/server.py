@@ -0,0 +1,336 @@
+"""
+Compile server: one long-running process answering JSON-lines requests.
+
+The server loads the LALR(1) tables once and keeps a pool of worker processes
+that already have the compiler imported, so a request costs only its own
+compile. Requests arrive one JSON object per line on stdin (answered on stdout)
+or on connections to a Unix socket. Each request is compiled in the pool as it
+arrives, so responses come back in completion order and carry the request's
+``id``.
+
+A compile request::
+
+    {"id": 1, "stage": "all", "input": "examples/demo.min", "out_dir": "build/demo"}
+    {"id": 2, "stage": "codegen", "text": "x = 1;", "name": "snippet", "contents": true}
+
+``input`` names a source file; ``text`` is the source itself. Optional fields:
+``out_dir`` (default ``out/<name>/``), ``trace``, ``trace_limit``, ``trace_every``, ``table_method``,
+``rebuild``, ``unit_bypass`` (``false`` for a step-by-step trace), ``profile`` (``basic`` or ``cprofile``; the response then carries
+the per-stage profile) and ``contents`` (also return each generated file's
+text). The response is ``{"id", "ok": true, "stage", "output_dir", "generated", "reused"}``
+plus ``artifacts`` when asked, or ``{"id", "ok": false, "error"}``.
+
+``text`` is compiled in memory with ``api.compile_source``. By default no file
+is written and the response has ``artifacts`` and no ``output_dir``: each
+request runs in its own worker, so unnamed requests sharing one folder would mix
+their files. A ``name`` (for ``out/<name>/``) or an ``out_dir`` writes the files
+too, unless ``"write": false`` is given. For ``text``, ``all`` means the
+per-source stages (``table`` and ``profile`` need an ``input``), and nothing is
+reused from a build manifest.
+``{"op": "ping"}`` checks the server is alive; ``{"op": "shutdown"}`` (or EOF on
+stdin, SIGTERM, Ctrl-C) finishes the requests in flight and exits.
+
+Requests that write to the same output directory run one after another, in
+arrival order, so they never race on its files or its build manifest.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import IO, Any, Dict, Optional
+
+from . import api, lalr, pipeline
+from .tables import ParseTables
+from .utils import TraceOptions, UserError, output_dir_for_input
+
+
+_SHUTTING_DOWN = "Error: server is shutting down"
+
+
+class CompileServer:
+    def __init__(self, jobs: int | None = None, table_method: str = "deremer"):
+        self.table_method = table_method
+        tables = lalr.load_tables(method=table_method)
+        self.pool = ProcessPoolExecutor(
+            max_workers=jobs or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(tables,),
+        )
+        self.stopping = threading.Event()
+        # Last request submitted per output directory; the next one waits for it.
+        self._last_by_dir: Dict[Path, Future] = {}
+        self._dir_lock = threading.Lock()
+
+    def serve_stream(self, rfile: IO[str], wfile: IO[str]) -> None:
+        """Answer each request line from ``rfile`` on ``wfile`` until EOF or shutdown."""
+        write_lock = threading.Lock()
+        pending: list[Future] = []
+
+        def send(response: Dict[str, Any]) -> None:
+            line = json.dumps(response) + "\n"
+            with write_lock:
+                try:
+                    wfile.write(line)
+                    wfile.flush()
+                except (BrokenPipeError, ValueError):
+                    pass  # the client went away; keep serving the others
+
+        for line in rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as exc:
+                send({"id": None, "ok": False, "error": f"Error: bad request: {exc}"})
+                continue
+            op = request.get("op", "compile")
+            if op == "ping":
+                send({"id": request.get("id"), "ok": True})
+            elif op == "shutdown":
+                self.stopping.set()
+                wait(pending)  # failures are already reported by ``_result``
+                send({"id": request.get("id"), "ok": True})
+                break
+            elif op != "compile":
+                send({"id": request.get("id"), "ok": False, "error": f"Error: unknown op '{op}'"})
+            elif self.stopping.is_set():
+                send({"id": request.get("id"), "ok": False, "error": _SHUTTING_DOWN})
+            else:
+                request.setdefault("table_method", self.table_method)
+                future = self._submit(request)
+                future.add_done_callback(lambda f, rid=request.get("id"): send(_result(f, rid)))
+                pending.append(future)
+                pending = [f for f in pending if not f.done()]
+        wait(pending)
+
+    def _submit(self, request: Dict[str, Any]) -> Future:
+        """Run ``request`` in the pool once earlier requests for its output directory finish."""
+        result: Future = Future()
+        out_dir = _request_out_dir(request)
+        previous = None
+        if out_dir is not None:
+            with self._dir_lock:
+                previous = self._last_by_dir.get(out_dir)
+                self._last_by_dir[out_dir] = result
+            result.add_done_callback(lambda f: self._forget(out_dir, f))
+
+        def start(_: object = None) -> None:
+            try:
+                inner = self.pool.submit(_handle, request)
+            except RuntimeError as exc:
+                # Another connection may have shut the pool down since the check.
+                error = _SHUTTING_DOWN if self.stopping.is_set() else f"Unexpected error: {exc}"
+                result.set_result({"ok": False, "error": error})
+                return
+            inner.add_done_callback(lambda f: _chain(f, result))
+
+        if previous is None:
+            start()
+        else:
+            previous.add_done_callback(start)
+        return result
+
+    def _forget(self, out_dir: Path, future: Future) -> None:
+        with self._dir_lock:
+            if self._last_by_dir.get(out_dir) is future:
+                del self._last_by_dir[out_dir]
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+def serve_stdio(jobs: int | None = None, table_method: str = "deremer") -> None:
+    server = CompileServer(jobs, table_method)
+    out = sys.stdout
+    sys.stdout = sys.stderr  # stdout carries responses only
+    try:
+        with _terminate_on_sigterm():
+            server.serve_stream(sys.stdin, out)
+    finally:
+        server.close()
+        sys.stdout = out
+
+
+def serve_socket(path: str | Path, jobs: int | None = None, table_method: str = "deremer") -> None:
+    server = CompileServer(jobs, table_method)
+    socket_path = Path(path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            rfile = io.TextIOWrapper(self.rfile, encoding="utf-8")
+            wfile = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+            server.serve_stream(rfile, wfile)
+            if server.stopping.is_set():
+                threading.Thread(target=listener.shutdown, daemon=True).start()
+
+    class Listener(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True  # idle clients must not hold up shutdown
+
+    listener = Listener(str(socket_path), Handler)
+    print(f"Listening on {socket_path}", file=sys.stderr)
+    try:
+        with _terminate_on_sigterm():
+            listener.serve_forever()
+    finally:
+        listener.server_close()
+        socket_path.unlink(missing_ok=True)
+        server.close()
+
+
+class _terminate_on_sigterm:
+    """Turn SIGTERM into SystemExit so the ``finally`` clean-up runs."""
+
+    def __enter__(self) -> None:
+        self.previous = signal.signal(signal.SIGTERM, _raise_exit)
+
+    def __exit__(self, *exc: object) -> None:
+        signal.signal(signal.SIGTERM, self.previous)
+
+
+def _raise_exit(signum: int, frame: object) -> None:
+    raise SystemExit(0)
+
+
+def _chain(inner: Future, outer: Future) -> None:
+    exc = inner.exception()
+    if exc is not None:
+        outer.set_exception(exc)
+    else:
+        outer.set_result(inner.result())
+
+
+def _request_out_dir(request: Dict[str, Any]) -> Optional[Path]:
+    """The directory a compile request writes to, or ``None`` if it writes none."""
+    out_dir = request.get("out_dir")
+    if "text" in request:
+        if not request.get("write", "name" in request or bool(out_dir)):
+            return None
+        if not out_dir and "name" in request:
+            out_dir = output_dir_for_input(Path(f"{Path(str(request['name'])).name}.min"))
+    elif not out_dir and "input" in request:
+        out_dir = output_dir_for_input(Path(str(request["input"])))
+    if not out_dir:
+        return None
+    try:
+        return Path(str(out_dir)).resolve()
+    except (OSError, ValueError):
+        return None  # ``_handle`` reports the bad path
+
+
+def _result(future: Future, request_id: Any) -> Dict[str, Any]:
+    try:
+        response = future.result()
+    except Exception as exc:  # pragma: no cover - defensive (e.g. a worker died)
+        response = {"ok": False, "error": f"Unexpected error: {exc}"}
+    return {"id": request_id, **response}
+
+
+# Per-worker state, set once by the pool initializer.
+_WORKER_TABLES: ParseTables | None = None
+
+
+def _init_worker(tables: ParseTables) -> None:
+    global _WORKER_TABLES
+    _WORKER_TABLES = tables
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the server decides when workers stop
+    sys.stdout = sys.stderr
+
+
+def _handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        trace = TraceOptions(
+            mode=request.get("trace", "full"),
+            limit=int(request.get("trace_limit", 10)),
+            every=int(request.get("trace_every", 100)),
+        )
+        options = dict(
+            table_method=request.get("table_method", "deremer"),
+            trace=trace,
+            rebuild=_flag(request, "rebuild", False),
+            tables=_WORKER_TABLES,
+            profile=request.get("profile"),
+            unit_bypass=_flag(request, "unit_bypass", True),
+        )
+        stage = str(request.get("stage", "all"))
+        out_dir = request.get("out_dir")
+        if "text" in request:
+            return _handle_text(request, stage, trace, options["unit_bypass"], out_dir)
+        elif "input" in request:
+            result = pipeline.run_stage(
+                stage, str(request["input"]), out_dir=out_dir, **options
+            )
+        else:
+            raise UserError("Error: request needs 'input' or 'text'")
+        response: Dict[str, Any] = {
+            "ok": True,
+            "stage": result.stage,
+            "output_dir": str(result.output_dir),
+            "generated": [str(p) for p in result.generated],
+            "reused": result.reused,
+        }
+        if result.profile is not None:
+            response["profile"] = result.profile
+        if _flag(request, "contents", False):
+            response["artifacts"] = {
+                p.name: _read_exact(p) for p in result.generated
+            }
+        return response
+    except UserError as exc:
+        return {"ok": False, "error": str(exc)}
+    except (TypeError, ValueError) as exc:
+        return {"ok": False, "error": f"Error: bad request: {exc}"}
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"ok": False, "error": f"Unexpected error: {exc}"}
+
+
+def _read_exact(path: Path) -> str:
+    """File text without newline translation, as ``api.CompileResult.artifacts`` has it."""
+    with path.open(encoding="utf-8", newline="") as fp:
+        return fp.read()
+
+
+def _flag(request: Dict[str, Any], name: str, default: bool) -> bool:
+    """A boolean request field; strings such as ``"false"`` are rejected, not truthy."""
+    value = request.get(name, default)
+    if not isinstance(value, bool):
+        raise TypeError(f"'{name}' must be true or false")
+    return value
+
+
+def _handle_text(
+    request: Dict[str, Any],
+    stage: str,
+    trace: TraceOptions,
+    unit_bypass: bool,
+    out_dir: str | None,
+) -> Dict[str, Any]:
+    if stage.lower() == "table" or request.get("profile") is not None:
+        raise UserError("Error: 'table' and 'profile' need an 'input' file, not 'text'")
+    result = api.compile_source(
+        str(request["text"]), stages=stage, trace=trace, unit_bypass=unit_bypass
+    )
+    response: Dict[str, Any] = {"ok": True, "stage": stage.lower(), "reused": []}
+    write = _flag(request, "write", "name" in request or bool(out_dir))
+    if write:
+        if out_dir:
+            out = Path(out_dir)
+        elif "name" in request:
+            name = Path(str(request["name"])).name
+            out = output_dir_for_input(Path(f"{name}.min"))
+        else:
+            raise UserError("Error: writing a 'text' request needs a 'name' or 'out_dir'")
+        response["output_dir"] = str(out)
+        response["generated"] = [str(p) for p in result.write(out)]
+    if _flag(request, "contents", False) or not write:
+        response["artifacts"] = result.artifacts()
+    return response
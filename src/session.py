@@ -0,0 +1,107 @@
+"""
+Compilation session: one source file and every artifact derived from it.
+
+Each artifact (tokens, AST, IR, CFG, optimized IR, target code) is computed on
+first use and kept, so running several stages on one session lexes, parses and
+optimizes the file once. Stage entry points (``ir.generate_ir``,
+``opt.optimize_ir``, ``codegen.emit_target``) take a session. Each artifact
+imports its stage module when first computed, so a session used only for
+tokens never loads the parser or the later passes.
+
+A session built with ``text=`` holds the source in memory; it never touches
+the filesystem, and ``source_path`` is ``None``.
+
+A session is the per-compile context: the symbol table, the ``IRBuilder`` and
+its temp and label counters all live on it. The grammar, its analysis and the
+parse tables are immutable and shared. So separate sessions can compile
+concurrently in threads, but one session must not be used by two threads.
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, List, TextIO
+
+from .utils import TraceOptions, UserError, ensure_input_file
+
+if TYPE_CHECKING:
+    from . import ast as ast_nodes
+    from .cfg import BasicBlock
+    from .ir import IRBuilder
+    from .lexer import TokenBuffer
+    from .opt import OptResult
+    from .parser import ParseResult
+
+
+class CompilationSession:
+    def __init__(self, source_path: str | Path | None = None, *, text: str | None = None):
+        if (source_path is None) == (text is None):
+            raise ValueError("CompilationSession needs exactly one of source_path and text")
+        self.source_path = None if source_path is None else ensure_input_file(source_path)
+        self.text = text
+
+    @cached_property
+    def tokens(self) -> TokenBuffer:
+        if self.text is not None:
+            from .lexer import tokenize_source
+
+            return tokenize_source(self.text)
+        from .lexer import tokenize_buffer
+
+        return tokenize_buffer(self.source_path)
+
+    @cached_property
+    def parsed(self) -> ParseResult:
+        from .parser import parse_tokens
+
+        return _checked(parse_tokens(self.tokens))  # trace off: only the AST
+
+    @cached_property
+    def program(self) -> ast_nodes.Program:
+        return self.parsed.program
+
+    def parse_traced(
+        self, trace: TraceOptions, trace_out: TextIO, unit_bypass: bool = True
+    ) -> ast_nodes.Program:
+        """Parse again with ``trace`` streamed to ``trace_out``; the AST is kept if new.
+
+        ``unit_bypass=False`` traces every identity unit reduction as its own step.
+        """
+        from .parser import parse_tokens
+
+        result = _checked(
+            parse_tokens(self.tokens, trace=trace, trace_out=trace_out, unit_bypass=unit_bypass)
+        )
+        self.__dict__.setdefault("parsed", result)
+        return self.program
+
+    @cached_property
+    def ir(self) -> IRBuilder:
+        from .ir import build_ir
+
+        return build_ir(self.program, self.tokens.symbols)
+
+    @cached_property
+    def cfg(self) -> List[BasicBlock]:
+        from .cfg import build_cfg
+
+        return build_cfg(self.ir)
+
+    @cached_property
+    def optimized(self) -> OptResult:
+        from .opt import optimize_quads
+
+        return optimize_quads(self.ir, self.cfg)
+
+    @cached_property
+    def target(self) -> str:
+        from .codegen import generate_target
+
+        return generate_target(self.optimized.ir)
+
+
+def _checked(result: ParseResult) -> ParseResult:
+    if result.program is None:
+        raise UserError("Internal error: parser did not return Program AST")
+    return result
@@ -0,0 +1,387 @@
+"""
+Runtime parse-table representations.
+
+Kept free of grammar analysis so the parser (and the generated parser module)
+can load tables without importing the LALR(1) builder in ``lalr``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, TypeVar
+
+from .utils import UserError
+
+TABLE_CACHE_VERSION = 2
+
+_V = TypeVar("_V")
+
+
+def _frozen_rows(rows: Mapping[int, Mapping[str, _V]]) -> Mapping[int, Mapping[str, _V]]:
+    return MappingProxyType({k: MappingProxyType(dict(row)) for k, row in rows.items()})
+
+
+@dataclass(frozen=True)
+class StateSummary:
+    id: int
+    sources: Tuple[int, ...]
+    items: Tuple[Tuple[int, int, Tuple[str, ...]], ...]  # (prod_id, dot, lookaheads)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "sources", tuple(self.sources))
+        object.__setattr__(
+            self, "items", tuple((pid, dot, tuple(las)) for pid, dot, las in self.items)
+        )
+
+
+@dataclass(frozen=True)
+class ParseTables:
+    """Serializable ACTION/GOTO tables plus the metadata the parser driver needs.
+
+    One instance is shared by every compile in a process, so it is deeply
+    immutable: whatever the constructor is given, sequences are stored as
+    tuples and mappings (including each ACTION/GOTO row) as read-only
+    ``MappingProxyType`` views. It pickles through its JSON form, which is how
+    batch mode and the compile server send it to worker processes.
+    """
+
+    grammar_hash: str
+    terminals: Tuple[str, ...]
+    nonterminals: Tuple[str, ...]
+    action: Mapping[int, Mapping[str, str]]
+    goto: Mapping[int, Mapping[str, int]]
+    productions: Mapping[int, Tuple[str, Tuple[str, ...]]]  # prod_id -> (lhs, rhs)
+    states: Tuple[StateSummary, ...]
+    # (state, nonterminal) -> unit productions folded into that GOTO entry
+    unit_chains: Mapping[Tuple[int, str], Tuple[int, ...]] = field(default_factory=dict)
+    # (state, nonterminal) -> the unit-reduction states that GOTO entry skips, in order
+    unit_states: Mapping[Tuple[int, str], Tuple[int, ...]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        freeze = object.__setattr__
+        freeze(self, "terminals", tuple(self.terminals))
+        freeze(self, "nonterminals", tuple(self.nonterminals))
+        freeze(self, "action", _frozen_rows(self.action))
+        freeze(self, "goto", _frozen_rows(self.goto))
+        freeze(
+            self,
+            "productions",
+            MappingProxyType({k: (lhs, tuple(rhs)) for k, (lhs, rhs) in self.productions.items()}),
+        )
+        freeze(self, "states", tuple(self.states))
+        freeze(
+            self,
+            "unit_chains",
+            MappingProxyType({k: tuple(chain) for k, chain in self.unit_chains.items()}),
+        )
+        freeze(
+            self,
+            "unit_states",
+            MappingProxyType({k: tuple(sts) for k, sts in self.unit_states.items()}),
+        )
+
+    def __reduce__(self) -> tuple:
+        return (ParseTables.from_json, (self.to_json(),))
+
+    def to_json(self) -> dict:
+        return {
+            "version": TABLE_CACHE_VERSION,
+            "grammar_hash": self.grammar_hash,
+            "terminals": list(self.terminals),
+            "nonterminals": list(self.nonterminals),
+            "action": {str(k): dict(v) for k, v in self.action.items()},
+            "goto": {str(k): dict(v) for k, v in self.goto.items()},
+            "productions": {str(k): [lhs, list(rhs)] for k, (lhs, rhs) in self.productions.items()},
+            "states": [
+                {
+                    "id": st.id,
+                    "sources": list(st.sources),
+                    "items": [[pid, dot, list(las)] for pid, dot, las in st.items],
+                }
+                for st in self.states
+            ],
+            "unit_chains": [[st, nt, list(chain)] for (st, nt), chain in self.unit_chains.items()],
+            "unit_states": [[st, nt, list(sts)] for (st, nt), sts in self.unit_states.items()],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ParseTables":
+        return cls(
+            grammar_hash=data["grammar_hash"],
+            terminals=list(data["terminals"]),
+            nonterminals=list(data["nonterminals"]),
+            action={int(k): dict(v) for k, v in data["action"].items()},
+            goto={int(k): {nt: int(t) for nt, t in v.items()} for k, v in data["goto"].items()},
+            productions={
+                int(k): (lhs, tuple(rhs)) for k, (lhs, rhs) in data["productions"].items()
+            },
+            states=[
+                StateSummary(
+                    id=st["id"],
+                    sources=list(st["sources"]),
+                    items=[(pid, dot, tuple(las)) for pid, dot, las in st["items"]],
+                )
+                for st in data["states"]
+            ],
+            unit_chains={
+                (int(st), nt): tuple(chain) for st, nt, chain in data.get("unit_chains", [])
+            },
+            unit_states={
+                (int(st), nt): tuple(sts) for st, nt, sts in data.get("unit_states", [])
+            },
+        )
+
+
+# Integer action encoding used by CompiledTables:
+#   0 -> error, v > 0 -> shift to state v - 1, v < 0 -> reduce by production -v.
+# Production 1 (S' -> Program EOF) is never reduced, so -1 encodes "acc".
+ACT_ERROR = 0
+ACT_ACCEPT = -1
+
+
+def encode_action(act: str) -> int:
+    if not act:
+        return ACT_ERROR
+    if act == "acc":
+        return ACT_ACCEPT
+    if act[0] == "s":
+        return int(act[1:]) + 1
+    if act[0] == "r":
+        return -int(act[1:])
+    raise UserError(f"Error: unknown parser action '{act}'")
+
+
+def decode_action(code: int) -> str:
+    if code == ACT_ERROR:
+        return ""
+    if code == ACT_ACCEPT:
+        return "acc"
+    if code > 0:
+        return f"s{code - 1}"
+    return f"r{-code}"
+
+
+@dataclass(frozen=True)
+class CompiledTables:
+    """Compressed integer form of ParseTables for the parser hot loop.
+
+    ACTION rows are split into a per-state default reduction
+    (``action_default``, 0 when the state has none) and the remaining explicit
+    entries, which are packed row-displacement style ("comb vector"): the entry
+    for ``(state, terminal)`` lives at ``i = action_base[state] + terminal``
+    when ``action_check[i] == state``, otherwise the default applies. States
+    whose only action is their default reduction have ``action_base`` -1, so
+    the parser never looks at the lookahead there.
+
+    GOTO is packed the same way by nonterminal: ``goto_default[nt]`` is the most
+    common target and ``i = goto_base[nt] + state`` holds the exceptions when
+    ``goto_check[i] == nt``. Both packed vectors are padded so any such ``i`` is
+    in range.
+
+    Default reductions replace error entries, so ``valid`` keeps each state's
+    terminal bitmask of real ACTION entries for error reporting. ``prod_lhs``
+    and ``prod_len`` are indexed by production id. ``unit_chains`` maps
+    ``(state, nonterminal)`` GOTO entries that skip unit reductions (see
+    ``lalr.bypass_unit_reductions``) to the skipped productions, for tracing,
+    and ``unit_states`` to the skipped states, for error reporting.
+
+    Like ``ParseTables`` it is shared and deeply immutable: the vectors (built
+    as ``array``s or lists) are stored as tuples, which also index fastest in
+    the hot loop, and the mappings as ``MappingProxyType`` views.
+    """
+
+    terminals: Tuple[str, ...]
+    nonterminals: Tuple[str, ...]
+    term_index: Mapping[str, int]
+    nonterm_index: Mapping[str, int]
+    n_states: int
+    n_terms: int
+    n_nonterms: int
+    action_default: Tuple[int, ...]
+    action_base: Tuple[int, ...]
+    action_table: Tuple[int, ...]
+    action_check: Tuple[int, ...]
+    goto_default: Tuple[int, ...]
+    goto_base: Tuple[int, ...]
+    goto_table: Tuple[int, ...]
+    goto_check: Tuple[int, ...]
+    valid: Tuple[int, ...]
+    prod_lhs: Tuple[int, ...]
+    prod_len: Tuple[int, ...]
+    prod_lhs_name: Tuple[str, ...]
+    unit_chains: Mapping[Tuple[int, int], Tuple[int, ...]] = field(default_factory=dict)
+    unit_states: Mapping[Tuple[int, int], Tuple[int, ...]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, (list, array)):
+                object.__setattr__(self, f.name, tuple(value))
+            elif isinstance(value, dict):
+                object.__setattr__(self, f.name, MappingProxyType(value))
+
+    def action_at(self, state: int, terminal: int) -> int:
+        """Exact ACTION entry, ACT_ERROR where the full table has none."""
+        if not self.valid[state] >> terminal & 1:
+            return ACT_ERROR
+        base = self.action_base[state]
+        if base >= 0 and self.action_check[base + terminal] == state:
+            return self.action_table[base + terminal]
+        return self.action_default[state]
+
+    def goto_at(self, state: int, nonterminal: int) -> int:
+        i = self.goto_base[nonterminal] + state
+        if self.goto_check[i] == nonterminal:
+            return self.goto_table[i]
+        return self.goto_default[nonterminal]
+
+    def expected_terminals(self, state: int) -> List[str]:
+        mask = self.valid[state]
+        return sorted(t for i, t in enumerate(self.terminals) if mask >> i & 1)
+
+    def size_report(self) -> str:
+        dense = self.n_states * (self.n_terms + self.n_nonterms)
+        packed = sum(
+            len(a)
+            for a in (
+                self.action_default,
+                self.action_base,
+                self.action_table,
+                self.action_check,
+                self.goto_default,
+                self.goto_base,
+                self.goto_table,
+                self.goto_check,
+            )
+        )
+        reduce_only = sum(1 for b in self.action_base if b < 0)
+        return (
+            f"ACTION/GOTO: {dense} dense entries -> {packed} packed entries "
+            f"({packed * 100 // max(dense, 1)}%); {reduce_only}/{self.n_states} states reduce-only"
+        )
+
+
+def compile_tables(tables: ParseTables) -> CompiledTables:
+    terminals = list(tables.terminals)
+    nonterminals = list(tables.nonterminals)
+    term_index = {t: i for i, t in enumerate(terminals)}
+    nonterm_index = {nt: i for i, nt in enumerate(nonterminals)}
+    n_states = max(tables.action.keys()) + 1 if tables.action else 0
+    n_terms, n_nonterms = len(terminals), len(nonterminals)
+
+    action_default = array("i", [ACT_ERROR]) * n_states
+    action_rows: List[Dict[int, int]] = [{} for _ in range(n_states)]
+    valid = [0] * n_states
+    for state, row in tables.action.items():
+        codes = {term_index[t]: encode_action(act) for t, act in row.items() if act}
+        for t in codes:
+            valid[state] |= 1 << t
+        default = _default_reduction(codes)
+        action_default[state] = default
+        action_rows[state] = {t: c for t, c in codes.items() if c != default}
+    action_base, action_table, action_check = _pack_rows(action_rows, n_terms, ACT_ERROR)
+    for state in range(n_states):
+        if not action_rows[state] and action_default[state] != ACT_ERROR:
+            action_base[state] = -1  # reduce-only: the lookahead is never consulted
+
+    goto_columns: List[Dict[int, int]] = [{} for _ in range(n_nonterms)]
+    for state, row in tables.goto.items():
+        for nt, tgt in row.items():
+            goto_columns[nonterm_index[nt]][state] = tgt
+    goto_default = array("i", [-1]) * n_nonterms
+    for nt, column in enumerate(goto_columns):
+        if column:
+            counts = Counter(column.values())
+            goto_default[nt] = min(counts, key=lambda tgt: (-counts[tgt], tgt))
+            goto_columns[nt] = {st: tgt for st, tgt in column.items() if tgt != goto_default[nt]}
+    goto_base, goto_table, goto_check = _pack_rows(goto_columns, n_states, -1)
+
+    max_prod = max(tables.productions) if tables.productions else 0
+    prod_lhs = array("i", [-1]) * (max_prod + 1)
+    prod_len = array("i", [0]) * (max_prod + 1)
+    prod_lhs_name = [""] * (max_prod + 1)
+    for pid, (lhs, rhs) in tables.productions.items():
+        # S' has no GOTO column; its single production is only ever accepted.
+        prod_lhs[pid] = nonterm_index.get(lhs, -1)
+        prod_len[pid] = len(rhs)
+        prod_lhs_name[pid] = lhs
+
+    return CompiledTables(
+        terminals=terminals,
+        nonterminals=nonterminals,
+        term_index=term_index,
+        nonterm_index=nonterm_index,
+        n_states=n_states,
+        n_terms=n_terms,
+        n_nonterms=n_nonterms,
+        action_default=action_default,
+        action_base=action_base,
+        action_table=action_table,
+        action_check=action_check,
+        goto_default=goto_default,
+        goto_base=goto_base,
+        goto_table=goto_table,
+        goto_check=goto_check,
+        valid=valid,
+        prod_lhs=prod_lhs,
+        prod_len=prod_len,
+        prod_lhs_name=prod_lhs_name,
+        unit_chains={
+            (st, nonterm_index[nt]): chain for (st, nt), chain in tables.unit_chains.items()
+        },
+        unit_states={
+            (st, nonterm_index[nt]): sts for (st, nt), sts in tables.unit_states.items()
+        },
+    )
+
+
+def _default_reduction(codes: Dict[int, int]) -> int:
+    """Most frequent reduce action of a row (lowest production id on ties)."""
+    counts = Counter(c for c in codes.values() if c < ACT_ACCEPT)
+    if not counts:
+        return ACT_ERROR
+    return max(counts, key=lambda c: (counts[c], c))
+
+
+def _pack_rows(rows: List[Dict[int, int]], width: int, fill: int) -> Tuple[array, array, array]:
+    """First-fit row displacement: return (base, table, check) for sparse rows.
+
+    Denser rows are placed first. ``check[i]`` holds the row owning slot ``i``
+    (-1 when free) and the vectors are padded to ``max(base) + width``.
+    """
+    base = array("i", [0]) * len(rows)
+    occupied = bytearray()
+    table: List[int] = []
+    check: List[int] = []
+    for r in sorted(range(len(rows)), key=lambda r: (-len(rows[r]), r)):
+        cols = sorted(rows[r])
+        if not cols:
+            continue
+        first = cols[0]
+        pos = first
+        while True:
+            free = occupied.find(0, pos)
+            pos = max(len(occupied), pos) if free < 0 else free  # past the end is free
+            offset = pos - first
+            if all(offset + c >= len(occupied) or not occupied[offset + c] for c in cols):
+                break
+            pos += 1
+        base[r] = offset
+        end = offset + cols[-1] + 1
+        if end > len(occupied):
+            occupied.extend(bytes(end - len(occupied)))
+        if end > len(table):
+            table.extend([fill] * (end - len(table)))
+            check.extend([-1] * (end - len(check)))
+        for c in cols:
+            occupied[offset + c] = 1
+            table[offset + c] = rows[r][c]
+            check[offset + c] = r
+    size = max(base, default=0) + width
+    if len(table) < size:
+        table.extend([fill] * (size - len(table)))
+        check.extend([-1] * (size - len(check)))
+    return base, array("i", table), array("i", check)
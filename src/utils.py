@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import csv
+import io
 import os
-import subprocess
 import sys
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, TYPE_CHECKING
+from typing import Dict, Iterable, List, Mapping, Sequence, TextIO, TYPE_CHECKING
 
 if TYPE_CHECKING:  # avoid circular import at runtime
     from .lexer import Token
@@ -22,6 +23,31 @@ class StageResult:
     output_dir: Path
     generated: List[Path]
     message: str | None = None
+    reused: List[str] = field(default_factory=list)  # stages skipped as unchanged
+    profile: Dict[str, dict] | None = None  # per-stage measurements with ``profile``
+
+
+TRACE_MODES = ("off", "full", "truncated", "sampled")
+
+
+@dataclass
+class TraceOptions:
+    """How much of the shift/reduce trace to record.
+
+    ``full`` logs every step with the whole remaining input, ``truncated`` caps
+    the remaining input at ``limit`` tokens, ``sampled`` logs every ``every``-th
+    step (plus the final one) and ``off`` records nothing.
+    """
+
+    mode: str = "full"
+    limit: int = 10
+    every: int = 100
+
+    def __post_init__(self) -> None:
+        if self.mode not in TRACE_MODES:
+            raise UserError(f"Error: unsupported trace mode '{self.mode}'")
+        if self.limit < 1 or self.every < 1:
+            raise UserError("Error: trace limit and sampling interval must be positive")
 
 
 def ensure_input_file(input_path: str | Path) -> Path:
@@ -37,6 +63,11 @@ def output_dir_for_input(input_path: Path) -> Path:
     return Path("out") / input_path.stem
 
 
+def partial_path(path: Path) -> Path:
+    """Temporary sibling of ``path`` for an atomic replace, unique per process and thread."""
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+
+
 def ensure_output_dir(input_path: Path) -> Path:
     """Create and return the output directory for the given input file."""
     out_dir = output_dir_for_input(input_path)
@@ -44,6 +75,20 @@ def ensure_output_dir(input_path: Path) -> Path:
     return out_dir
 
 
+def cache_dir() -> Path:
+    """Return the directory for persistent compiler caches (without creating it).
+
+    ``MINILANG_CACHE_DIR`` overrides the default ``$XDG_CACHE_HOME/minilang``
+    (``~/.cache/minilang`` when XDG is unset).
+    """
+    override = os.environ.get("MINILANG_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "minilang"
+
+
 def write_csv_with_header(path: Path, header: Iterable[str]) -> None:
     """Write a CSV file containing only the header row."""
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -52,23 +97,44 @@ def write_csv_with_header(path: Path, header: Iterable[str]) -> None:
         writer.writerow(list(header))
 
 
-def write_tokens_csv(path: Path, tokens: List["Token"]) -> None:
-    """Write tokens to CSV with the required header."""
+def write_tokens_csv(path: Path, tokens: Iterable["Token"]) -> int:
+    """Write tokens (a list, a ``TokenBuffer`` or a stream) to CSV with the required header.
+
+    Returns the number of tokens written.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8", newline="") as fp:
-        writer = csv.writer(fp)
-        writer.writerow(["index", "type", "lexeme", "line", "col"])
-        for tok in tokens:
-            writer.writerow([tok.index, tok.type, tok.lexeme, tok.line, tok.col])
+        return _write_token_rows(fp, tokens)
+
+
+def format_tokens_csv(tokens: Iterable["Token"]) -> str:
+    """The text ``write_tokens_csv`` would write for ``tokens``."""
+    buf = io.StringIO(newline="")
+    _write_token_rows(buf, tokens)
+    return buf.getvalue()
+
+
+def _write_token_rows(fp: TextIO, tokens: Iterable["Token"]) -> int:
+    count = 0
+    writer = csv.writer(fp)
+    writer.writerow(["index", "type", "lexeme", "line", "col"])
+    for count, tok in enumerate(tokens, 1):
+        writer.writerow([tok.index, tok.type, tok.lexeme, tok.line, tok.col])
+    return count
 
 
 def write_symtab_txt(path: Path, entries) -> None:
     """Write symbol table entries to a tab-delimited txt."""
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8", newline="") as fp:
-        fp.write("Name\tFirstSeen\tCount\n")
-        for e in entries:
-            fp.write(f"{e.name}\t{e.first_seen}\t{e.count}\n")
+        fp.write(format_symtab(entries))
+
+
+def format_symtab(entries) -> str:
+    """The text ``write_symtab_txt`` would write for ``entries``."""
+    lines = ["Name\tFirstSeen\tCount\n"]
+    lines.extend(f"{e.name}\t{e.first_seen}\t{e.count}\n" for e in entries)
+    return "".join(lines)
 
 
 def write_text_file(path: Path, content: str) -> None:
@@ -79,15 +145,15 @@ def write_text_file(path: Path, content: str) -> None:
 
 def write_action_goto_csv(
     path: Path,
-    terminals: List[str],
-    nonterminals: List[str],
-    action: dict[int, dict[str, str]],
-    goto_table: dict[int, dict[str, int]],
+    terminals: Sequence[str],
+    nonterminals: Sequence[str],
+    action: Mapping[int, Mapping[str, str]],
+    goto_table: Mapping[int, Mapping[str, int]],
 ) -> None:
     """Write combined ACTION/GOTO CSV with stable ordering."""
     path.parent.mkdir(parents=True, exist_ok=True)
     max_state = max(action.keys()) if action else -1
-    headers = ["state"] + terminals + nonterminals
+    headers = ["state", *terminals, *nonterminals]
     with path.open("w", encoding="utf-8", newline="") as fp:
         writer = csv.writer(fp)
         writer.writerow(headers)
@@ -103,6 +169,8 @@ def write_action_goto_csv(
 
 def open_folder(path: Path) -> None:
     """Open a folder in the system file explorer, if possible."""
+    import subprocess  # GUI only; kept off the CLI import path
+
     if sys.platform.startswith("darwin"):
         subprocess.Popen(["open", str(path)])
     elif os.name == "nt":